@@ -9,19 +9,29 @@ import os
 import sys
 from pathlib import Path
 from datetime import datetime
-import subprocess
+import io
+import logging
 import zipfile
 import tempfile
+from packaging.version import Version
 
 # Add project root to path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from core.computations.bill_processor import process_bill
-from exports.renderers import generate_html
+from exports.renderers import generate_html, merge_pdfs
+from exports.lazy_documents import READY, LazyDocumentSet
+from core.engine_subprocess import get_engine_runner
+from core.font_bundle import configure_fontconfig
 
-def generate_pdf_from_html(html_path, pdf_path):
-    """Generate PDF from HTML using Chrome Headless (NO SHRINKING!)"""
+logger = logging.getLogger(__name__)
+
+def generate_pdf_from_html(html_path, pdf_path, notify=True):
+    """Generate PDF from HTML using Chrome Headless (NO SHRINKING!)
+
+    notify=False suppresses Streamlit messages (required off the script thread).
+    """
     import shutil
     
     # Try Chrome first (BEST - No shrinking!)
@@ -45,6 +55,17 @@ def generate_pdf_from_html(html_path, pdf_path):
             break
     
     if chrome_exe:
+        # Warm browser from the shared pool (no per-document Chrome startup)
+        try:
+            from core.chrome_pool import get_chrome_pool
+            pool = get_chrome_pool()
+            if pool.available:
+                pool.print_file_to_pdf(str(html_path), str(os.path.abspath(pdf_path)))
+                if os.path.exists(pdf_path):
+                    return True
+        except Exception as e:
+            print(f"Chrome pool exception: {str(e)}")
+        
         try:
             # CHROME HEADLESS - PERFECT PDF GENERATION (NO SHRINKING, NO HEADERS/FOOTERS!)
             cmd = [
@@ -59,12 +80,13 @@ def generate_pdf_from_html(html_path, pdf_path):
                 'file:///' + str(os.path.abspath(html_path)).replace('\\', '/')
             ]
             
-            result = subprocess.run(cmd, capture_output=True, timeout=60)
+            result = get_engine_runner().run('chrome', cmd, timeout=60)
             
             if result.returncode == 0 and os.path.exists(pdf_path):
-                st.info(f"✅ Using Chrome Headless (NO SHRINKING)")
+                if notify:
+                    st.info(f"✅ Using Chrome Headless (NO SHRINKING)")
                 return True
-            else:
+            elif notify:
                 st.warning(f"⚠️ Chrome failed, using wkhtmltopdf fallback")
         except Exception as e:
             print(f"Chrome exception: {str(e)}")
@@ -101,13 +123,13 @@ def generate_pdf_from_html(html_path, pdf_path):
         ]
         
         print(f"Running: {' '.join(cmd[:10])}...")
-        result = subprocess.run(cmd, capture_output=True, timeout=60)
+        result = get_engine_runner().run('pdfkit', cmd, timeout=60)
         
         if result.returncode == 0 and os.path.exists(pdf_path):
             print(f"✅ PDF generated with wkhtmltopdf: {pdf_path}")
             return True
         else:
-            error_msg = result.stderr.decode() if result.stderr else 'Unknown'
+            error_msg = result.stderr or 'Unknown'
             print(f"❌ wkhtmltopdf error: {error_msg}")
             return False
             
@@ -115,6 +137,43 @@ def generate_pdf_from_html(html_path, pdf_path):
         print(f"❌ PDF generation failed: {str(e)}")
         return False
 
+def iter_batch_pdfs(html_paths):
+    """Convert a whole batch's HTML files to PDF in one browser session
+
+    Yields (pdf_path, ok) as each document completes. Documents the shared
+    browser could not print fall back to generate_pdf_from_html.
+    """
+    html_paths = [Path(html_path) for html_path in html_paths]
+    try:
+        from core.chrome_pool import get_chrome_pool
+        pool = get_chrome_pool()
+    except ImportError:
+        pool = None
+
+    if pool is None or not pool.available:
+        for html_path, ok in zip(html_paths, _generate_pdfs(html_paths)):
+            yield html_path.with_suffix('.pdf'), ok
+        return
+
+    pdf_paths = {str(html_path): html_path.with_suffix('.pdf') for html_path in html_paths}
+    jobs = [(html_path, os.path.abspath(pdf_path)) for html_path, pdf_path in pdf_paths.items()]
+    for html_path, pdf_path, error in pool.print_batch(jobs):
+        if error is not None:
+            print(f"Chrome batch print failed for {html_path}: {error}")
+            yield pdf_paths[html_path], generate_pdf_from_html(html_path, pdf_path, notify=False)
+        else:
+            yield pdf_paths[html_path], True
+
+def _generate_pdfs(html_paths):
+    """Per-document conversion (no shared browser), results in input order"""
+    from exports.pdf_scheduler import engine_concurrency, run_jobs
+
+    jobs = [
+        (lambda html_path=html_path: generate_pdf_from_html(html_path, html_path.with_suffix('.pdf'), notify=False))
+        for html_path in html_paths
+    ]
+    return run_jobs(jobs, engine_concurrency("chrome"))
+
 def create_zip_file(files, zip_path):
     """Create ZIP file from list of files"""
     with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
@@ -123,6 +182,188 @@ def create_zip_file(files, zip_path):
                 zipf.write(file, os.path.basename(file))
     return zip_path
 
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+ZIP_MIME = "application/zip"
+
+# Streamlit 1.52 is the first release that accepts a callable as download_button data
+# (built when the button is clicked); older releases get the "Prepare" button instead
+DEFERRED_DOWNLOADS = Version(st.__version__) >= Version("1.52.0")
+
+def _pdf_builder(html_path):
+    """Build callable: convert one HTML file and return the PDF bytes"""
+    def build():
+        pdf_path = html_path.with_suffix('.pdf')
+        if not generate_pdf_from_html(html_path, pdf_path, notify=False):
+            raise RuntimeError(f"PDF generation failed for {html_path.name}")
+        return pdf_path.read_bytes()
+    return build
+
+def _docx_builder(generate, data, docx_path):
+    """Build callable: write one Word document and return its bytes"""
+    def build():
+        generate(data, str(docx_path))
+        return docx_path.read_bytes()
+    return build
+
+def _merged_builder(documents, pdf_names):
+    """Build callable: the bill's PDFs, generated concurrently with engine-aware limits, merged into one"""
+    def build():
+        from exports.pdf_scheduler import engine_concurrency, run_jobs
+
+        # Both engines used by _pdf_builder (Chrome, wkhtmltopdf) run out of process
+        jobs = [documents.getter(name) for name in pdf_names]
+        return merge_pdfs(run_jobs(jobs, engine_concurrency("chrome")))
+    return build
+
+def _zip_builder(documents, names):
+    """Build callable: ZIP of every document that can be built (failures are left out)"""
+    def build():
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for name in names:
+                try:
+                    zipf.writestr(documents.documents[name].file_name, documents.get(name))
+                except Exception as e:
+                    logger.warning(f"Leaving {name} out of the ZIP: {e}")
+        return buffer.getvalue()
+    return build
+
+def prepare_bill(bill_data, output_dir, zip_filename):
+    """Render a bill's HTML previews now and register its downloads for on-demand generation
+
+    PDFs, Word documents, the merged PDF and the ZIP are built when first
+    downloaded (or in the background when "ui.speculative_documents" is set)
+    and memoized for the session.
+    """
+    from exports.word_generator import generate_first_page_docx, generate_deviation_statement_docx, generate_extra_items_docx
+
+    first_page_data, deviation_data, extra_items_data, note_sheet_data = bill_data
+    template_dir = "templates"
+    html_files = {}
+    for template_name, data in [
+        ("first_page", first_page_data),
+        ("deviation_statement", deviation_data),
+        ("extra_items", extra_items_data),
+        ("note_sheet", note_sheet_data),
+    ]:
+        html_path = generate_html(template_name, data, template_dir, str(output_dir))
+        if os.path.exists(html_path):
+            html_files[template_name] = Path(html_path)
+
+    documents = LazyDocumentSet()
+    pdf_names = []
+    for template_name, html_path in html_files.items():
+        documents.add(f"{template_name}.pdf", html_path.with_suffix('.pdf').name, PDF_MIME, _pdf_builder(html_path))
+        pdf_names.append(f"{template_name}.pdf")
+    word_names = []
+    for template_name, generate, data in [
+        ("first_page", generate_first_page_docx, first_page_data),
+        ("deviation_statement", generate_deviation_statement_docx, deviation_data),
+        ("extra_items", generate_extra_items_docx, extra_items_data),
+    ]:
+        documents.add(f"{template_name}.docx", f"{template_name}.docx", DOCX_MIME,
+                      _docx_builder(generate, data, output_dir / f"{template_name}.docx"))
+        word_names.append(f"{template_name}.docx")
+    documents.add("merged.pdf", "complete_bill.pdf", PDF_MIME, _merged_builder(documents, pdf_names))
+    documents.add("zip", zip_filename, ZIP_MIME, _zip_builder(documents, pdf_names + word_names))
+
+    try:
+        from config.settings import get_setting
+        speculative = get_setting("ui.speculative_documents", False)
+    except ImportError:
+        speculative = False
+    if speculative:
+        # Builds every PDF through the scheduler on the way to the merged document
+        documents.prefetch(["merged.pdf"])
+
+    return {
+        "output_dir": output_dir,
+        "html_files": html_files,
+        "documents": documents,
+        "pdf_names": pdf_names,
+        "word_names": word_names,
+        "first_page_data": first_page_data,
+        "deviation_data": deviation_data,
+    }
+
+def lazy_download_button(documents, name, label, key):
+    """Download button whose file is generated on click (or after a "Prepare" click on older Streamlit)"""
+    document = documents.documents[name]
+    if DEFERRED_DOWNLOADS:
+        st.download_button(label=label, data=documents.getter(name), file_name=document.file_name,
+                           mime=document.mime, key=key, on_click="ignore", use_container_width=True)
+    elif documents.status(name) == READY:
+        st.download_button(label=label, data=documents.get(name), file_name=document.file_name,
+                           mime=document.mime, key=key, use_container_width=True)
+    elif st.button(f"⚙️ Prepare {document.file_name}", key=f"prepare_{key}", use_container_width=True):
+        with st.spinner(f"Generating {document.file_name}..."):
+            try:
+                documents.get(name)
+            except Exception as e:
+                st.error(f"❌ {document.file_name}: {e}")
+            else:
+                st.rerun()
+
+def show_bill(bill, key):
+    """Show a prepared bill: summary, inline HTML previews and on-demand downloads"""
+    import streamlit.components.v1 as components
+
+    first_page_data, deviation_data = bill["first_page_data"], bill["deviation_data"]
+    documents = bill["documents"]
+    st.success(f"✅ Generated {len(bill['html_files'])} HTML files!")
+    
+    # Show results
+    st.subheader("📊 Financial Summary")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Grand Total", f"₹{first_page_data['totals']['grand_total']:,.2f}")
+    with col2:
+        st.metric("Premium", f"₹{first_page_data['totals']['premium']['amount']:,.2f}")
+    with col3:
+        st.metric("Payable", f"₹{first_page_data['totals']['payable']:,.2f}")
+    
+    # Deviation summary
+    st.subheader("📈 Deviation Summary")
+    summary = deviation_data["summary"]
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Net Difference", f"₹{summary['net_difference']:,.2f}", 
+                 delta="Saving" if summary['is_saving'] else "Excess")
+    with col2:
+        st.metric("Percentage Deviation", f"{summary['percentage_deviation']:.2f}%")
+    
+    # HTML previews (PDFs are only generated when downloaded)
+    st.subheader("👁️ Preview")
+    html_files = bill["html_files"]
+    tabs = st.tabs([name.replace('_', ' ').title() for name in html_files])
+    for tab, html_path in zip(tabs, html_files.values()):
+        with tab:
+            components.html(html_path.read_text(encoding='utf-8'), height=800, scrolling=True)
+    
+    with st.expander("📄 Generated Files"):
+        st.info(f"Output folder: {bill['output_dir']}")
+        for html_path in html_files.values():
+            st.write(f"✅ {html_path.name}")
+    
+    st.subheader("📥 Download Options")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown("**📄 Individual PDFs:**")
+        for name in bill["pdf_names"]:
+            lazy_download_button(documents, name, f"⬇️ {documents.documents[name].file_name}", f"{key}_{name}")
+    
+    with col2:
+        st.markdown("**📝 Word Documents:**")
+        for name in bill["word_names"]:
+            lazy_download_button(documents, name, f"⬇️ {documents.documents[name].file_name}", f"{key}_{name}")
+    
+    with col3:
+        st.markdown("**📦 Complete Bill:**")
+        lazy_download_button(documents, "merged.pdf", "⬇️ Complete Bill (PDF)", f"{key}_merged")
+        lazy_download_button(documents, "zip", "⬇️ Download All (ZIP)", f"{key}_zip")
+
 def process_batch_files(excel_files):
     """Process multiple Excel files in batch"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -224,17 +465,23 @@ def process_batch_files(excel_files):
         st.subheader("📥 Download All Batch Results")
         
         with st.spinner("Generating PDFs for all files..."):
-            all_pdf_files = []
-            
+            # One browser session for the whole batch; results stream back as they complete
+            batch_html_files = []
             for result in results:
                 if result['status'] == 'SUCCESS':
                     result_dir = output_base_dir / result['output_dir']
-                    html_files = list(result_dir.glob("*.html"))
-                    
-                    for html_path in html_files:
-                        pdf_path = html_path.with_suffix('.pdf')
-                        if generate_pdf_from_html(html_path, pdf_path):
-                            all_pdf_files.append(pdf_path)
+                    batch_html_files.extend(sorted(result_dir.glob("*.html")))
+            
+            pdf_progress = st.progress(0)
+            completed = {}
+            for done, (pdf_file, ok) in enumerate(iter_batch_pdfs(batch_html_files), start=1):
+                completed[pdf_file] = ok
+                pdf_progress.progress(done / len(batch_html_files))
+            pdf_progress.empty()
+            
+            # Keep the ZIP in folder order regardless of completion order
+            all_pdf_files = [html_file.with_suffix('.pdf') for html_file in batch_html_files
+                             if completed.get(html_file.with_suffix('.pdf'))]
             
             if all_pdf_files:
                 st.success(f"✅ Generated {len(all_pdf_files)} PDF files across all batches!")
@@ -297,6 +544,9 @@ def main():
     # Cleanup old files on startup
     cleanup_old_files()
     
+    # Bundled template fonts for the PDF engines (no image build step on Streamlit Cloud)
+    configure_fontconfig(collect=True)
+    
     # Custom CSS for beautiful green header
     st.markdown("""
         <style>
@@ -510,154 +760,25 @@ def main():
                     output_dir = Path("test_outputs") / f"test_run_{timestamp}"
                     output_dir.mkdir(parents=True, exist_ok=True)
                     
-                    # Generate HTML files
-                    template_dir = "templates"
-                    html_files = []
-                    
-                    for template_name, data in [
-                        ("first_page", first_page_data),
-                        ("deviation_statement", deviation_data),
-                        ("extra_items", extra_items_data),
-                        ("note_sheet", note_sheet_data),
-                    ]:
-                        html_path = generate_html(template_name, data, template_dir, str(output_dir))
-                        if os.path.exists(html_path):
-                            html_files.append(Path(html_path).name)
-                    
-                    st.success(f"✅ Generated {len(html_files)} HTML files!")
-                    
-                    # Show results
-                    st.subheader("📊 Financial Summary")
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("Grand Total", f"₹{first_page_data['totals']['grand_total']:,.2f}")
-                    with col2:
-                        st.metric("Premium", f"₹{first_page_data['totals']['premium']['amount']:,.2f}")
-                    with col3:
-                        st.metric("Payable", f"₹{first_page_data['totals']['payable']:,.2f}")
-                    
-                    # Deviation summary
-                    st.subheader("📈 Deviation Summary")
-                    summary = deviation_data["summary"]
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric("Net Difference", f"₹{summary['net_difference']:,.2f}", 
-                                 delta="Saving" if summary['is_saving'] else "Excess")
-                    with col2:
-                        st.metric("Percentage Deviation", f"{summary['percentage_deviation']:.2f}%")
-                    
-                    # Generated files
-                    with st.expander("📄 Generated Files"):
-                        st.info(f"Output folder: {output_dir}")
-                        for file in html_files:
-                            st.write(f"✅ {file}")
-                    
-                    # Generate PDFs and Word documents
-                    st.subheader("📥 Download Options")
-                    
-                    with st.spinner("Generating PDFs and Word documents..."):
-                        pdf_files = []
-                        word_files = []
-                        
-                        # Generate PDFs
-                        for html_file in html_files:
-                            html_path = output_dir / html_file
-                            pdf_file = html_file.replace('.html', '.pdf')
-                            pdf_path = output_dir / pdf_file
-                            
-                            if generate_pdf_from_html(html_path, pdf_path):
-                                pdf_files.append(pdf_path)
-                        
-                        # Generate Word documents
-                        from exports.word_generator import generate_first_page_docx, generate_deviation_statement_docx, generate_extra_items_docx
-                        
-                        try:
-                            # First Page Word
-                            word_path = output_dir / "first_page.docx"
-                            generate_first_page_docx(first_page_data, str(word_path))
-                            if word_path.exists():
-                                word_files.append(word_path)
-                        except Exception as e:
-                            print(f"Word generation error: {e}")
-                        
-                        try:
-                            # Deviation Statement Word
-                            word_path = output_dir / "deviation_statement.docx"
-                            generate_deviation_statement_docx(deviation_data, str(word_path))
-                            if word_path.exists():
-                                word_files.append(word_path)
-                        except Exception as e:
-                            print(f"Word generation error: {e}")
-                        
-                        try:
-                            # Extra Items Word
-                            word_path = output_dir / "extra_items.docx"
-                            generate_extra_items_docx(extra_items_data, str(word_path))
-                            if word_path.exists():
-                                word_files.append(word_path)
-                        except Exception as e:
-                            print(f"Word generation error: {e}")
-                        
-                        if pdf_files or word_files:
-                            st.success(f"✅ Generated {len(pdf_files)} PDFs and {len(word_files)} Word documents!")
-                            st.balloons()  # 🎈 Celebration!
-                            
-                            # Create ZIP file with both PDFs and Word files
-                            zip_filename = f"bill_documents_{timestamp}.zip"
-                            zip_path = output_dir / zip_filename
-                            all_files = pdf_files + word_files
-                            create_zip_file(all_files, zip_path)
-                            
-                            # Download buttons
-                            col1, col2, col3 = st.columns(3)
-                            
-                            with col1:
-                                # Download individual PDFs
-                                st.markdown("**📄 Individual PDFs:**")
-                                for pdf_file in pdf_files:
-                                    with open(pdf_file, 'rb') as f:
-                                        st.download_button(
-                                            label=f"⬇️ {pdf_file.name}",
-                                            data=f.read(),
-                                            file_name=pdf_file.name,
-                                            mime="application/pdf",
-                                            use_container_width=True
-                                        )
-                            
-                            with col2:
-                                # Download Word files
-                                st.markdown("**📝 Word Documents:**")
-                                for word_file in word_files:
-                                    with open(word_file, 'rb') as f:
-                                        st.download_button(
-                                            label=f"⬇️ {word_file.name}",
-                                            data=f.read(),
-                                            file_name=word_file.name,
-                                            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                                            use_container_width=True
-                                        )
-                            
-                            with col3:
-                                # Download ZIP
-                                st.markdown("**📦 All Documents (ZIP):**")
-                                with open(zip_path, 'rb') as f:
-                                    st.download_button(
-                                        label=f"⬇️ Download All (ZIP)",
-                                        data=f.read(),
-                                        file_name=zip_filename,
-                                        mime="application/zip",
-                                        use_container_width=True
-                                    )
-                        else:
-                            st.warning("⚠️ PDF generation failed. Please check if wkhtmltopdf is installed.")
-                            st.info("HTML files are still available in the output folder.")
+                    # Render HTML previews now; PDFs and Word files are generated on demand
+                    bill = prepare_bill(
+                        (first_page_data, deviation_data, extra_items_data, note_sheet_data),
+                        output_dir, f"bill_documents_{timestamp}.zip"
+                    )
+                    bill["source"] = selected_file.name
+                    st.session_state["selected_bill"] = bill
                     
                 except Exception as e:
+                    st.session_state.pop("selected_bill", None)
                     st.error(f"❌ Error: {str(e)}")
                     import traceback
                     with st.expander("Error Details"):
                         st.code(traceback.format_exc())
         
+        bill = st.session_state.get("selected_bill")
+        if bill is not None and bill["source"] == selected_file.name:
+            show_bill(bill, "selected")
+        
         return
     
     if mode == "Batch Process All Files":
@@ -745,142 +866,25 @@ def main():
                         output_dir = Path("uploaded_outputs") / f"upload_{safe_name}_{timestamp}"
                         output_dir.mkdir(parents=True, exist_ok=True)
                         
-                        # Generate HTML files
-                        template_dir = "templates"
-                        html_files = []
-                        
-                        for template_name, data in [
-                            ("first_page", first_page_data),
-                            ("deviation_statement", deviation_data),
-                            ("extra_items", extra_items_data),
-                            ("note_sheet", note_sheet_data),
-                        ]:
-                            html_path = generate_html(template_name, data, template_dir, str(output_dir))
-                            if os.path.exists(html_path):
-                                html_files.append(Path(html_path).name)
-                        
-                        st.success(f"✅ Generated {len(html_files)} HTML files!")
-                        
-                        # Show results
-                        st.subheader("📊 Financial Summary")
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Grand Total", f"₹{first_page_data['totals']['grand_total']:,.2f}")
-                        with col2:
-                            st.metric("Premium", f"₹{first_page_data['totals']['premium']['amount']:,.2f}")
-                        with col3:
-                            st.metric("Payable", f"₹{first_page_data['totals']['payable']:,.2f}")
-                        
-                        # Deviation summary
-                        st.subheader("📈 Deviation Summary")
-                        summary = deviation_data["summary"]
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.metric("Net Difference", f"₹{summary['net_difference']:,.2f}", 
-                                     delta="Saving" if summary['is_saving'] else "Excess")
-                        with col2:
-                            st.metric("Percentage Deviation", f"{summary['percentage_deviation']:.2f}%")
-                        
-                        # Generate PDFs and Word documents
-                        st.subheader("📥 Download Options")
-                        
-                        with st.spinner("Generating PDFs and Word documents..."):
-                            pdf_files = []
-                            word_files = []
-                            
-                            # Generate PDFs
-                            for html_file in html_files:
-                                html_path = output_dir / html_file
-                                pdf_file = html_file.replace('.html', '.pdf')
-                                pdf_path = output_dir / pdf_file
-                                
-                                if generate_pdf_from_html(html_path, pdf_path):
-                                    pdf_files.append(pdf_path)
-                            
-                            # Generate Word documents
-                            from exports.word_generator import generate_first_page_docx, generate_deviation_statement_docx, generate_extra_items_docx
-                            
-                            try:
-                                word_path = output_dir / "first_page.docx"
-                                generate_first_page_docx(first_page_data, str(word_path))
-                                if word_path.exists():
-                                    word_files.append(word_path)
-                            except: pass
-                            
-                            try:
-                                word_path = output_dir / "deviation_statement.docx"
-                                generate_deviation_statement_docx(deviation_data, str(word_path))
-                                if word_path.exists():
-                                    word_files.append(word_path)
-                            except: pass
-                            
-                            try:
-                                word_path = output_dir / "extra_items.docx"
-                                generate_extra_items_docx(extra_items_data, str(word_path))
-                                if word_path.exists():
-                                    word_files.append(word_path)
-                            except: pass
-                            
-                            if pdf_files or word_files:
-                                st.success(f"✅ Generated {len(pdf_files)} PDFs and {len(word_files)} Word documents!")
-                                st.balloons()  # 🎈 Celebration!
-                                
-                                # Create ZIP file
-                                zip_filename = f"bill_documents_{safe_name}_{timestamp}.zip"
-                                zip_path = output_dir / zip_filename
-                                all_files = pdf_files + word_files
-                                create_zip_file(all_files, zip_path)
-                                
-                                # Download buttons
-                                col1, col2, col3 = st.columns(3)
-                                
-                                with col1:
-                                    # Download individual PDFs
-                                    st.markdown("**📄 Individual PDFs:**")
-                                    for pdf_file in pdf_files:
-                                        with open(pdf_file, 'rb') as f:
-                                            st.download_button(
-                                                label=f"⬇️ {pdf_file.name}",
-                                                data=f.read(),
-                                                file_name=pdf_file.name,
-                                                mime="application/pdf",
-                                                use_container_width=True
-                                            )
-                                
-                                with col2:
-                                    # Download Word files
-                                    st.markdown("**📝 Word Documents:**")
-                                    for word_file in word_files:
-                                        with open(word_file, 'rb') as f:
-                                            st.download_button(
-                                                label=f"⬇️ {word_file.name}",
-                                                data=f.read(),
-                                                file_name=word_file.name,
-                                                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                                                use_container_width=True
-                                            )
-                                
-                                with col3:
-                                    # Download ZIP
-                                    st.markdown("**📦 All Documents (ZIP):**")
-                                    with open(zip_path, 'rb') as f:
-                                        st.download_button(
-                                            label=f"⬇️ Download All (ZIP)",
-                                            data=f.read(),
-                                            file_name=zip_filename,
-                                            mime="application/zip",
-                                            use_container_width=True
-                                        )
-                            else:
-                                st.warning("⚠️ PDF generation failed. Please check if wkhtmltopdf is installed.")
-                                st.info("HTML files are still available in the output folder.")
+                        # Render HTML previews now; PDFs and Word files are generated on demand
+                        bill = prepare_bill(
+                            (first_page_data, deviation_data, extra_items_data, note_sheet_data),
+                            output_dir, f"bill_documents_{safe_name}_{timestamp}.zip"
+                        )
+                        bill["source"] = uploaded_file.name
+                        st.session_state["uploaded_bill"] = bill
                         
                     except Exception as e:
+                        st.session_state.pop("uploaded_bill", None)
                         st.error(f"❌ Error: {str(e)}")
                         import traceback
                         with st.expander("Error Details"):
                             st.code(traceback.format_exc())
             
+            bill = st.session_state.get("uploaded_bill")
+            if bill is not None and bill["source"] == uploaded_file.name:
+                show_bill(bill, "uploaded")
+            
         except Exception as e:
             st.error(f"❌ Error reading file: {str(e)}")
     
@@ -64,6 +64,23 @@ except ImportError:
         PdfReader = None
         PYPDF_AVAILABLE = False
 
+# Bounded-memory merge when the exports package is importable (repo checkout)
+try:
+    from exports.pdf_stream import stream_merge_pdfs
+except ImportError:
+    stream_merge_pdfs = None
+
+try:
+    from core.font_bundle import configure_fontconfig
+except ImportError:
+    configure_fontconfig = None
+
+# Engine-aware document concurrency ("performance.pdf_concurrency", engine process limits)
+try:
+    from exports.pdf_scheduler import engine_concurrency, run_jobs
+except ImportError:
+    engine_concurrency = run_jobs = None
+
 try:
     from jinja2 import BaseLoader, Environment
     JINJA2_AVAILABLE = True
@@ -271,8 +288,11 @@ def process_bill(ws_wo, ws_bq, ws_extra, premium_percent, premium_type):
 
     return first_page_data, last_page_data, deviation_data, extra_items_data, note_sheet_data
 
-def generate_simple_pdf(doc_name, data, output_path):
-    """Generate simple PDF using basic HTML conversion"""
+def generate_simple_pdf(doc_name, data, output_path, report_errors=True):
+    """Generate simple PDF using basic HTML conversion
+    
+    With report_errors=False exceptions propagate instead of being shown in Streamlit.
+    """
     try:
         if not PDFKIT_AVAILABLE:
             st.error("PDF generation not available. Please install wkhtmltopdf.")
@@ -351,6 +371,8 @@ def generate_simple_pdf(doc_name, data, output_path):
         return output_path
         
     except Exception as e:
+        if not report_errors:
+            raise
         st.error(f"PDF generation failed: {str(e)}")
         return None
 
@@ -395,12 +417,58 @@ def create_simple_word_doc(doc_name, data, output_path):
         st.error(f"Word document generation failed: {str(e)}")
         return None
 
+def generate_pdfs_concurrently(pdf_jobs, output_dir, max_workers=None):
+    """
+    Generate a bill's PDFs concurrently
+    
+    Args:
+        pdf_jobs: (doc_name, data, filename) tuples in canonical order
+        output_dir: Directory for the PDFs
+        max_workers: Concurrency limit (default: engine_concurrency("pdfkit"), one
+            wkhtmltopdf process each)
+    
+    Returns:
+        list: Paths of the PDFs generated, in job order
+    """
+    if not PDFKIT_AVAILABLE:
+        st.error("PDF generation not available. Please install wkhtmltopdf.")
+        return []
+    
+    paths = [os.path.join(output_dir, filename) for _, _, filename in pdf_jobs]
+    
+    # Streamlit calls only work on the script thread, so errors are reported after joining
+    def run(job, path):
+        try:
+            return generate_simple_pdf(job[0], job[1], path, report_errors=False)
+        except Exception as e:
+            return e
+    
+    jobs = [lambda job=job, path=path: run(job, path) for job, path in zip(pdf_jobs, paths)]
+    if run_jobs is None:
+        # Standalone copy without the exports package: one document at a time
+        results = [job() for job in jobs]
+    else:
+        results = run_jobs(jobs, max_workers or engine_concurrency("pdfkit"))
+    
+    pdf_files = []
+    for job, path, result in zip(pdf_jobs, paths, results):
+        if isinstance(result, Exception):
+            st.error(f"PDF generation failed for {job[0]}: {str(result)}")
+        elif result:
+            pdf_files.append(path)
+    return pdf_files
+
 def merge_pdfs_simple(pdf_files, output_path):
     """Simple PDF merger"""
     try:
         if not PYPDF_AVAILABLE:
             st.error("PDF merging not available.")
             return None
+        
+        if stream_merge_pdfs is not None:
+            # Appends one document at a time straight to the output file
+            stream_merge_pdfs(pdf_files, output_path)
+            return output_path
             
         writer = PdfWriter()
         
@@ -462,6 +530,10 @@ def main():
         initial_sidebar_state="expanded"
     )
     
+    # Bundled template fonts for the PDF engines (no image build step on Streamlit Cloud)
+    if configure_fontconfig is not None:
+        configure_fontconfig(collect=True)
+    
     # Add navigation info
     st.sidebar.markdown("---")
     st.sidebar.markdown("### 🧪 Additional Tools")
@@ -570,35 +642,17 @@ def main():
                             progress_bar = st.progress(0)
                             status_text = st.empty()
                             
-                            # Generate PDFs using consolidated functions
-                            status_text.text("Generating First Page PDF...")
-                            first_page_pdf = os.path.join(temp_dir, "first_page.pdf")
-                            if generate_simple_pdf("First Page", first_page_data, first_page_pdf):
-                                pdf_files.append(first_page_pdf)
-                            progress_bar.progress(25)
-                            
-                            status_text.text("Generating Last Page PDF...")
-                            last_page_pdf = os.path.join(temp_dir, "last_page.pdf")
-                            if generate_simple_pdf("Last Page", last_page_data, last_page_pdf):
-                                pdf_files.append(last_page_pdf)
-                            progress_bar.progress(35)
-                            
-                            status_text.text("Generating Deviation Statement PDF...")
-                            deviation_pdf = os.path.join(temp_dir, "deviation_statement.pdf")
-                            if generate_simple_pdf("Deviation Statement", deviation_data, deviation_pdf):
-                                pdf_files.append(deviation_pdf)
-                            progress_bar.progress(45)
-                            
-                            status_text.text("Generating Extra Items PDF...")
-                            extra_items_pdf = os.path.join(temp_dir, "extra_items.pdf")
-                            if generate_simple_pdf("Extra Items", extra_items_data, extra_items_pdf):
-                                pdf_files.append(extra_items_pdf)
-                            progress_bar.progress(55)
-                            
-                            status_text.text("Generating Note Sheet PDF...")
-                            note_sheet_pdf = os.path.join(temp_dir, "note_sheet.pdf")
-                            if generate_simple_pdf("Note Sheet", note_sheet_data, note_sheet_pdf):
-                                pdf_files.append(note_sheet_pdf)
+                            # Generate PDFs concurrently (wkhtmltopdf runs out of process),
+                            # keeping the canonical document order for merging
+                            status_text.text("Generating PDFs...")
+                            pdf_jobs = [
+                                ("First Page", first_page_data, "first_page.pdf"),
+                                ("Last Page", last_page_data, "last_page.pdf"),
+                                ("Deviation Statement", deviation_data, "deviation_statement.pdf"),
+                                ("Extra Items", extra_items_data, "extra_items.pdf"),
+                                ("Note Sheet", note_sheet_data, "note_sheet.pdf"),
+                            ]
+                            pdf_files = generate_pdfs_concurrently(pdf_jobs, temp_dir)
                             progress_bar.progress(65)
                             
                             # Generate Word documents
@@ -23,7 +23,12 @@ DEFAULT_SETTINGS = {
         "default_margin_bottom": "15mm",
         "default_margin_left": "10mm",
         "default_margin_right": "10mm",
-        "page_size": "A4"
+        "page_size": "A4",
+        "min_fidelity": "exact",  # exact | good | basic | text (see core.engine_router)
+        "native_renderer": "auto",  # True | False | "auto" (see exports.reportlab_renderer)
+        "stamp_certificates": True,  # Stamp Certificate II onto a cached template PDF
+        "page_subtotals": True,  # Carried/Brought Forward rows at predicted page breaks (see exports.pagination)
+        "engine_variants": True  # Simplified CSS for xhtml2pdf/ReportLab (see core.engine_variants)
     },
     "paths": {
         "template_dir": "templates",
@@ -32,7 +37,23 @@ DEFAULT_SETTINGS = {
     },
     "performance": {
         "cache_ttl": 3600,
-        "max_cache_size": 1024
+        "max_cache_size": 1024,
+        "pdf_concurrency": None,  # None = engine-aware default
+        "engine_process_limits": {},  # {engine: max processes}, e.g. {"chrome": 2}; default min(4, CPUs)
+        "artifact_cache_dir": None,  # None = <system temp>/billgen_artifacts
+        "artifact_cache_max_mb": 512,
+        "section_memo_max_mb": 256,  # Per format (HTML/PDF) in <system temp>/billgen_sections
+        "pdf_chunk_rows": 500  # First Page / Deviation Statement rows per chunk; 0 = no chunking
+    },
+    "word": {
+        "skeleton_templates": True  # Fill the prebuilt templates/*.docx skeletons (see exports.docx_skeleton)
+    },
+    "ui": {
+        "speculative_documents": False  # Build PDFs in the background after the HTML preview is shown
+    },
+    "render_service": {
+        "dir": None,  # None = <system temp>/billgen_render_service (see core.render_service)
+        "workers": None  # None = min(4, CPUs)
     }
 }
 
@@ -0,0 +1,576 @@
+"""
+Persistent headless Chrome worker pool
+Keeps a small number of long-lived headless Chrome instances and prints
+documents with the DevTools protocol (Page.printToPDF), so a bill pays browser
+startup once instead of once per document.
+
+Workers are health-checked before use, recycled after a fixed number of jobs,
+and the number of concurrent print jobs is bounded by the pool size.
+
+Batches (print_batch) go to a single browser that prints several documents at
+once in separate tabs and streams each result back as it completes.
+"""
+
+import atexit
+import base64
+import itertools
+import json
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from core.engine_detection import find_chrome_executable
+except ImportError:
+    # Fallback for direct execution
+    from engine_detection import find_chrome_executable
+
+logger = logging.getLogger(__name__)
+
+# Optional dependency: the pool is unavailable without websockets
+try:
+    from websockets.sync.client import connect as ws_connect
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    ws_connect = None
+    WEBSOCKETS_AVAILABLE = False
+
+# Tabs printing at once in a batch
+DEFAULT_BATCH_TABS = 4
+
+# printToPDF settings equivalent to the CLI flags used elsewhere
+# (--no-margins, --no-pdf-header-footer): CSS @page controls size and margins
+PRINT_OPTIONS = {
+    'printBackground': True,
+    'preferCSSPageSize': True,
+    'displayHeaderFooter': False,
+    'marginTop': 0,
+    'marginBottom': 0,
+    'marginLeft': 0,
+    'marginRight': 0,
+}
+
+
+class ChromeError(Exception):
+    """Raised when a Chrome worker fails to start, respond or print"""
+
+
+def _file_url(path: str) -> str:
+    return 'file:///' + os.path.abspath(path).replace('\\', '/').lstrip('/')
+
+
+class ChromeWorker:
+    """One headless Chrome process with a reusable page (plus extra tabs for batches)"""
+
+    def __init__(self, chrome_path: str, startup_timeout: float = 15.0):
+        """
+        Launch Chrome and attach to a blank page
+
+        Args:
+            chrome_path (str): Chrome executable
+            startup_timeout (float): Seconds to wait for the DevTools endpoint
+        """
+        self.jobs = 0
+        self._ids = itertools.count(1)
+        self._events = []
+        self._ws = None
+        self._session_id = None
+        self._tainted = False
+        self._profile_dir = tempfile.mkdtemp(prefix="billgen_chrome_")
+        self._process = subprocess.Popen(
+            [
+                chrome_path,
+                '--headless',
+                '--disable-gpu',
+                '--no-first-run',
+                '--no-default-browser-check',
+                '--disable-extensions',
+                '--disable-background-networking',
+                '--allow-file-access-from-files',
+                '--remote-debugging-port=0',
+                f'--user-data-dir={self._profile_dir}',
+                'about:blank',
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            self._ws = ws_connect(self._wait_for_endpoint(startup_timeout), max_size=None,
+                                  open_timeout=startup_timeout)
+            _, self._session_id = self._open_tab()
+        except Exception:
+            self.close()
+            raise
+
+    def _wait_for_endpoint(self, timeout: float) -> str:
+        """Read the browser websocket URL Chrome writes into its profile directory"""
+        port_file = os.path.join(self._profile_dir, 'DevToolsActivePort')
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise ChromeError(f"Chrome exited during startup (code {self._process.returncode})")
+            try:
+                with open(port_file, 'r', encoding='utf-8') as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    return f"ws://127.0.0.1:{lines[0]}{lines[1]}"
+            except OSError:
+                pass
+            time.sleep(0.05)
+        raise ChromeError("Timed out waiting for the Chrome DevTools endpoint")
+
+    def _send(self, method: str, params: Optional[dict] = None, session_id: Optional[str] = None) -> int:
+        """Send a DevTools command without waiting; returns its message id"""
+        message_id = next(self._ids)
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        self._ws.send(json.dumps(message))
+        return message_id
+
+    def _call(self, method: str, params: Optional[dict] = None, session: bool = False,
+              timeout: float = 30.0, session_id: Optional[str] = None) -> dict:
+        """Send a DevTools command and wait for its result (events are buffered)"""
+        message_id = self._send(method, params, session_id or (self._session_id if session else None))
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ChromeError(f"Timed out waiting for {method}")
+            try:
+                reply = json.loads(self._ws.recv(timeout=remaining))
+            except TimeoutError:
+                raise ChromeError(f"Timed out waiting for {method}")
+            if reply.get('id') == message_id:
+                if 'error' in reply:
+                    raise ChromeError(f"{method} failed: {reply['error'].get('message')}")
+                return reply.get('result', {})
+            if 'method' in reply:
+                self._events.append(reply)
+
+    def _wait_event(self, method: str, timeout: float = 30.0) -> dict:
+        """Wait for a page event, consuming any already buffered"""
+        deadline = time.monotonic() + timeout
+        while True:
+            for i, event in enumerate(self._events):
+                if event.get('method') == method and event.get('sessionId') == self._session_id:
+                    del self._events[i]
+                    return event.get('params', {})
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ChromeError(f"Timed out waiting for {method}")
+            try:
+                self._events.append(json.loads(self._ws.recv(timeout=remaining)))
+            except TimeoutError:
+                raise ChromeError(f"Timed out waiting for {method}")
+
+    def _open_tab(self) -> Tuple[str, str]:
+        """Open a blank tab with page events enabled; returns (target id, session id)"""
+        target = self._call('Target.createTarget', {'url': 'about:blank'})
+        attached = self._call('Target.attachToTarget', {'targetId': target['targetId'], 'flatten': True})
+        self._call('Page.enable', session_id=attached['sessionId'])
+        return target['targetId'], attached['sessionId']
+
+    def is_healthy(self) -> bool:
+        """Check the process is alive and the browser answers a ping"""
+        if self._tainted or self._process.poll() is not None or self._ws is None:
+            return False
+        try:
+            self._call('Browser.getVersion', timeout=5.0)
+            return True
+        except Exception:
+            return False
+
+    def print_to_pdf(self, html_content: str, output_path: str, timeout: float = 30.0) -> None:
+        """
+        Load HTML into the worker's page and print it to a PDF file
+
+        The document is loaded from a temp file (not setDocumentContent) so that
+        relative and file:// resources such as hoisted stylesheets resolve.
+
+        Args:
+            html_content (str): HTML to print
+            output_path (str): Where to write the PDF
+            timeout (float): Seconds allowed for load + print
+        """
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
+            f.write(html_content)
+            temp_html = f.name
+        try:
+            self.print_file_to_pdf(temp_html, output_path, timeout)
+        finally:
+            if os.path.exists(temp_html):
+                os.unlink(temp_html)
+
+    def print_file_to_pdf(self, html_path: str, output_path: str, timeout: float = 30.0) -> None:
+        """
+        Load an HTML file into the worker's page and print it to a PDF file
+
+        Args:
+            html_path (str): HTML file to print
+            output_path (str): Where to write the PDF
+            timeout (float): Seconds allowed for load + print
+        """
+        self._events.clear()
+        self._call('Page.navigate', {'url': _file_url(html_path)}, session=True, timeout=timeout)
+        self._wait_event('Page.loadEventFired', timeout=timeout)
+        with open(output_path, 'wb') as out:
+            out.write(self._print(timeout))
+
+    def print_files(self, jobs: List[Tuple[str, str]], tabs: int = DEFAULT_BATCH_TABS,
+                    timeout: float = 30.0) -> Iterator[Tuple[int, Optional[Exception]]]:
+        """
+        Print several HTML files in parallel tabs, yielding each result as it completes
+
+        A tab whose document failed or timed out is retired (it may still
+        deliver stale events); a fresh tab is opened if every tab is retired.
+
+        Args:
+            jobs (List[Tuple[str, str]]): (html_path, output_path) pairs
+            tabs (int): Documents printing at once
+            timeout (float): Seconds allowed per document (load + print)
+
+        Yields:
+            Tuple[int, Optional[Exception]]: Job index and None on success, else the error
+
+        Raises:
+            ChromeError: If the browser stops responding
+        """
+        pending = deque(range(len(jobs)))
+        self._events.clear()
+        opened = [self._open_tab() for _ in range(max(0, min(tabs, len(jobs)) - 1))]
+        idle = [self._session_id] + [session_id for _, session_id in opened]
+        active = {}   # session id -> [job index, deadline]
+        replies = {}  # message id -> (session id, job index, command)
+
+        def start(session_id):
+            index = pending.popleft()
+            message_id = self._send('Page.navigate', {'url': _file_url(jobs[index][0])}, session_id)
+            replies[message_id] = (session_id, index, 'navigate')
+            active[session_id] = [index, time.monotonic() + timeout]
+
+        def retire(session_id):
+            del active[session_id]
+            if session_id == self._session_id:
+                # The main page may deliver stale events to later single-document jobs
+                self._tainted = True
+
+        try:
+            while pending or active:
+                while pending and idle:
+                    start(idle.pop())
+                if not active:
+                    # Every tab was retired; nothing is in flight, so a blocking call is safe
+                    opened.append(self._open_tab())
+                    idle.append(opened[-1][1])
+                    continue
+
+                now = time.monotonic()
+                for session_id, (index, deadline) in list(active.items()):
+                    if now >= deadline:
+                        retire(session_id)
+                        yield index, ChromeError(f"Timed out printing {jobs[index][0]}")
+                if not active:
+                    continue
+
+                wait = min(deadline for _, deadline in active.values()) - time.monotonic()
+                try:
+                    message = json.loads(self._ws.recv(timeout=max(wait, 0.01)))
+                except TimeoutError:
+                    continue
+
+                if 'id' in message:
+                    session_id, index, command = replies.pop(message['id'], (None, None, None))
+                    if session_id not in active or active[session_id][0] != index:
+                        continue
+                    error = message.get('error', {}).get('message') or \
+                        message.get('result', {}).get('errorText')
+                    if error:
+                        retire(session_id)
+                        yield index, ChromeError(f"{command} failed for {jobs[index][0]}: {error}")
+                    elif command == 'print':
+                        with open(jobs[index][1], 'wb') as out:
+                            out.write(base64.b64decode(message['result']['data']))
+                        self.jobs += 1
+                        del active[session_id]
+                        idle.append(session_id)
+                        yield index, None
+                elif message.get('method') == 'Page.loadEventFired':
+                    session_id = message.get('sessionId')
+                    if session_id in active:
+                        index = active[session_id][0]
+                        message_id = self._send('Page.printToPDF', PRINT_OPTIONS, session_id)
+                        replies[message_id] = (session_id, index, 'print')
+        finally:
+            for target_id, _ in opened:
+                try:
+                    self._send('Target.closeTarget', {'targetId': target_id})
+                except Exception:
+                    pass
+
+    def print_html_to_bytes(self, html_content: str, timeout: float = 30.0) -> bytes:
+        """
+        Print self-contained HTML to PDF bytes without touching disk
+
+        The HTML is injected with Page.setDocumentContent, so it must not rely
+        on file:// or relative resources (inline hoisted stylesheets first).
+
+        Args:
+            html_content (str): HTML to print
+            timeout (float): Seconds allowed for load + print
+
+        Returns:
+            bytes: PDF document
+        """
+        self._events.clear()
+        frame_tree = self._call('Page.getFrameTree', session=True, timeout=timeout)
+        self._call('Page.setDocumentContent',
+                   {'frameId': frame_tree['frameTree']['frame']['id'], 'html': html_content},
+                   session=True, timeout=timeout)
+        return self._print(timeout)
+
+    def _print(self, timeout: float) -> bytes:
+        """Print the current page and count the job"""
+        result = self._call('Page.printToPDF', PRINT_OPTIONS, session=True, timeout=timeout)
+        self.jobs += 1
+        return base64.b64decode(result['data'])
+
+    def close(self) -> None:
+        """Shut down the browser and remove its profile"""
+        if self._ws is not None:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+            self._ws = None
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        shutil.rmtree(self._profile_dir, ignore_errors=True)
+
+
+class ChromePool:
+    """Bounded pool of long-lived ChromeWorkers"""
+
+    def __init__(self,
+                 size: int = 2,
+                 max_jobs_per_worker: int = 50,
+                 job_timeout: float = 30.0,
+                 chrome_path: Optional[str] = None,
+                 worker_factory: Optional[Callable[[], ChromeWorker]] = None):
+        """
+        Initialize the pool (workers are started lazily)
+
+        Args:
+            size (int): Maximum number of browsers / concurrent print jobs
+            max_jobs_per_worker (int): Recycle a browser after this many documents
+            job_timeout (float): Seconds allowed per document
+            chrome_path (str): Chrome executable (default: auto-detect)
+            worker_factory (callable): Creates a worker (default: ChromeWorker)
+        """
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.job_timeout = job_timeout
+        self.chrome_path = chrome_path or find_chrome_executable()
+        self._custom_factory = worker_factory is not None
+        self._worker_factory = worker_factory or (lambda: ChromeWorker(self.chrome_path))
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._workers = set()
+        self._closed = False
+
+    @property
+    def available(self) -> bool:
+        """Whether the pool can start workers (custom factory, or websockets + Chrome)"""
+        return self._custom_factory or (WEBSOCKETS_AVAILABLE and bool(self.chrome_path))
+
+    def _acquire_worker(self):
+        """Take a healthy idle worker or start a new one"""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                worker = self._worker_factory()
+                with self._lock:
+                    self._workers.add(worker)
+                return worker
+            if worker.is_healthy():
+                return worker
+            logger.warning("Discarding unhealthy Chrome worker")
+            self._discard(worker)
+
+    def _release_worker(self, worker, failed: bool = False) -> None:
+        """Return a worker to the pool, recycling it if spent or broken"""
+        if failed or self._closed or worker.jobs >= self.max_jobs_per_worker:
+            self._discard(worker)
+        else:
+            self._idle.put(worker)
+
+    def _discard(self, worker) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+        try:
+            worker.close()
+        except Exception as e:
+            logger.warning(f"Failed to close Chrome worker: {e}")
+
+    def _run(self, job: Callable[[ChromeWorker], None]) -> None:
+        """Run a job on a pooled worker, retrying once on a fresh worker"""
+        if self._closed:
+            raise ChromeError("Chrome pool is closed")
+        with self._slots:
+            last_error = None
+            for _ in range(2):
+                worker = self._acquire_worker()
+                try:
+                    job(worker)
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"Chrome worker failed, recycling it: {e}")
+                    self._release_worker(worker, failed=True)
+                    continue
+                self._release_worker(worker)
+                return
+            raise ChromeError(f"Chrome print failed: {last_error}")
+
+    def print_to_pdf(self, html_content: str, output_path: str) -> None:
+        """
+        Print HTML to a PDF file on a pooled browser
+
+        Blocks while all workers are busy. A job that fails on a worker is
+        retried once on a fresh worker.
+
+        Args:
+            html_content (str): HTML to print
+            output_path (str): Where to write the PDF
+
+        Raises:
+            ChromeError: If the document could not be printed
+        """
+        self._run(lambda worker: worker.print_to_pdf(html_content, output_path, timeout=self.job_timeout))
+
+    def print_file_to_pdf(self, html_path: str, output_path: str) -> None:
+        """
+        Print an HTML file to a PDF file on a pooled browser
+
+        Args:
+            html_path (str): HTML file to print (relative resources resolve against it)
+            output_path (str): Where to write the PDF
+
+        Raises:
+            ChromeError: If the document could not be printed
+        """
+        self._run(lambda worker: worker.print_file_to_pdf(html_path, output_path, timeout=self.job_timeout))
+
+    def print_to_bytes(self, html_content: str) -> bytes:
+        """
+        Print self-contained HTML to PDF bytes on a pooled browser (no temp files)
+
+        Args:
+            html_content (str): HTML to print (no file:// or relative resources)
+
+        Returns:
+            bytes: PDF document
+
+        Raises:
+            ChromeError: If the document could not be printed
+        """
+        output = []
+        self._run(lambda worker: output.append(worker.print_html_to_bytes(html_content,
+                                                                           timeout=self.job_timeout)))
+        return output[-1]
+
+    def print_batch(self, jobs: Iterable[Tuple[str, str]],
+                    tabs: int = DEFAULT_BATCH_TABS) -> Iterator[Tuple[str, str, Optional[Exception]]]:
+        """
+        Print a batch of HTML files in one browser session, streaming results
+
+        The whole batch runs on a single pooled browser (several documents at
+        a time in separate tabs) instead of one browser per file. If the
+        browser dies, the documents not yet printed are retried once on a
+        fresh browser.
+
+        Args:
+            jobs (Iterable[Tuple[str, str]]): (html_path, output_path) pairs
+            tabs (int): Documents printing at once
+
+        Yields:
+            Tuple[str, str, Optional[Exception]]: html_path, output_path and
+            None on success or the error, in completion order
+        """
+        if self._closed:
+            raise ChromeError("Chrome pool is closed")
+        jobs = list(jobs)
+        remaining = list(range(len(jobs)))
+        last_error = None
+        with self._slots:
+            for _ in range(2):
+                if not remaining:
+                    return
+                batch = [jobs[i] for i in remaining]
+                done = set()
+                worker = self._acquire_worker()
+                try:
+                    for position, error in worker.print_files(batch, tabs, timeout=self.job_timeout):
+                        done.add(position)
+                        yield batch[position][0], batch[position][1], error
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"Chrome worker failed during batch, recycling it: {e}")
+                    self._release_worker(worker, failed=True)
+                    remaining = [remaining[p] for p in range(len(batch)) if p not in done]
+                    continue
+                except BaseException:
+                    # Consumer stopped early; tabs may still be printing
+                    self._release_worker(worker, failed=True)
+                    raise
+                self._release_worker(worker)
+                return
+        for i in remaining:
+            yield jobs[i][0], jobs[i][1], ChromeError(f"Chrome batch failed: {last_error}")
+
+    def close(self) -> None:
+        """Shut down every browser in the pool"""
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            try:
+                worker.close()
+            except Exception:
+                pass
+
+
+# Global pool instance (created on first use)
+_chrome_pool = None
+_chrome_pool_lock = threading.Lock()
+
+
+def get_chrome_pool() -> ChromePool:
+    """
+    Get the global Chrome pool instance
+
+    Returns:
+        ChromePool: Global Chrome pool
+    """
+    global _chrome_pool
+    with _chrome_pool_lock:
+        if _chrome_pool is None:
+            _chrome_pool = ChromePool()
+            atexit.register(_chrome_pool.close)
+        return _chrome_pool
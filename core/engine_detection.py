@@ -0,0 +1,138 @@
+"""
+Process-level PDF engine discovery
+Finds the available PDF engines once per process and caches the result, so
+creating a PDFGenerator per document costs no filesystem probing or imports.
+
+Python engines are detected with importlib.util.find_spec (nothing is imported
+until the engine is actually used); external executables are resolved once
+and their paths cached. Call refresh_engines() after installing an engine.
+"""
+
+import importlib.util
+import logging
+import os
+import shutil
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Chrome/Chromium executables, in order of preference
+CHROME_CANDIDATES = [
+    'google-chrome',
+    'chrome',
+    'chromium',
+    'chromium-browser',
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+]
+
+WKHTMLTOPDF_CANDIDATES = [
+    'wkhtmltopdf',
+    r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe",
+]
+
+# Python-backed engines and the module that provides them, in order of preference
+ENGINE_MODULES = [
+    ('pdfkit', 'pdfkit'),
+    ('weasyprint', 'weasyprint'),
+    ('reportlab', 'reportlab'),
+    ('xhtml2pdf', 'xhtml2pdf'),
+]
+
+_capabilities: Optional[Dict] = None
+_lock = threading.Lock()
+
+
+def _find_executable(candidates: List[str]) -> Optional[str]:
+    """Resolve the first existing executable from a candidate list"""
+    for candidate in candidates:
+        path = candidate if os.path.isabs(candidate) else shutil.which(candidate)
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+def _module_available(module_name: str) -> bool:
+    """Check a module is installed without importing it"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _probe() -> Dict:
+    """Probe the environment for engines and executables"""
+    chrome_path = _find_executable(CHROME_CANDIDATES)
+    engines = ['chrome'] if chrome_path else []
+    engines += [engine for engine, module_name in ENGINE_MODULES if _module_available(module_name)]
+    return {
+        'engines': engines,
+        'chrome_path': chrome_path,
+        'wkhtmltopdf_path': _find_executable(WKHTMLTOPDF_CANDIDATES),
+    }
+
+
+def get_engine_capabilities(refresh: bool = False) -> Dict:
+    """
+    Get the cached engine capabilities, probing on first use
+
+    Args:
+        refresh (bool): Probe the environment again
+
+    Returns:
+        Dict: {'engines': [...], 'chrome_path': str|None, 'wkhtmltopdf_path': str|None}
+    """
+    global _capabilities
+    with _lock:
+        if _capabilities is None or refresh:
+            probed = _probe()
+            _capabilities = {**probed, 'engines': list(probed['engines'])}
+            logger.info(f"Detected PDF engines: {_capabilities['engines']}")
+        return {**_capabilities, 'engines': list(_capabilities['engines'])}
+
+
+def detect_engines(refresh: bool = False) -> List[str]:
+    """
+    Get the available PDF engines, best first
+
+    Args:
+        refresh (bool): Probe the environment again
+
+    Returns:
+        List[str]: Engine names
+    """
+    return get_engine_capabilities(refresh)['engines']
+
+
+def find_chrome_executable(refresh: bool = False) -> Optional[str]:
+    """
+    Get the cached Chrome/Chromium executable path
+
+    Returns:
+        Optional[str]: Path or None if not installed
+    """
+    return get_engine_capabilities(refresh)['chrome_path']
+
+
+def refresh_engines() -> List[str]:
+    """
+    Discard cached detection results and probe again
+
+    Returns:
+        List[str]: Engine names
+    """
+    return detect_engines(refresh=True)
+
+
+def mark_engine_unavailable(engine: str) -> None:
+    """
+    Drop an engine that is installed but failed to load (e.g. missing native libraries)
+
+    Args:
+        engine (str): Engine name
+    """
+    with _lock:
+        if _capabilities is not None and engine in _capabilities['engines']:
+            _capabilities['engines'].remove(engine)
+            logger.warning(f"PDF engine {engine} failed to load; disabled until refresh_engines()")
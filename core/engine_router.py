@@ -0,0 +1,228 @@
+"""
+Adaptive PDF engine routing
+Records per-engine latency (EWMA) and failures for each route (template and
+orientation), opens a circuit breaker on engines that keep failing, and orders
+engines so each document goes to the fastest engine that meets the configured
+fidelity tier.
+
+Fidelity tiers (best first):
+    exact  - full CSS print layout (chrome, weasyprint)
+    good   - WebKit layout, older CSS support (pdfkit)
+    basic  - limited CSS subset (xhtml2pdf)
+    text   - text and tables only (reportlab)
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FIDELITY_TIERS = ["text", "basic", "good", "exact"]
+
+ENGINE_FIDELITY = {
+    "chrome": "exact",
+    "weasyprint": "exact",
+    "pdfkit": "good",
+    "xhtml2pdf": "basic",
+    "reportlab": "text",
+}
+
+
+def _tier_rank(tier: str) -> int:
+    return FIDELITY_TIERS.index(tier) if tier in FIDELITY_TIERS else 0
+
+
+class _Circuit:
+    """Consecutive-failure circuit breaker for one engine"""
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_at = None
+
+    def is_open(self) -> bool:
+        """Whether the circuit is open (including half-open, waiting for a trial result)"""
+        return self.opened_at is not None
+
+    def admit(self, cooldown: float) -> bool:
+        """
+        Decide whether one caller may use the engine
+
+        Closed circuits admit everyone. Open circuits refuse traffic until the
+        cooldown passes; then they are half-open and admit a single trial at a
+        time. A trial whose result is never recorded (an earlier engine in the
+        order succeeded) expires after another cooldown.
+
+        Args:
+            cooldown (float): Seconds before a trial (and before a lost trial expires)
+
+        Returns:
+            bool: True if the caller may route to the engine
+        """
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < cooldown:
+            return False
+        if self.trial_at is not None and now - self.trial_at < cooldown:
+            return False
+        self.trial_at = now
+        return True
+
+
+class EngineRouter:
+    """Orders PDF engines by measured latency, fidelity and health"""
+
+    def __init__(self,
+                 min_fidelity: str = "exact",
+                 failure_threshold: int = 3,
+                 cooldown: float = 60.0,
+                 alpha: float = 0.3):
+        """
+        Initialize the router
+
+        Args:
+            min_fidelity (str): Lowest acceptable tier while a qualifying engine is healthy
+            failure_threshold (int): Consecutive failures that open an engine's circuit
+            cooldown (float): Seconds an open circuit rejects traffic before admitting one trial run
+            alpha (float): EWMA smoothing factor for latency
+        """
+        self.min_fidelity = min_fidelity
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self._latency: Dict[str, Dict[str, float]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def order(self, engines: List[str], route: str = "default",
+              min_fidelity: Optional[str] = None, log: bool = True) -> List[str]:
+        """
+        Order engines for a route: healthy engines meeting the fidelity tier
+        first (unmeasured ones first so they get measured, then fastest), then
+        healthy lower-tier engines by fidelity, then engines with open circuits.
+        A half-open engine counts as healthy for only one caller (its trial).
+
+        Args:
+            engines (List[str]): Available engines in static preference order
+            route (str): Route key, e.g. "first_page/landscape"
+            min_fidelity (str): Override the router's minimum tier
+            log (bool): Log the routing decision
+
+        Returns:
+            List[str]: Engines in the order they should be tried
+        """
+        min_rank = _tier_rank(min_fidelity or self.min_fidelity)
+        with self._lock:
+            latency = self._latency.get(route, {})
+            healthy = [e for e in engines if self._circuit(e).admit(self.cooldown)]
+            tripped = [e for e in engines if e not in healthy]
+
+        qualifying = [e for e in healthy if _tier_rank(ENGINE_FIDELITY.get(e, "text")) >= min_rank]
+        unmeasured = [e for e in qualifying if e not in latency]
+        measured = sorted((e for e in qualifying if e in latency), key=lambda e: latency[e])
+        degraded = sorted((e for e in healthy if e not in qualifying),
+                          key=lambda e: -_tier_rank(ENGINE_FIDELITY.get(e, "text")))
+        ordered = unmeasured + measured + degraded + tripped
+
+        if ordered and log:
+            reason = "unmeasured" if ordered[0] in unmeasured else (
+                f"ewma {latency[ordered[0]]:.2f}s" if ordered[0] in latency else "degraded fidelity")
+            logger.info(f"Engine route {route}: {ordered[0]} ({reason}); order {ordered}"
+                        + (f"; circuit open: {tripped}" if tripped else ""))
+        return ordered
+
+    def record(self, engine: str, route: str, seconds: float, ok: bool) -> None:
+        """
+        Record the outcome of one conversion
+
+        Args:
+            engine (str): Engine used
+            route (str): Route key
+            seconds (float): Wall time of the attempt
+            ok (bool): Whether a PDF was produced
+        """
+        with self._lock:
+            counts = self._counts.setdefault(engine, {"ok": 0, "failed": 0})
+            circuit = self._circuit(engine)
+            if ok:
+                counts["ok"] += 1
+                route_latency = self._latency.setdefault(route, {})
+                previous = route_latency.get(engine)
+                route_latency[engine] = seconds if previous is None else (
+                    self.alpha * seconds + (1 - self.alpha) * previous)
+                if circuit.opened_at is not None:
+                    logger.info(f"Engine {engine} recovered; closing circuit")
+                circuit.failures = 0
+                circuit.opened_at = None
+                circuit.trial_at = None
+            else:
+                counts["failed"] += 1
+                circuit.failures += 1
+                if circuit.failures >= self.failure_threshold:
+                    if circuit.opened_at is None:
+                        logger.warning(f"Engine {engine} failed {circuit.failures} times in a row; "
+                                       f"opening circuit for {self.cooldown:.0f}s")
+                    # A failed half-open trial re-opens the circuit for a full cooldown
+                    circuit.opened_at = time.monotonic()
+                    circuit.trial_at = None
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Get per-engine statistics
+
+        Returns:
+            Dict[str, Dict]: {engine: {ok, failed, error_rate, circuit_open, latency: {route: ewma}}}
+        """
+        with self._lock:
+            stats = {}
+            for engine in set(self._counts) | set(self._circuits):
+                counts = self._counts.get(engine, {"ok": 0, "failed": 0})
+                total = counts["ok"] + counts["failed"]
+                stats[engine] = {
+                    **counts,
+                    "error_rate": counts["failed"] / total if total else 0.0,
+                    "circuit_open": self._circuit(engine).is_open(),
+                    "latency": {route: values[engine] for route, values in self._latency.items()
+                                if engine in values},
+                }
+            return stats
+
+    def reset(self) -> None:
+        """Forget all measurements and close every circuit"""
+        with self._lock:
+            self._latency.clear()
+            self._counts.clear()
+            self._circuits.clear()
+
+    def _circuit(self, engine: str) -> _Circuit:
+        return self._circuits.setdefault(engine, _Circuit())
+
+
+# Global router instance (created on first use)
+_engine_router = None
+_engine_router_lock = threading.Lock()
+
+
+def get_engine_router() -> EngineRouter:
+    """
+    Get the global engine router instance
+
+    The "pdf.min_fidelity" setting configures the fidelity tier.
+
+    Returns:
+        EngineRouter: Global engine router
+    """
+    global _engine_router
+    with _engine_router_lock:
+        if _engine_router is None:
+            try:
+                from config.settings import get_setting
+                min_fidelity = get_setting("pdf.min_fidelity", "exact")
+            except ImportError:
+                min_fidelity = "exact"
+            _engine_router = EngineRouter(min_fidelity=min_fidelity)
+        return _engine_router
@@ -0,0 +1,272 @@
+"""
+Asyncio subprocess layer for external PDF engines (Chrome, wkhtmltopdf)
+All engine processes are started and supervised by one background event loop,
+so neither blocking nor async callers tie up a thread per running engine:
+
+- every engine runs in its own process group, and a timeout or cancellation
+  kills the whole group (Chrome leaves renderer/GPU children behind otherwise);
+- each engine has a bounded semaphore, so a burst of slow Chrome jobs queues
+  on its own limit and never delays wkhtmltopdf jobs (or vice versa);
+- jobs can be tagged with a group (e.g. a session id) and cancelled together,
+  for instance when the user navigates away.
+
+    result = get_engine_runner().run("chrome", cmd, timeout=30, group=session_id)
+    result = await get_engine_runner().arun("pdfkit", cmd, timeout=60, stdin_data=html)
+    get_engine_runner().cancel(session_id)
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+from typing import Dict, NamedTuple, Optional, Sequence, Set
+
+try:
+    from config.settings import get_setting
+except ImportError:
+    get_setting = None
+
+logger = logging.getLogger(__name__)
+
+# Default per-engine limit is min(MAX_ENGINE_PROCESSES, CPU count)
+MAX_ENGINE_PROCESSES = 4
+# Seconds between SIGTERM and SIGKILL when stopping an engine
+KILL_GRACE_SECONDS = 2.0
+
+
+class EngineResult(NamedTuple):
+    """Outcome of an engine process"""
+    returncode: int
+    stdout: bytes
+    stderr: str
+
+
+class EngineTimeoutError(asyncio.TimeoutError):
+    """An engine process exceeded its timeout and was killed"""
+
+
+def engine_process_limit(engine: str) -> int:
+    """
+    Get the number of concurrent processes allowed for an engine
+
+    The "performance.engine_process_limits" setting ({engine: limit}) overrides the default.
+
+    Args:
+        engine (str): Engine name, e.g. "chrome"
+
+    Returns:
+        int: Limit (at least 1)
+    """
+    limits = get_setting("performance.engine_process_limits") if get_setting else None
+    if limits and limits.get(engine):
+        return max(1, int(limits[engine]))
+    return min(MAX_ENGINE_PROCESSES, os.cpu_count() or 1)
+
+
+def _kill_process_group(proc, sig) -> None:
+    """Signal an engine and every process it spawned"""
+    if proc.returncode is not None:
+        return
+    try:
+        if sys.platform == "win32":
+            proc.kill()
+        else:
+            os.killpg(proc.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class EngineProcessRunner:
+    """Runs external engine commands on a dedicated event loop thread"""
+
+    def __init__(self):
+        """Initialize the runner (the loop thread starts on first use)"""
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._groups: Dict[str, Set[concurrent.futures.Future]] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def serve():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=serve, name="engine-subprocess", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+                self._semaphores.clear()
+            return self._loop
+
+    def _semaphore(self, engine: str) -> asyncio.Semaphore:
+        # Only called on the runner loop, so no locking is needed
+        if engine not in self._semaphores:
+            self._semaphores[engine] = asyncio.Semaphore(engine_process_limit(engine))
+        return self._semaphores[engine]
+
+    async def _execute(self, engine: str, cmd: Sequence[str], timeout: float,
+                       stdin_data: Optional[bytes]) -> EngineResult:
+        async with self._semaphore(engine):
+            kwargs = {}
+            if sys.platform == "win32":
+                kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+            else:
+                kwargs["start_new_session"] = True
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE if stdin_data is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                **kwargs
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(stdin_data), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"{engine} exceeded {timeout}s; killing its process group")
+                raise EngineTimeoutError(f"{engine} timed out after {timeout}s") from None
+            finally:
+                if proc.returncode is None:
+                    # Timed out or cancelled: stop the whole group, forcefully if it lingers
+                    _kill_process_group(proc, signal.SIGTERM)
+                    try:
+                        await asyncio.wait_for(asyncio.shield(proc.wait()), KILL_GRACE_SECONDS)
+                    except asyncio.TimeoutError:
+                        _kill_process_group(proc, getattr(signal, "SIGKILL", signal.SIGTERM))
+                        await proc.wait()
+            return EngineResult(proc.returncode, stdout, stderr.decode(errors="replace"))
+
+    def submit(self, engine: str, cmd: Sequence[str], timeout: float, stdin_data: Optional[bytes] = None,
+               group: Optional[str] = None) -> concurrent.futures.Future:
+        """
+        Start an engine command without waiting for it
+
+        Args:
+            engine (str): Engine name (selects the concurrency limit)
+            cmd (Sequence[str]): Command line
+            timeout (float): Seconds before the process group is killed
+            stdin_data (bytes): Data written to the engine's stdin
+            group (str): Cancellation group, see cancel()
+
+        Returns:
+            concurrent.futures.Future: Resolves to an EngineResult; cancelling it kills the engine
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._execute(engine, list(cmd), timeout, stdin_data), self._ensure_loop()
+        )
+        if group is not None:
+            with self._lock:
+                self._groups.setdefault(group, set()).add(future)
+            future.add_done_callback(lambda done: self._forget(group, done))
+        return future
+
+    def _forget(self, group: str, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            futures = self._groups.get(group)
+            if futures is not None:
+                futures.discard(future)
+                if not futures:
+                    del self._groups[group]
+
+    def run(self, engine: str, cmd: Sequence[str], timeout: float, stdin_data: Optional[bytes] = None,
+            group: Optional[str] = None) -> EngineResult:
+        """
+        Run an engine command and wait for it (blocking callers)
+
+        Args:
+            See submit()
+
+        Returns:
+            EngineResult: Exit status and output
+
+        Raises:
+            EngineTimeoutError: The engine was killed after the timeout
+            concurrent.futures.CancelledError: The job was cancelled
+        """
+        future = self.submit(engine, cmd, timeout, stdin_data, group)
+        try:
+            return future.result()
+        except BaseException:
+            # The caller was interrupted: do not leave the engine running
+            future.cancel()
+            raise
+
+    async def arun(self, engine: str, cmd: Sequence[str], timeout: float, stdin_data: Optional[bytes] = None,
+                   group: Optional[str] = None) -> EngineResult:
+        """
+        Run an engine command from any event loop
+
+        Cancelling the awaiting task kills the engine.
+
+        Args:
+            See submit()
+
+        Returns:
+            EngineResult: Exit status and output
+        """
+        return await asyncio.wrap_future(self.submit(engine, cmd, timeout, stdin_data, group))
+
+    def cancel(self, group: str) -> int:
+        """
+        Cancel all running and queued jobs of a group
+
+        Args:
+            group (str): Group passed to submit()/run()/arun()
+
+        Returns:
+            int: Number of jobs cancelled
+        """
+        with self._lock:
+            futures = list(self._groups.get(group, ()))
+        return sum(1 for future in futures if future.cancel())
+
+    def shutdown(self) -> None:
+        """Cancel every job and stop the loop thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            futures = [future for group in self._groups.values() for future in group]
+            self._loop = self._thread = None
+        for future in futures:
+            future.cancel()
+        if loop is None:
+            return
+
+        async def drain():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(drain(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+# Global runner instance (created on first use)
+_engine_runner = None
+_engine_runner_lock = threading.Lock()
+
+
+def get_engine_runner() -> EngineProcessRunner:
+    """
+    Get the global engine process runner
+
+    Returns:
+        EngineProcessRunner: Global runner
+    """
+    global _engine_runner
+    with _engine_runner_lock:
+        if _engine_runner is None:
+            _engine_runner = EngineProcessRunner()
+        return _engine_runner
@@ -0,0 +1,252 @@
+"""
+Engine-specific HTML/CSS variants for the fallback PDF engines
+The templates are written for Chrome: zoom/transform resets, vendor-prefixed
+print properties, :nth-child width pins and !important everywhere. xhtml2pdf
+parses all of it, understands little of it, and the pins it half-applies fight
+the inline column widths; ReportLab's fallback only reads the document's text
+and never looks at CSS at all.
+
+Before those engines convert a document, its stylesheets are reduced to what
+the engine supports (or dropped, for ReportLab). The reduced CSS is cached by
+engine and stylesheet digest, i.e. computed once per template version; only
+the cheap substitution of the blocks runs per document.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import FrozenSet, NamedTuple, Optional, Tuple
+
+try:
+    from config.settings import get_setting
+except ImportError:
+    get_setting = None
+
+# Bump when the profiles change
+VARIANT_VERSION = "1"
+
+_STYLE_RE = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.IGNORECASE | re.DOTALL)
+_LINK_RE = re.compile(r"<link\b[^>]*\brel=[\"']?stylesheet[^>]*>", re.IGNORECASE)
+_SCRIPT_RE = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+_HTML_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+# Declaration separators outside url(...)/quoted values
+_DECLARATION_SPLIT_RE = re.compile(r";(?![^(]*\))")
+_IMPORTANT_RE = re.compile(r"\s*!\s*important", re.IGNORECASE)
+
+
+class CSSProfile(NamedTuple):
+    """What an engine does not understand"""
+    drop_properties: FrozenSet[str]
+    drop_prefixes: Tuple[str, ...]
+    drop_selectors: Tuple[str, ...]
+    drop_at_rules: Tuple[str, ...]
+    strip_important: bool
+
+
+# Engine -> CSS profile; None drops all CSS (the engine ignores it anyway)
+ENGINE_PROFILES = {
+    "xhtml2pdf": CSSProfile(
+        drop_properties=frozenset({
+            "zoom", "transform", "transform-origin", "box-sizing", "print-color-adjust",
+            "text-size-adjust", "min-width", "max-width", "min-height", "overflow", "overflow-x",
+            "overflow-y", "word-wrap", "overflow-wrap", "table-layout",
+        }),
+        drop_prefixes=("-webkit-", "-moz-", "-ms-"),
+        drop_selectors=(":nth-child", ":nth-of-type", ":not(", "::"),
+        drop_at_rules=("@font-face", "@media screen"),
+        strip_important=True,
+    ),
+    "reportlab": None,
+}
+
+
+def variants_enabled(engine: str) -> bool:
+    """
+    Check whether an engine gets a simplified variant
+
+    The "pdf.engine_variants" setting switches variants off for all engines.
+
+    Args:
+        engine (str): Engine name
+
+    Returns:
+        bool: True if documents are simplified for the engine
+    """
+    enabled = get_setting("pdf.engine_variants", True) if get_setting else True
+    return bool(enabled) and engine in ENGINE_PROFILES
+
+
+def _matching_brace(css: str, start: int) -> int:
+    """Index of the "}" closing the block opened at css[start]"""
+    depth = 0
+    for index in range(start, len(css)):
+        if css[index] == "{":
+            depth += 1
+        elif css[index] == "}":
+            depth -= 1
+            if depth == 0:
+                return index
+    return len(css)
+
+
+def _declarations(body: str, profile: CSSProfile) -> str:
+    kept = []
+    for declaration in _DECLARATION_SPLIT_RE.split(body):
+        name, sep, value = declaration.partition(":")
+        name = name.strip().lower()
+        if not sep or not name:
+            continue
+        if name in profile.drop_properties or name.startswith(profile.drop_prefixes):
+            continue
+        value = value.strip()
+        if profile.strip_important:
+            value = _IMPORTANT_RE.sub("", value)
+        kept.append(f"{name}:{value}")
+    return ";".join(kept)
+
+
+def simplify_css(css: str, profile: CSSProfile) -> str:
+    """
+    Reduce a stylesheet to the declarations an engine supports
+
+    Args:
+        css (str): Stylesheet text
+        profile (CSSProfile): The engine's profile
+
+    Returns:
+        str: Minified stylesheet without unsupported rules, selectors and declarations
+    """
+    css = _CSS_COMMENT_RE.sub("", css)
+    rules = []
+    position = 0
+    while True:
+        brace = css.find("{", position)
+        if brace == -1:
+            break
+        end = _matching_brace(css, brace)
+        prelude = " ".join(css[position:brace].split())
+        body = css[brace + 1:end]
+        position = end + 1
+        lowered = prelude.lower()
+
+        if lowered.startswith(profile.drop_at_rules):
+            continue
+        if lowered.startswith("@media"):
+            inner = simplify_css(body, profile)
+            if inner:
+                rules.append(f"{prelude}{{{inner}}}")
+            continue
+        if not lowered.startswith("@"):
+            selectors = [s.strip() for s in prelude.split(",")
+                         if s.strip() and not any(token in s for token in profile.drop_selectors)]
+            if not selectors:
+                continue
+            prelude = ",".join(selectors)
+        declarations = _declarations(body, profile)
+        if declarations:
+            rules.append(f"{prelude}{{{declarations}}}")
+    return "".join(rules)
+
+
+class EngineVariantCache:
+    """Simplified stylesheets per (engine, stylesheet digest), least recently used evicted first"""
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries (int): Stylesheets kept across all engines
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def css_for(self, engine: str, css: str) -> str:
+        """
+        Get the engine's variant of a stylesheet, computing it on first use
+
+        Args:
+            engine (str): Engine name (must have a profile)
+            css (str): Stylesheet text
+
+        Returns:
+            str: Simplified stylesheet
+        """
+        key = (engine, VARIANT_VERSION, hashlib.sha256(css.encode("utf-8")).hexdigest())
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        simplified = simplify_css(css, ENGINE_PROFILES[engine])
+        with self._lock:
+            self._entries[key] = simplified
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return simplified
+
+    def html_for(self, engine: str, html_content: str) -> str:
+        """
+        Get the engine's variant of a document
+
+        Args:
+            engine (str): Engine name
+            html_content (str): Rendered HTML with inline <style> blocks
+
+        Returns:
+            str: HTML for the engine (unchanged for engines without a profile)
+        """
+        if engine not in ENGINE_PROFILES:
+            return html_content
+        if ENGINE_PROFILES[engine] is None:
+            html_content = _STYLE_RE.sub("", html_content)
+            html_content = _LINK_RE.sub("", html_content)
+            html_content = _SCRIPT_RE.sub("", html_content)
+            return _HTML_COMMENT_RE.sub("", html_content)
+
+        def _replace(match):
+            return f"{match.group(1)}{self.css_for(engine, match.group(2))}{match.group(3)}"
+
+        return _STYLE_RE.sub(_replace, html_content)
+
+    def clear(self) -> None:
+        """Drop all cached variants"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global variant cache instance
+_variant_cache: Optional[EngineVariantCache] = None
+_variant_cache_lock = threading.Lock()
+
+
+def get_variant_cache() -> EngineVariantCache:
+    """Get the global engine variant cache instance"""
+    global _variant_cache
+    with _variant_cache_lock:
+        if _variant_cache is None:
+            _variant_cache = EngineVariantCache()
+        return _variant_cache
+
+
+def engine_variant(html_content: str, engine: str) -> str:
+    """
+    Prepare a document for an engine (no-op when variants are disabled or the engine has no profile)
+
+    Args:
+        html_content (str): Rendered HTML
+        engine (str): Engine about to convert it
+
+    Returns:
+        str: HTML for the engine
+    """
+    if not variants_enabled(engine):
+        return html_content
+    return get_variant_cache().html_for(engine, html_content)
@@ -0,0 +1,230 @@
+"""
+Bundled metric-compatible fonts for the PDF engines
+The templates ask for Calibri, Arial and Times New Roman, which Linux hosts do
+not have. Without them every Chrome/WeasyPrint run goes through fontconfig
+fallback resolution and picks whatever substitute happens to be installed, so
+line breaks (and page breaks) differ between hosts.
+
+assets/fonts holds metric-compatible replacements (Carlito for Calibri,
+Liberation Sans/Serif for Arial/Times New Roman) plus a fonts.conf that maps
+the template families onto them. The fonts are collected from the distro
+packages (fonts-crosextra-carlito, fonts-liberation) and the fontconfig cache
+is built once at image build time (python scripts/build_font_cache.py), so
+resolution costs nothing at render time; entry points then call
+configure_fontconfig() at startup. Rendered HTML also gets @font-face
+rules for the same files, which engines apply without consulting fontconfig.
+"""
+
+import glob
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FONT_DIR = str(Path(__file__).resolve().parent.parent / "assets" / "fonts")
+
+# Template family -> bundled files per (weight, style)
+BUNDLED_FONTS: Dict[str, Dict[tuple, str]] = {
+    "Calibri": {
+        ("normal", "normal"): "Carlito-Regular.ttf",
+        ("bold", "normal"): "Carlito-Bold.ttf",
+        ("normal", "italic"): "Carlito-Italic.ttf",
+        ("bold", "italic"): "Carlito-BoldItalic.ttf",
+    },
+    "Arial": {
+        ("normal", "normal"): "LiberationSans-Regular.ttf",
+        ("bold", "normal"): "LiberationSans-Bold.ttf",
+        ("normal", "italic"): "LiberationSans-Italic.ttf",
+        ("bold", "italic"): "LiberationSans-BoldItalic.ttf",
+    },
+    "Times New Roman": {
+        ("normal", "normal"): "LiberationSerif-Regular.ttf",
+        ("bold", "normal"): "LiberationSerif-Bold.ttf",
+        ("normal", "italic"): "LiberationSerif-Italic.ttf",
+        ("bold", "italic"): "LiberationSerif-BoldItalic.ttf",
+    },
+}
+
+# Where the distro packages install the fonts
+SYSTEM_FONT_DIRS = ["/usr/share/fonts", "/usr/local/share/fonts"]
+
+_font_face_css: Optional[str] = None
+_configured: Optional[bool] = None
+_lock = threading.Lock()
+
+
+def bundled_files(font_dir: Optional[str] = None) -> List[str]:
+    """
+    Get the bundled font files that are present
+
+    Args:
+        font_dir (str): Bundle directory (default: FONT_DIR)
+
+    Returns:
+        List[str]: Absolute paths
+    """
+    font_dir = font_dir or FONT_DIR
+    names = {name for faces in BUNDLED_FONTS.values() for name in faces.values()}
+    return sorted(os.path.join(font_dir, name) for name in names if os.path.exists(os.path.join(font_dir, name)))
+
+
+def bundle_signature() -> List[str]:
+    """Names of the bundled fonts present (part of cache keys: adding fonts changes layout)"""
+    return [os.path.basename(path) for path in bundled_files()]
+
+
+def collect_system_fonts(font_dir: Optional[str] = None) -> int:
+    """
+    Copy the bundle's fonts from the system font directories into the bundle
+
+    Args:
+        font_dir (str): Bundle directory (default: FONT_DIR)
+
+    Returns:
+        int: Number of files copied
+    """
+    font_dir = font_dir or FONT_DIR
+    copied = 0
+    for faces in BUNDLED_FONTS.values():
+        for name in faces.values():
+            target = os.path.join(font_dir, name)
+            if os.path.exists(target):
+                continue
+            for root in SYSTEM_FONT_DIRS:
+                matches = glob.glob(os.path.join(root, "**", name), recursive=True)
+                if matches:
+                    shutil.copyfile(matches[0], target)
+                    copied += 1
+                    break
+    return copied
+
+
+def build_font_cache(font_dir: Optional[str] = None) -> bool:
+    """
+    Build the fontconfig cache for the bundle (run at image build time)
+
+    Args:
+        font_dir (str): Bundle directory (default: FONT_DIR)
+
+    Returns:
+        bool: True if fc-cache succeeded
+    """
+    font_dir = font_dir or FONT_DIR
+    fc_cache = shutil.which("fc-cache")
+    if fc_cache is None:
+        logger.warning("fc-cache not found; font cache not built")
+        return False
+    env = dict(os.environ, FONTCONFIG_FILE=os.path.join(font_dir, "fonts.conf"))
+    result = subprocess.run([fc_cache, "-f", font_dir], env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        logger.warning(f"fc-cache failed: {result.stderr}")
+    return result.returncode == 0
+
+
+def configure_fontconfig(collect: bool = False) -> bool:
+    """
+    Point fontconfig (Chrome, wkhtmltopdf, WeasyPrint) at the bundle's fonts.conf
+
+    Called explicitly by the entry points (apps, render-service workers), never
+    on import: it changes the process environment. It must run before an
+    engine loads fontconfig; engine subprocesses inherit the environment. An
+    explicit FONTCONFIG_FILE is left alone, and the outcome is remembered for
+    the process.
+
+    Args:
+        collect (bool): Copy missing fonts from the system font directories
+            first, for hosts without an image build step (e.g. Streamlit
+            Cloud, packages.txt)
+
+    Returns:
+        bool: True if the bundle configuration is active
+    """
+    global _configured
+    with _lock:
+        if _configured is not None:
+            return _configured
+    configured = _activate_bundle(collect)
+    with _lock:
+        _configured = configured
+    return configured
+
+
+def _activate_bundle(collect: bool) -> bool:
+    if not bundled_files():
+        if not collect:
+            return False
+        try:
+            if not collect_system_fonts():
+                return False
+        except OSError as e:
+            logger.warning(f"Could not collect bundled fonts: {e}")
+            return False
+        reset()
+    fonts_conf = os.path.join(FONT_DIR, "fonts.conf")
+    if os.environ.get("FONTCONFIG_FILE") not in (None, fonts_conf):
+        return False
+    os.environ["FONTCONFIG_FILE"] = fonts_conf
+    return True
+
+
+def font_face_css() -> str:
+    """
+    Get @font-face rules binding the template families to the bundled files
+
+    local() comes first, so hosts that have the real fonts keep using them.
+
+    Returns:
+        str: CSS (empty when no bundled fonts are present)
+    """
+    global _font_face_css
+    with _lock:
+        if _font_face_css is None:
+            rules = []
+            for family, faces in BUNDLED_FONTS.items():
+                for (weight, style), name in faces.items():
+                    path = os.path.join(FONT_DIR, name)
+                    if not os.path.exists(path):
+                        continue
+                    rules.append(
+                        f"@font-face{{font-family:'{family}';font-weight:{weight};font-style:{style};"
+                        f"src:local('{family}'),url('{Path(path).as_uri()}') format('truetype')}}"
+                    )
+            _font_face_css = "".join(rules)
+        return _font_face_css
+
+
+def inject_font_faces(html_content: str) -> str:
+    """
+    Add the bundle's @font-face rules to a rendered document
+
+    The rules go into a <style> block ahead of the template's own styles, so
+    optimize_html() hoists them into the shared stylesheet with the rest.
+
+    Args:
+        html_content (str): Rendered HTML
+
+    Returns:
+        str: HTML with the font rules (unchanged when no fonts are bundled)
+    """
+    css = font_face_css()
+    if not css:
+        return html_content
+    block = f"<style>{css}</style>"
+    lowered = html_content.lower()
+    for marker in ("<style", "</head>"):
+        index = lowered.find(marker)
+        if index != -1:
+            return html_content[:index] + block + html_content[index:]
+    return block + html_content
+
+
+def reset() -> None:
+    """Forget the cached CSS (after fonts are added to the bundle)"""
+    global _font_face_css
+    with _lock:
+        _font_face_css = None
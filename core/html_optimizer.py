@@ -0,0 +1,304 @@
+"""
+Render-time HTML optimization for generated documents
+Minifies rendered HTML and hoists inline <style> blocks into cached external
+stylesheets, leaving the source templates untouched.
+
+Every render of a template carries the same (large) <style> block. Hoisting
+it into a content-addressed stylesheet means the CSS is written to disk once
+per unique block and parsed once by engines that can reuse a parsed sheet
+(see PDFGenerator.html_to_pdf_weasyprint).
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Attribute used to tag <link> elements produced by hoist_styles()
+SHARED_CSS_ATTR = "data-shared-css"
+
+_STYLE_RE = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_SHARED_LINK_RE = re.compile(
+    r'<link\b[^>]*\b' + SHARED_CSS_ATTR + r'="([0-9a-f]+)"[^>]*>', re.IGNORECASE
+)
+_RAW_TEXT_TAGS = ("textarea", "script")
+# Whitespace next to these tags never renders (with white-space: normal)
+_BLOCK_TAGS = (
+    "html|head|body|meta|title|link|style|div|table|thead|tbody|tfoot|tr|td|th|"
+    "colgroup|col|caption|p|h[1-6]|ul|ol|li|br|hr"
+)
+_BLOCK_TAG_WS_RE = re.compile(rf"\s*(</?(?:{_BLOCK_TAGS})\b[^>]*>)\s*", re.IGNORECASE)
+
+
+def minify_css(css_content: str) -> str:
+    """
+    Minify CSS content by removing unnecessary whitespace and comments
+
+    Args:
+        css_content (str): CSS content to minify
+
+    Returns:
+        str: Minified CSS content
+    """
+    # Remove comments
+    css_content = re.sub(r'/\*.*?\*/', '', css_content, flags=re.DOTALL)
+
+    # Remove unnecessary whitespace
+    css_content = re.sub(r'\s+', ' ', css_content)
+    css_content = re.sub(r'\s*([{}:;,])\s*', r'\1', css_content)
+
+    # Remove leading and trailing whitespace
+    css_content = css_content.strip()
+
+    return css_content
+
+
+class SharedStylesheetCache:
+    """Content-addressed store of hoisted stylesheets (one file per unique CSS block)"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize the stylesheet cache
+
+        Args:
+            cache_dir (str): Directory for stylesheet files (default: system temp)
+        """
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "billgen_css")
+        self._css: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def store(self, css: str) -> Tuple[str, str]:
+        """
+        Store CSS and return its digest and file path
+
+        Args:
+            css (str): Minified CSS text
+
+        Returns:
+            Tuple[str, str]: (digest, absolute path of the stylesheet file)
+        """
+        digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:16]
+        path = self.path_for(digest)
+        with self._lock:
+            self._css.setdefault(digest, css)
+            if not os.path.exists(path):
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # Atomic write so concurrent renders never see a partial file
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(css)
+                os.replace(tmp_path, path)
+        return digest, path
+
+    def path_for(self, digest: str) -> str:
+        """Get the file path for a stylesheet digest"""
+        return os.path.abspath(os.path.join(self.cache_dir, f"{digest}.css"))
+
+    def get_css(self, digest: str) -> Optional[str]:
+        """
+        Get the CSS text for a digest
+
+        Args:
+            digest (str): Stylesheet digest
+
+        Returns:
+            Optional[str]: CSS text or None if unknown
+        """
+        css = self._css.get(digest)
+        if css is None:
+            try:
+                with open(self.path_for(digest), "r", encoding="utf-8") as f:
+                    css = f.read()
+            except OSError:
+                return None
+            with self._lock:
+                self._css[digest] = css
+        return css
+
+
+# Global stylesheet cache instance
+_stylesheet_cache = SharedStylesheetCache()
+
+
+def get_stylesheet_cache() -> SharedStylesheetCache:
+    """Get the global stylesheet cache instance"""
+    return _stylesheet_cache
+
+
+def _preserved_classes(html: str) -> List[str]:
+    """Find CSS classes whose rules make whitespace significant (white-space: pre*)"""
+    classes = []
+    for _, css, _ in _STYLE_RE.findall(html):
+        for selector, body in re.findall(r"([^{}]+)\{([^{}]*)\}", css):
+            if re.search(r"white-space\s*:\s*pre", body):
+                classes.extend(re.findall(r"\.([\w-]+)", selector))
+    return classes
+
+
+def _element_end(html: str, tag: str, start: int) -> Optional[int]:
+    """End offset of the element whose start tag ends at start, counting nested same-name elements"""
+    depth = 1
+    for match in re.compile(rf"<(/?){tag}\b[^>]*?(/?)>", re.IGNORECASE).finditer(html, start):
+        if match.group(1):
+            depth -= 1
+        elif not match.group(2):
+            depth += 1
+        if depth == 0:
+            return match.end()
+    return None
+
+
+def _protect(html: str, classes: List[str]) -> Tuple[str, List[str]]:
+    """Swap whitespace-sensitive regions for placeholders"""
+    protected: List[str] = []
+
+    def _keep(region: str) -> str:
+        protected.append(region)
+        return f"\x00{len(protected) - 1}\x00"
+
+    # Raw-text elements cannot nest: their content ends at the first closing tag
+    for tag in _RAW_TEXT_TAGS:
+        html = re.sub(rf"<{tag}\b.*?</{tag}\s*>", lambda m: _keep(m.group(0)), html,
+                      flags=re.IGNORECASE | re.DOTALL)
+
+    # Other elements are matched up to their balanced closing tag, so nested
+    # same-name elements (a <div> inside a protected <div>) stay protected
+    start_tags = [re.compile(r"<(pre)\b[^>]*>", re.IGNORECASE)] + [
+        re.compile(rf'<(\w+)\b[^>]*\bclass="[^"]*\b{re.escape(cls)}\b[^"]*"[^>]*>')
+        for cls in set(classes)
+    ]
+    for start_tag in start_tags:
+        parts, position = [], 0
+        for match in start_tag.finditer(html):
+            if match.start() < position:
+                continue  # Inside an element protected by this pass
+            end = _element_end(html, match.group(1), match.end())
+            if end is None:
+                continue
+            parts.append(html[position:match.start()])
+            parts.append(_keep(html[match.start():end]))
+            position = end
+        html = "".join(parts) + html[position:]
+    return html, protected
+
+
+def _restore(html: str, protected: List[str]) -> str:
+    """Put protected regions back (a region may hold placeholders of regions protected before it)"""
+    return re.sub(r"\x00(\d+)\x00", lambda m: _restore(protected[int(m.group(1))], protected), html)
+
+
+def minify_html(html_content: str) -> str:
+    """
+    Minify rendered HTML without changing how it prints
+
+    Comments are removed, whitespace around block-level tags is dropped, other
+    whitespace runs collapse to one character (newlines are kept so
+    ``white-space: pre-line`` text is unaffected) and inline CSS is minified.
+    <pre>/<textarea>/<script> and elements styled with ``white-space: pre*``
+    are left byte-for-byte intact.
+
+    Args:
+        html_content (str): Rendered HTML
+
+    Returns:
+        str: Minified HTML
+    """
+    html, protected = _protect(html_content, _preserved_classes(html_content))
+    html = _COMMENT_RE.sub("", html)
+    html = _STYLE_RE.sub(lambda m: m.group(1) + minify_css(m.group(2)) + m.group(3), html)
+    html = re.sub(r"[ \t\r\f\v]*\n\s*", "\n", html)
+    html = re.sub(r"[ \t\r\f\v]+", " ", html)
+    html = _BLOCK_TAG_WS_RE.sub(r"\1", html)
+    html = html.strip()
+    return _restore(html, protected)
+
+
+def hoist_styles(html_content: str, cache: Optional[SharedStylesheetCache] = None) -> str:
+    """
+    Move all <style> blocks into one cached external stylesheet
+
+    The blocks are concatenated in document order, so the cascade is unchanged.
+
+    Args:
+        html_content (str): Rendered HTML
+        cache (SharedStylesheetCache): Stylesheet cache (default: global cache)
+
+    Returns:
+        str: HTML with a single <link> in place of the first <style> block
+    """
+    blocks = [css for _, css, _ in _STYLE_RE.findall(html_content)]
+    if not blocks:
+        return html_content
+
+    cache = cache or get_stylesheet_cache()
+    digest, path = cache.store(minify_css("\n".join(blocks)))
+    href = "file:///" + path.replace("\\", "/").lstrip("/")
+    link = f'<link rel="stylesheet" href="{href}" {SHARED_CSS_ATTR}="{digest}">'
+
+    replaced = []
+
+    def _replace(match):
+        if replaced:
+            return ""
+        replaced.append(True)
+        return link
+
+    return _STYLE_RE.sub(_replace, html_content)
+
+
+def optimize_html(html_content: str, cache: Optional[SharedStylesheetCache] = None) -> str:
+    """
+    Apply all render-time optimizations (minification, then style hoisting)
+
+    Minification runs first because it reads the inline styles to find
+    whitespace-sensitive elements.
+
+    Args:
+        html_content (str): Rendered HTML
+        cache (SharedStylesheetCache): Stylesheet cache (default: global cache)
+
+    Returns:
+        str: Optimized HTML
+    """
+    return hoist_styles(minify_html(html_content), cache)
+
+
+def split_shared_stylesheets(html_content: str) -> Tuple[str, List[str]]:
+    """
+    Remove hoisted stylesheet links and return their digests
+
+    Used by engines that keep parsed stylesheets in memory.
+
+    Args:
+        html_content (str): HTML produced by hoist_styles()
+
+    Returns:
+        Tuple[str, List[str]]: (HTML without shared links, stylesheet digests)
+    """
+    digests = _SHARED_LINK_RE.findall(html_content)
+    if not digests:
+        return html_content, []
+    return _SHARED_LINK_RE.sub("", html_content), digests
+
+
+def inline_stylesheets(html_content: str, cache: Optional[SharedStylesheetCache] = None) -> str:
+    """
+    Put hoisted stylesheets back inline (for engines that cannot load links)
+
+    Args:
+        html_content (str): HTML produced by hoist_styles()
+        cache (SharedStylesheetCache): Stylesheet cache (default: global cache)
+
+    Returns:
+        str: HTML with <style> blocks in place of shared links
+    """
+    cache = cache or get_stylesheet_cache()
+
+    def _inline(match):
+        css = cache.get_css(match.group(1))
+        return f"<style>{css}</style>" if css is not None else match.group(0)
+
+    return _SHARED_LINK_RE.sub(_inline, html_content)
@@ -4,15 +4,71 @@ Addresses: A4 page utilization, 10-15mm margins, landscape/portrait support
 Elegant HTML to PDF conversion with statutory compliance
 """
 
+import io
 import logging
 import os
-from typing import Dict, Literal, Optional
+import threading
+import time
+from contextvars import ContextVar
+from typing import BinaryIO, Dict, Literal, Optional, Tuple, Union
+
+try:
+    from core.html_optimizer import inline_stylesheets
+except ImportError:
+    # Fallback for direct execution
+    from html_optimizer import inline_stylesheets
+
+try:
+    from core.engine_detection import (detect_engines, find_chrome_executable,
+                                       get_engine_capabilities, mark_engine_unavailable)
+except ImportError:
+    # Fallback for direct execution
+    from engine_detection import (detect_engines, find_chrome_executable,
+                                  get_engine_capabilities, mark_engine_unavailable)
+
+try:
+    from core.engine_router import get_engine_router
+except ImportError:
+    get_engine_router = None
+
+try:
+    from core.chrome_pool import get_chrome_pool
+except ImportError:
+    get_chrome_pool = None
+
+try:
+    from core.engine_subprocess import EngineTimeoutError, get_engine_runner
+except ImportError:
+    # Fallback for direct execution
+    from engine_subprocess import EngineTimeoutError, get_engine_runner
+
+try:
+    from core.weasyprint_backend import get_weasyprint_backend
+except ImportError:
+    # Fallback for direct execution
+    from weasyprint_backend import get_weasyprint_backend
+
+try:
+    from core.engine_variants import engine_variant
+except ImportError:
+    # Fallback for direct execution
+    from engine_variants import engine_variant
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# (generator, engine) of the calling thread's/task's last successful conversion;
+# context-local so a generator can be shared (see get_pdf_generator)
+_last_engine: ContextVar = ContextVar("pdf_last_engine", default=(None, None))
+
+
+def _target_name(output_path) -> str:
+    """Describe a PDF target (file path or in-memory stream) for log messages"""
+    return output_path if isinstance(output_path, str) else "<memory>"
+
+
 class PDFGenerator:
     """
     Professional PDF Generator with precise A4 layout control
@@ -37,15 +93,24 @@ class PDFGenerator:
     
     def __init__(self, 
                  orientation: Literal['portrait', 'landscape'] = 'portrait',
-                 custom_margins: Optional[Dict[str, int]] = None):
+                 custom_margins: Optional[Dict[str, int]] = None,
+                 use_chrome_pool: bool = True,
+                 router=None,
+                 engines: Optional[list] = None):
         """
         Initialize PDF Generator
         
         Args:
             orientation: 'portrait' or 'landscape'
             custom_margins: Optional dict with keys: top, right, bottom, left (in mm)
+            use_chrome_pool: Print Chrome jobs on the shared warm browser pool
+            router: EngineRouter for adaptive engine selection (default: shared router)
+            engines: Engines to use instead of the detected ones (fixed for the generator's lifetime)
         """
         self.orientation = orientation
+        self.use_chrome_pool = use_chrome_pool
+        self.router = router or (get_engine_router() if get_engine_router is not None else None)
+        self._engines: Optional[tuple] = tuple(engines) if engines is not None else None
         
         # Set margins
         if custom_margins:
@@ -70,60 +135,38 @@ class PDFGenerator:
         self.content_width = self.page_width - self.margin_left - self.margin_right
         self.content_height = self.page_height - self.margin_top - self.margin_bottom
         
-        # Detect available PDF engines
-        self.available_engines = self._detect_engines()
-        logger.info(f"Available PDF engines: {self.available_engines}")
+        # Built once here: generators are shared (get_pdf_generator), so no method
+        # outside __init__ assigns instance state
+        self._base_css = self._build_base_css()
+        logger.debug(f"Available PDF engines: {self.available_engines}")
+    
+    @property
+    def available_engines(self) -> list:
+        """Engines this generator uses (the process-wide detection unless overridden)"""
+        return list(self._engines) if self._engines is not None else self._detect_engines()
     
+    @property
+    def last_engine(self) -> Optional[str]:
+        """Engine that produced this generator's last PDF in the current thread/task (None if none)"""
+        owner, engine = _last_engine.get()
+        return engine if owner is self else None
+
+    @last_engine.setter
+    def last_engine(self, engine: Optional[str]) -> None:
+        _last_engine.set((self, engine))
+
     def _detect_engines(self) -> list:
-        """Detect available PDF generation engines"""
-        engines = []
-        
-        # Check for Chrome/Chromium (BEST - No shrinking!)
-        import shutil
-        chrome_paths = [
-            shutil.which('google-chrome'),
-            shutil.which('chrome'),
-            shutil.which('chromium'),
-            shutil.which('chromium-browser'),
-            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
-        ]
-        for chrome_path in chrome_paths:
-            if chrome_path and os.path.exists(chrome_path):
-                engines.append('chrome')
-                break
-        
-        # Check for pdfkit/wkhtmltopdf
-        try:
-            import pdfkit
-            engines.append('pdfkit')
-        except ImportError:
-            pass
-        
-        # Check for WeasyPrint
-        try:
-            import weasyprint
-            engines.append('weasyprint')
-        except ImportError:
-            pass
-        
-        # Check for ReportLab
-        try:
-            from reportlab.pdfgen import canvas
-            engines.append('reportlab')
-        except ImportError:
-            pass
-        
-        # Check for xhtml2pdf
-        try:
-            from xhtml2pdf import pisa
-            engines.append('xhtml2pdf')
-        except ImportError:
-            pass
-        
-        return engines
+        """Available PDF generation engines (detected once per process, see engine_detection)"""
+        return detect_engines()
     
     def get_base_css(self) -> str:
+        """
+        Base CSS with precise A4 page layout and margins
+        (built once per generator)
+        """
+        return self._base_css
+    
+    def _build_base_css(self) -> str:
         """
         Generate base CSS with precise A4 page layout and margins
         Ensures proper page utilization with 10-15mm margins
@@ -360,43 +403,29 @@ class PDFGenerator:
 </html>"""
         return html
     
-    def html_to_pdf_weasyprint(self, html_content: str, output_path: str) -> bool:
-        """Generate PDF using WeasyPrint (best quality)"""
+    def html_to_pdf_weasyprint(self, html_content: str, output_path: Union[str, BinaryIO]) -> bool:
+        """Generate PDF using WeasyPrint (best quality); output_path may be a binary stream"""
         try:
-            from weasyprint import CSS, HTML
-            from weasyprint.text.fonts import FontConfiguration
-            
-            font_config = FontConfiguration()
-            
-            # Create CSS with proper page setup
-            css_string = f"""
-            @page {{
-                size: A4 {self.orientation};
-                margin-top: {self.margin_top}mm;
-                margin-right: {self.margin_right}mm;
-                margin-bottom: {self.margin_bottom}mm;
-                margin-left: {self.margin_left}mm;
-            }}
-            """
-            
-            html_doc = HTML(string=html_content)
-            css_doc = CSS(string=css_string, font_config=font_config)
-            
-            html_doc.write_pdf(
-                output_path,
-                stylesheets=[css_doc],
-                font_config=font_config
-            )
+            try:
+                # Long-lived font configuration and cached @page/shared stylesheets
+                get_weasyprint_backend().write_pdf(
+                    html_content, output_path, self.orientation,
+                    (self.margin_top, self.margin_right, self.margin_bottom, self.margin_left),
+                )
+            except (ImportError, OSError):
+                # Installed but unusable (e.g. missing Pango); skip it from now on
+                mark_engine_unavailable('weasyprint')
+                raise
             
-            logger.info(f"PDF generated successfully using WeasyPrint: {output_path}")
+            logger.info(f"PDF generated successfully using WeasyPrint: {_target_name(output_path)}")
             return True
             
         except Exception as e:
             logger.error(f"WeasyPrint generation failed: {e}")
             return False
     
-    def html_to_pdf_reportlab(self, html_content: str, output_path: str) -> bool:
-        """Generate PDF using ReportLab (fallback with HTML parsing)"""
+    def html_to_pdf_reportlab(self, html_content: str, output_path: Union[str, BinaryIO]) -> bool:
+        """Generate PDF using ReportLab (fallback with HTML parsing); output_path may be a binary stream"""
         try:
             from bs4 import BeautifulSoup
             from reportlab.lib import colors
@@ -406,6 +435,9 @@ class PDFGenerator:
             from reportlab.platypus import (Paragraph, SimpleDocTemplate,
                                             Table, TableStyle)
 
+            # The parser only reads text; skip parsing the template CSS
+            html_content = engine_variant(html_content, 'reportlab')
+
             # Set page size
             if self.orientation == 'landscape':
                 page_size = landscape(A4)
@@ -468,28 +500,33 @@ class PDFGenerator:
             
             # Build PDF
             doc.build(story)
-            logger.info(f"PDF generated successfully using ReportLab: {output_path}")
+            logger.info(f"PDF generated successfully using ReportLab: {_target_name(output_path)}")
             return True
             
         except Exception as e:
             logger.error(f"ReportLab generation failed: {e}")
             return False
     
-    def html_to_pdf_xhtml2pdf(self, html_content: str, output_path: str) -> bool:
-        """Generate PDF using xhtml2pdf (good compatibility)"""
+    def html_to_pdf_xhtml2pdf(self, html_content: str, output_path: Union[str, BinaryIO]) -> bool:
+        """Generate PDF using xhtml2pdf (good compatibility); output_path may be a binary stream"""
         try:
 
             from xhtml2pdf import pisa
 
+            # xhtml2pdf cannot follow file:// stylesheet links
+            html_content = inline_stylesheets(html_content)
+            # Chrome-only CSS reduced to what xhtml2pdf supports (cached per template version)
+            html_content = engine_variant(html_content, 'xhtml2pdf')
+
             # Create PDF
-            with open(output_path, "wb") as pdf_file:
-                pisa_status = pisa.CreatePDF(
-                    html_content,
-                    dest=pdf_file
-                )
+            if isinstance(output_path, str):
+                with open(output_path, "wb") as pdf_file:
+                    pisa_status = pisa.CreatePDF(html_content, dest=pdf_file)
+            else:
+                pisa_status = pisa.CreatePDF(html_content, dest=output_path)
             
             if not pisa_status.err:
-                logger.info(f"PDF generated successfully using xhtml2pdf: {output_path}")
+                logger.info(f"PDF generated successfully using xhtml2pdf: {_target_name(output_path)}")
                 return True
             else:
                 logger.error("xhtml2pdf generation failed with errors")
@@ -499,53 +536,64 @@ class PDFGenerator:
             logger.error(f"xhtml2pdf generation failed: {e}")
             return False
     
-    def html_to_pdf_chrome(self, html_content: str, output_path: str) -> bool:
-        """Generate PDF using Chrome Headless (BEST - No shrinking!)"""
+    def _find_chrome(self) -> Optional[str]:
+        """Find the Chrome/Chromium executable (cached per process)"""
+        return find_chrome_executable()
+    
+    @staticmethod
+    def _chrome_command(chrome_exe: str, html_path: str, output_path: str) -> list:
+        """Chrome headless command with PERFECT settings (NO HEADERS/FOOTERS!)"""
+        return [
+            chrome_exe,
+            '--headless',
+            '--disable-gpu',
+            '--no-margins',  # Use CSS margins instead
+            '--disable-smart-shrinking',  # CRITICAL!
+            '--run-all-compositor-stages-before-draw',
+            '--no-pdf-header-footer',  # REMOVE TIMESTAMP AND FILE PATH
+            '--print-to-pdf=' + output_path,
+            html_path
+        ]
+    
+    def html_to_pdf_chrome(self, html_content: str, output_path: str,
+                           use_pool: Optional[bool] = None) -> bool:
+        """
+        Generate PDF using Chrome Headless (BEST - No shrinking!)
+        
+        Args:
+            html_content: HTML content to convert to PDF
+            output_path: Path where PDF should be saved
+            use_pool: Try the warm browser pool first (default: self.use_chrome_pool)
+        """
+        if use_pool is None:
+            use_pool = self.use_chrome_pool
         try:
-            import shutil
-            import subprocess
             import tempfile
 
-            # Find Chrome executable
-            chrome_paths = [
-                shutil.which('google-chrome'),
-                shutil.which('chrome'),
-                shutil.which('chromium'),
-                shutil.which('chromium-browser'),
-                r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-                r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
-            ]
-            
-            chrome_exe = None
-            for path in chrome_paths:
-                if path and os.path.exists(path):
-                    chrome_exe = path
-                    break
-            
+            chrome_exe = self._find_chrome()
             if not chrome_exe:
                 logger.error("Chrome executable not found")
                 return False
             
+            # Prefer a warm browser from the pool; fall back to a one-shot process
+            if use_pool and get_chrome_pool is not None:
+                pool = get_chrome_pool()
+                if pool.available:
+                    try:
+                        pool.print_to_pdf(html_content, output_path)
+                        logger.info(f"PDF generated successfully using Chrome pool: {output_path}")
+                        return True
+                    except Exception as e:
+                        logger.warning(f"Chrome pool failed, starting a one-shot Chrome: {e}")
+            
             # Create temporary HTML file
             with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
                 f.write(html_content)
                 temp_html = f.name
             
             try:
-                # Chrome headless command with PERFECT settings (NO HEADERS/FOOTERS!)
-                cmd = [
-                    chrome_exe,
-                    '--headless',
-                    '--disable-gpu',
-                    '--no-margins',  # Use CSS margins instead
-                    '--disable-smart-shrinking',  # CRITICAL!
-                    '--run-all-compositor-stages-before-draw',
-                    '--no-pdf-header-footer',  # REMOVE TIMESTAMP AND FILE PATH
-                    '--print-to-pdf=' + output_path,
-                    temp_html
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+                cmd = self._chrome_command(chrome_exe, temp_html, output_path)
+                result = get_engine_runner().run("chrome", cmd, timeout=30)
                 
                 if result.returncode == 0 and os.path.exists(output_path):
                     logger.info(f"PDF generated successfully using Chrome: {output_path}")
@@ -553,6 +601,9 @@ class PDFGenerator:
                 else:
                     logger.error(f"Chrome PDF generation failed: {result.stderr}")
                     return False
+            except EngineTimeoutError:
+                logger.error("Chrome PDF generation timed out")
+                return False
                     
             finally:
                 # Clean up temp file
@@ -563,75 +614,164 @@ class PDFGenerator:
             logger.error(f"Chrome PDF generation failed: {e}")
             return False
     
+    def _pdfkit_options(self) -> dict:
+        """wkhtmltopdf options - ROCK SOLID ANTI-SHRINK SETTINGS (NO HEADERS/FOOTERS!)"""
+        return {
+            'page-size': 'A4',
+            'orientation': self.orientation,
+            'margin-top': f'{self.margin_top}mm',
+            'margin-right': f'{self.margin_right}mm',
+            'margin-bottom': f'{self.margin_bottom}mm',
+            'margin-left': f'{self.margin_left}mm',
+            'encoding': "UTF-8",
+            'no-outline': None,
+            'enable-local-file-access': None,
+            'disable-smart-shrinking': None,  # CRITICAL: Prevents table shrinking
+            'zoom': '1.0',  # CRITICAL: No scaling
+            'dpi': 96,  # CRITICAL: Standard DPI for perfect rendering
+            'image-quality': 100,  # Maximum quality
+            'no-header-line': None,  # Remove header line
+            'no-footer-line': None  # Remove footer line
+        }
+    
+    @staticmethod
+    def _pdfkit_configuration():
+        """pdfkit configuration for the cached wkhtmltopdf path (None = pdfkit default)"""
+        import pdfkit
+
+        wkhtmltopdf_path = get_engine_capabilities()['wkhtmltopdf_path']
+        if wkhtmltopdf_path:
+            return pdfkit.configuration(wkhtmltopdf=wkhtmltopdf_path)
+        return None
+    
     def html_to_pdf_pdfkit(self, html_content: str, output_path: str) -> bool:
         """Generate PDF using pdfkit (basic but reliable)"""
         try:
             import pdfkit
 
-            # Configure options - ROCK SOLID ANTI-SHRINK SETTINGS (NO HEADERS/FOOTERS!)
-            options = {
-                'page-size': 'A4',
-                'orientation': self.orientation,
-                'margin-top': f'{self.margin_top}mm',
-                'margin-right': f'{self.margin_right}mm',
-                'margin-bottom': f'{self.margin_bottom}mm',
-                'margin-left': f'{self.margin_left}mm',
-                'encoding': "UTF-8",
-                'no-outline': None,
-                'enable-local-file-access': None,
-                'disable-smart-shrinking': None,  # CRITICAL: Prevents table shrinking
-                'zoom': '1.0',  # CRITICAL: No scaling
-                'dpi': 96,  # CRITICAL: Standard DPI for perfect rendering
-                'image-quality': 100,  # Maximum quality
-                'no-header-line': None,  # Remove header line
-                'no-footer-line': None  # Remove footer line
-            }
-            
-            # Try to configure wkhtmltopdf path
-            try:
-                import platform
-                if platform.system() == "Windows":
-                    wkhtmltopdf_path = r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe"
-                    if os.path.exists(wkhtmltopdf_path):
-                        config = pdfkit.configuration(wkhtmltopdf=wkhtmltopdf_path)
-                        pdfkit.from_string(html_content, output_path, configuration=config, options=options)
-                    else:
-                        pdfkit.from_string(html_content, output_path, options=options)
-                else:
-                    pdfkit.from_string(html_content, output_path, options=options)
-            except:
-                pdfkit.from_string(html_content, output_path, options=options)
-            
-            logger.info(f"PDF generated successfully using pdfkit: {output_path}")
-            return True
+            kit = pdfkit.PDFKit(html_content, 'string', options=self._pdfkit_options(),
+                                configuration=self._pdfkit_configuration())
+            result = get_engine_runner().run(
+                "pdfkit", kit.command(output_path), timeout=60, stdin_data=html_content.encode('utf-8')
+            )
+            if result.returncode == 0 and os.path.exists(output_path):
+                logger.info(f"PDF generated successfully using pdfkit: {output_path}")
+                return True
+            logger.error(f"pdfkit generation failed: {result.stderr}")
+            return False
             
+        except EngineTimeoutError:
+            logger.error("pdfkit generation timed out")
+            return False
         except Exception as e:
             logger.error(f"pdfkit generation failed: {e}")
             return False
     
-    def generate_pdf(self, html_content: str, output_path: str, engine: Optional[str] = None) -> bool:
+    async def _arun_engine(self, cmd: list, timeout: float, stdin_data: Optional[bytes] = None,
+                           engine: str = "external"):
+        """Run an external engine without blocking the loop (see core.engine_subprocess)"""
+        result = await get_engine_runner().arun(engine, cmd, timeout, stdin_data)
+        return result.returncode, result.stderr
+    
+    async def ahtml_to_pdf_chrome(self, html_content: str, output_path: str) -> bool:
+        """Async variant of html_to_pdf_chrome (Chrome runs as an asyncio subprocess)"""
+        import asyncio
+        import tempfile
+
+        chrome_exe = self._find_chrome()
+        if not chrome_exe:
+            logger.error("Chrome executable not found")
+            return False
+        
+        if self.use_chrome_pool and get_chrome_pool is not None:
+            pool = get_chrome_pool()
+            if pool.available:
+                try:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, pool.print_to_pdf, html_content, output_path)
+                    logger.info(f"PDF generated successfully using Chrome pool: {output_path}")
+                    return True
+                except Exception as e:
+                    logger.warning(f"Chrome pool failed, starting a one-shot Chrome: {e}")
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
+            f.write(html_content)
+            temp_html = f.name
+        
+        try:
+            cmd = self._chrome_command(chrome_exe, temp_html, output_path)
+            returncode, stderr = await self._arun_engine(cmd, timeout=30, engine="chrome")
+            if returncode == 0 and os.path.exists(output_path):
+                logger.info(f"PDF generated successfully using Chrome: {output_path}")
+                return True
+            logger.error(f"Chrome PDF generation failed: {stderr}")
+            return False
+        except asyncio.TimeoutError:
+            logger.error("Chrome PDF generation timed out")
+            return False
+        except OSError as e:
+            logger.error(f"Chrome PDF generation failed: {e}")
+            return False
+        finally:
+            if os.path.exists(temp_html):
+                os.unlink(temp_html)
+    
+    async def ahtml_to_pdf_pdfkit(self, html_content: str, output_path: str) -> bool:
+        """Async variant of html_to_pdf_pdfkit (wkhtmltopdf runs as an asyncio subprocess)"""
+        import asyncio
+
+        try:
+            import pdfkit
+
+            config = self._pdfkit_configuration()
+            kit = pdfkit.PDFKit(html_content, 'string', options=self._pdfkit_options(),
+                                configuration=config)
+            returncode, stderr = await self._arun_engine(
+                kit.command(output_path), timeout=60, stdin_data=html_content.encode('utf-8'), engine="pdfkit"
+            )
+            if returncode == 0 and os.path.exists(output_path):
+                logger.info(f"PDF generated successfully using pdfkit: {output_path}")
+                return True
+            logger.error(f"pdfkit generation failed: {stderr}")
+            return False
+        except asyncio.TimeoutError:
+            logger.error("pdfkit generation timed out")
+            return False
+        except Exception as e:
+            logger.error(f"pdfkit generation failed: {e}")
+            return False
+    
+    def select_engines(self, route: Optional[str] = None, log: bool = True) -> list:
         """
-        Generate PDF using the specified engine or best available engine
+        Engines to try for a document, best first
+        
+        With an engine router the order adapts to measured latency, failures
+        (circuit breaker) and the configured fidelity tier; otherwise it is the
+        static preference order.
         
         Args:
-            html_content: HTML content to convert to PDF
-            output_path: Path where PDF should be saved
-            engine: Specific engine to use (weasyprint, reportlab, xhtml2pdf, pdfkit)
+            route: Route key such as "first_page/landscape" (default: "default/<orientation>")
+            log: Log the routing decision
         
         Returns:
-            bool: True if successful, False otherwise
+            list: Engine names
         """
-        # Determine which engine to use
-        if engine is None:
-            if not self.available_engines:
-                raise Exception("No PDF generation engines available")
-            engine = self.available_engines[0]  # Use the best available engine
-        
-        # Validate engine
-        if engine not in self.available_engines:
-            raise Exception(f"PDF engine {engine} not available")
-        
-        # Generate PDF using selected engine
+        if not self.available_engines:
+            raise Exception("No PDF generation engines available")
+        if self.router is None:
+            return list(self.available_engines)
+        return self.router.order(self.available_engines, self._route(route), log=log)
+    
+    def _route(self, route: Optional[str]) -> str:
+        return route or f"default/{self.orientation}"
+    
+    def _record(self, engine: str, route: Optional[str], started: float, ok: bool) -> None:
+        """Report an attempt's outcome to the engine router"""
+        if self.router is not None:
+            self.router.record(engine, self._route(route), time.monotonic() - started, ok)
+    
+    def _convert(self, engine: str, html_content: str, output_path) -> bool:
+        """Convert with one engine, writing to output_path"""
         if engine == "chrome":
             return self.html_to_pdf_chrome(html_content, output_path)
         elif engine == "pdfkit":
@@ -645,30 +785,278 @@ class PDFGenerator:
         else:
             raise Exception(f"Unsupported PDF engine: {engine}")
     
-    def generate_with_fallback(self, html_content: str, output_path: str) -> str:
+    def _convert_bytes(self, engine: str, html_content: str) -> Optional[bytes]:
+        """Convert with one engine, returning PDF bytes"""
+        if engine == "chrome":
+            return self._chrome_pdf_bytes(html_content)
+        elif engine == "pdfkit":
+            return self._pdfkit_pdf_bytes(html_content)
+        elif engine in ("weasyprint", "reportlab", "xhtml2pdf"):
+            buffer = io.BytesIO()
+            success = self._convert(engine, html_content, buffer)
+            return buffer.getvalue() if success else None
+        else:
+            raise Exception(f"Unsupported PDF engine: {engine}")
+    
+    def _run_routed(self, convert, engine: Optional[str], route: Optional[str]):
+        """
+        Run convert(engine) on the requested engine, or on routed engines until one succeeds
+        
+        Every attempt is timed and reported to the router; self.last_engine is
+        set to the engine that produced the PDF.
+        """
+        if engine is not None:
+            if engine not in self.available_engines:
+                raise Exception(f"PDF engine {engine} not available")
+            started = time.monotonic()
+            try:
+                result = convert(engine)
+            except Exception:
+                self._record(engine, route, started, False)
+                raise
+            self._record(engine, route, started, bool(result))
+            if result:
+                self.last_engine = engine
+            return result
+        
+        result = None
+        for candidate in self.select_engines(route):
+            started = time.monotonic()
+            try:
+                result = convert(candidate)
+            except Exception as e:
+                logger.warning(f"Failed to generate PDF with {candidate}: {e}")
+                result = None
+            self._record(candidate, route, started, bool(result))
+            if result:
+                self.last_engine = candidate
+                return result
+            logger.warning(f"PDF engine {candidate} failed; trying next engine")
+        return result
+    
+    def generate_pdf(self, html_content: str, output_path: str, engine: Optional[str] = None,
+                     route: Optional[str] = None) -> bool:
+        """
+        Generate PDF using the specified engine or the routed best engine
+        
+        Without an explicit engine, engines are tried in select_engines() order
+        until one succeeds.
+        
+        Args:
+            html_content: HTML content to convert to PDF
+            output_path: Path where PDF should be saved
+            engine: Specific engine to use (chrome, weasyprint, reportlab, xhtml2pdf, pdfkit)
+            route: Route key for adaptive engine selection, e.g. "first_page/landscape"
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return bool(self._run_routed(
+            lambda candidate: self._convert(candidate, html_content, output_path), engine, route
+        ))
+    
+    def generate_pdf_bytes(self, html_content: str, engine: Optional[str] = None,
+                           route: Optional[str] = None) -> Optional[bytes]:
+        """
+        Generate a PDF in memory using the specified engine or the routed best engine
+        
+        WeasyPrint, ReportLab and xhtml2pdf write to a BytesIO, wkhtmltopdf
+        streams through stdin/stdout and Chrome prints over DevTools. Only the
+        one-shot Chrome CLI fallback (no pool available) still needs temp files.
+        
+        Args:
+            html_content: HTML content to convert to PDF
+            engine: Specific engine to use (chrome, weasyprint, reportlab, xhtml2pdf, pdfkit)
+            route: Route key for adaptive engine selection
+        
+        Returns:
+            Optional[bytes]: PDF document, or None if generation failed
+        """
+        return self._run_routed(
+            lambda candidate: self._convert_bytes(candidate, html_content), engine, route
+        ) or None
+    
+    def _chrome_pdf_bytes(self, html_content: str) -> Optional[bytes]:
+        """Chrome to bytes: DevTools pool when available, otherwise the CLI via temp files"""
+        if self.use_chrome_pool and get_chrome_pool is not None:
+            pool = get_chrome_pool()
+            if pool.available:
+                try:
+                    # setDocumentContent has no base URL, so hoisted stylesheets are inlined
+                    return pool.print_to_bytes(inline_stylesheets(html_content))
+                except Exception as e:
+                    logger.warning(f"Chrome pool failed, starting a one-shot Chrome: {e}")
+        
+        import tempfile
+        
+        fd, temp_pdf = tempfile.mkstemp(suffix='.pdf')
+        os.close(fd)
+        try:
+            # The pool was tried (or is unavailable) above
+            if not self.html_to_pdf_chrome(html_content, temp_pdf, use_pool=False):
+                return None
+            with open(temp_pdf, 'rb') as f:
+                return f.read()
+        finally:
+            os.unlink(temp_pdf)
+    
+    def _pdfkit_pdf_bytes(self, html_content: str) -> Optional[bytes]:
+        """wkhtmltopdf to bytes (HTML on stdin, PDF on stdout)"""
+        try:
+            import pdfkit
+            
+            kit = pdfkit.PDFKit(html_content, 'string', options=self._pdfkit_options(),
+                                configuration=self._pdfkit_configuration())
+            result = get_engine_runner().run(
+                "pdfkit", kit.command(None), timeout=60, stdin_data=html_content.encode('utf-8')
+            )
+            if result.returncode != 0 or not result.stdout:
+                logger.error(f"pdfkit generation failed: {result.stderr}")
+                return None
+            logger.info("PDF generated successfully using pdfkit: <memory>")
+            return result.stdout
+        except EngineTimeoutError:
+            logger.error("pdfkit generation timed out")
+            return None
+        except Exception as e:
+            logger.error(f"pdfkit generation failed: {e}")
+            return None
+    
+    def generate_with_fallback(self, html_content: str, output_path: str,
+                               route: Optional[str] = None) -> str:
         """
         Generate PDF using the best available engine with fallbacks
         
         Args:
             html_content: HTML content to convert to PDF
             output_path: Path where PDF should be saved
+            route: Route key for adaptive engine selection
         
         Returns:
             str: Engine used to generate PDF
         """
-        # Try engines in order of preference
-        for engine in self.available_engines:
+        if self.generate_pdf(html_content, output_path, route=route):
+            return self.last_engine
+        
+        raise Exception("Failed to generate PDF with any available engine")
+
+    async def _aconvert(self, engine: str, html_content: str, output_path: str) -> bool:
+        """Convert with one engine without blocking the event loop"""
+        import asyncio
+
+        if engine == "chrome":
+            return await self.ahtml_to_pdf_chrome(html_content, output_path)
+        elif engine == "pdfkit":
+            return await self.ahtml_to_pdf_pdfkit(html_content, output_path)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._convert, engine, html_content, output_path)
+    
+    async def agenerate_pdf(self, html_content: str, output_path: str, engine: Optional[str] = None,
+                            route: Optional[str] = None) -> bool:
+        """
+        Async variant of generate_pdf
+        
+        External engines (Chrome, wkhtmltopdf) run as asyncio subprocesses;
+        in-process engines run on the event loop's default executor.
+        
+        Args:
+            html_content: HTML content to convert to PDF
+            output_path: Path where PDF should be saved
+            engine: Specific engine to use (chrome, weasyprint, reportlab, xhtml2pdf, pdfkit)
+            route: Route key for adaptive engine selection
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if engine is not None:
+            if engine not in self.available_engines:
+                raise Exception(f"PDF engine {engine} not available")
+            candidates = [engine]
+        else:
+            candidates = self.select_engines(route)
+        
+        for candidate in candidates:
+            started = time.monotonic()
             try:
-                success = self.generate_pdf(html_content, output_path, engine)
-                if success:
-                    return engine
+                success = await self._aconvert(candidate, html_content, output_path)
             except Exception as e:
-                logger.warning(f"Failed to generate PDF with {engine}: {e}")
-                continue
+                if engine is not None:
+                    self._record(candidate, route, started, False)
+                    raise
+                logger.warning(f"Failed to generate PDF with {candidate}: {e}")
+                success = False
+            self._record(candidate, route, started, success)
+            if success:
+                self.last_engine = candidate
+                return True
+        return False
+    
+    async def agenerate_with_fallback(self, html_content: str, output_path: str,
+                                      route: Optional[str] = None) -> str:
+        """
+        Async variant of generate_with_fallback
+        
+        Args:
+            html_content: HTML content to convert to PDF
+            output_path: Path where PDF should be saved
+            route: Route key for adaptive engine selection
+        
+        Returns:
+            str: Engine used to generate PDF
+        """
+        if await self.agenerate_pdf(html_content, output_path, route=route):
+            return self.last_engine
         
         raise Exception("Failed to generate PDF with any available engine")
 
 
+
+# Shared generators keyed by page setup (orientation, margins) and engine override
+_generator_pool: Dict[Tuple[str, Tuple[int, int, int, int], Optional[tuple]], PDFGenerator] = {}
+_generator_pool_lock = threading.Lock()
+
+
+def get_pdf_generator(orientation: str = 'portrait',
+                      custom_margins: Optional[Dict[str, int]] = None,
+                      engines: Optional[list] = None) -> PDFGenerator:
+    """
+    Get the shared PDFGenerator for a page setup
+    
+    Documents only use a handful of orientation/margin profiles, so one
+    generator per profile (with its CSS and engine setup) is reused across
+    documents, threads and sessions. Generators are not modified after
+    __init__: per-render state (last_engine) is tracked per thread/task and
+    available_engines follows engine re-detection (refresh_engines), or is
+    fixed by the engines argument, which is part of the pool key.
+    
+    Args:
+        orientation: 'portrait' or 'landscape'
+        custom_margins: Optional dict with keys: top, right, bottom, left (in mm)
+        engines: Engines to use instead of the detected ones
+    
+    Returns:
+        PDFGenerator: Shared generator (do not modify its page setup)
+    """
+    orientation = 'landscape' if orientation == 'landscape' else 'portrait'
+    margins = custom_margins or {}
+    key = (orientation, tuple(margins.get(side, getattr(PDFGenerator, f"MARGIN_{side.upper()}"))
+                              for side in ('top', 'right', 'bottom', 'left')),
+           tuple(engines) if engines is not None else None)
+    with _generator_pool_lock:
+        generator = _generator_pool.get(key)
+        if generator is None:
+            generator = PDFGenerator(orientation=orientation, custom_margins=custom_margins, engines=engines)
+            _generator_pool[key] = generator
+    return generator
+
+
+def clear_generator_pool() -> None:
+    """Drop the shared generators (e.g. after changing the engine router)"""
+    with _generator_pool_lock:
+        _generator_pool.clear()
+
+
 # Example usage
 if __name__ == "__main__":
     # Create sample bill data
@@ -0,0 +1,474 @@
+"""
+Local PDF render service
+A standalone service that owns the PDF engines, so Streamlit sessions and batch
+scripts no longer start browsers in-process. Clients put jobs (raw HTML, or a
+sheet name plus its template data) into a persistent SQLite queue; a fixed
+pool of worker processes claims jobs one at a time, renders them with
+PDFGenerator / exports.renderers and writes the PDF next to the queue.
+
+Because the number of engine processes is fixed by the worker pool, a burst
+of submissions only lengthens the queue instead of oversubscribing the host.
+Jobs survive restarts; jobs held by a worker that died are requeued.
+
+Run the service:
+
+    python -m core.render_service --workers 4
+
+Submit from any process:
+
+    client = RenderClient()
+    job_id = client.submit_sheet("First Page", first_page_data, "portrait")
+    pdf = client.wait(job_id)            # or: await client.await_result(job_id)
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+try:
+    from config.settings import get_setting
+except ImportError:
+    get_setting = None
+
+try:
+    from core.font_bundle import configure_fontconfig
+except ImportError:
+    configure_fontconfig = None
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+# A job is retried this many times when its worker dies mid-render
+MAX_ATTEMPTS = 2
+POLL_INTERVAL = 0.05
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    result_path TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created);
+"""
+
+
+def default_service_dir() -> str:
+    """Queue and result directory (the "render_service.dir" setting overrides the default)"""
+    configured = get_setting("render_service.dir") if get_setting else None
+    return configured or os.path.join(tempfile.gettempdir(), "billgen_render_service")
+
+
+class JobQueue:
+    """Persistent job queue shared by clients and workers (one connection per process)"""
+
+    def __init__(self, service_dir: Optional[str] = None):
+        """
+        Open (or create) the queue
+
+        Args:
+            service_dir (str): Directory holding queue.db and the rendered PDFs
+        """
+        self.service_dir = service_dir or default_service_dir()
+        self.results_dir = os.path.join(self.service_dir, "results")
+        os.makedirs(self.results_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(self.service_dir, "queue.db"), timeout=30,
+                                     isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def enqueue(self, kind: str, payload: Dict[str, Any]) -> str:
+        """
+        Add a job
+
+        Args:
+            kind (str): "html" or "sheet"
+            payload (dict): Job parameters (JSON-serializable)
+
+        Returns:
+            str: Job id
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, created) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload, default=str), QUEUED, time.time()),
+            )
+        return job_id
+
+    def claim(self, worker: str) -> Optional[sqlite3.Row]:
+        """
+        Atomically take the oldest queued job
+
+        Args:
+            worker (str): Worker id recorded on the job
+
+        Returns:
+            Optional[sqlite3.Row]: The job, or None if the queue is empty
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, started = ?, attempts = attempts + 1 "
+                        "WHERE id = ?", (RUNNING, worker, time.time(), row["id"]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row
+
+    def finish(self, job_id: str, result_path: Optional[str] = None, error: Optional[str] = None) -> None:
+        """Record a job's result (or error)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result_path = ?, error = ?, finished = ? WHERE id = ?",
+                (FAILED if error else DONE, result_path, error, time.time(), job_id),
+            )
+
+    def requeue_worker(self, worker: str) -> int:
+        """
+        Return a dead worker's running jobs to the queue (or fail them after MAX_ATTEMPTS)
+
+        Returns:
+            int: Number of jobs requeued
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = 'Worker died', finished = ? "
+                "WHERE status = ? AND worker = ? AND attempts >= ?",
+                (FAILED, time.time(), RUNNING, worker, MAX_ATTEMPTS),
+            )
+            return self._conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL WHERE status = ? AND worker = ?",
+                (QUEUED, RUNNING, worker),
+            ).rowcount
+
+    def requeue_running(self) -> int:
+        """Requeue every running job (on service start, all previous workers are gone)"""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL WHERE status = ?", (QUEUED, RUNNING)
+            ).rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's state as a dict (None if unknown)"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job.pop("payload")
+        return job
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def purge(self, older_than: float) -> int:
+        """
+        Delete finished jobs (and their PDFs) older than a number of seconds
+
+        Returns:
+            int: Number of jobs deleted
+        """
+        cutoff = time.time() - older_than
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, result_path FROM jobs WHERE status IN (?, ?) AND finished < ?",
+                (DONE, FAILED, cutoff),
+            ).fetchall()
+            for row in rows:
+                if row["result_path"] and os.path.exists(row["result_path"]):
+                    os.unlink(row["result_path"])
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (row["id"],))
+        return len(rows)
+
+    def close(self) -> None:
+        """Close the connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def _render_job(kind: str, payload: Dict[str, Any]) -> bytes:
+    """Render one job to PDF bytes (runs in a worker process)"""
+    if kind == "html":
+        from core.pdf_generator_optimized import get_pdf_generator
+
+        generator = get_pdf_generator(orientation=payload.get("orientation", "portrait"))
+        pdf = generator.generate_pdf_bytes(payload["html"], engine=payload.get("engine"))
+        if not pdf:
+            raise RuntimeError("Failed to generate PDF with available engines")
+        return pdf
+    if kind == "sheet":
+        from exports.renderers import generate_pdf_bytes
+
+        return generate_pdf_bytes(payload["sheet_name"], payload["data"], payload.get("orientation", "portrait"),
+                                  payload.get("template_dir", "templates"), payload.get("optimize", False))
+    raise ValueError(f"Unknown job kind: {kind}")
+
+
+def worker_main(service_dir: str, worker: str, stop: "multiprocessing.synchronize.Event",
+                poll_interval: float = POLL_INTERVAL) -> None:
+    """
+    Worker process loop: claim, render, store, repeat
+
+    Args:
+        service_dir (str): Service directory
+        worker (str): Worker id
+        stop (multiprocessing.Event): Set to stop after the current job
+        poll_interval (float): Seconds to wait when the queue is empty
+    """
+    if configure_fontconfig is not None:
+        # Before the first render loads fontconfig in this process
+        configure_fontconfig()
+    queue = JobQueue(service_dir)
+    try:
+        while not stop.is_set():
+            job = queue.claim(worker)
+            if job is None:
+                stop.wait(poll_interval)
+                continue
+            try:
+                pdf = _render_job(job["kind"], json.loads(job["payload"]))
+                result_path = os.path.join(queue.results_dir, f"{job['id']}.pdf")
+                temp_path = f"{result_path}.{worker}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(pdf)
+                os.replace(temp_path, result_path)
+                queue.finish(job["id"], result_path)
+            except Exception as e:
+                logger.warning(f"Render job {job['id']} failed: {e}")
+                queue.finish(job["id"], error=str(e) or e.__class__.__name__)
+    finally:
+        queue.close()
+
+
+class RenderService:
+    """Supervises a fixed pool of worker processes"""
+
+    def __init__(self, service_dir: Optional[str] = None, workers: Optional[int] = None):
+        """
+        Initialize the service
+
+        Args:
+            service_dir (str): Directory for the queue and results (default: default_service_dir())
+            workers (int): Worker processes (default: the "render_service.workers" setting, or min(4, CPUs))
+        """
+        self.service_dir = service_dir or default_service_dir()
+        if workers is None:
+            workers = get_setting("render_service.workers") if get_setting else None
+        self.workers = max(1, int(workers or min(4, os.cpu_count() or 1)))
+        # spawn: workers must not inherit browser connections or locks from the parent
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes: Dict[str, multiprocessing.Process] = {}
+        self._queue: Optional[JobQueue] = None
+        self._monitor: Optional[threading.Thread] = None
+
+    def _spawn(self, worker: str) -> None:
+        process = self._context.Process(target=worker_main, args=(self.service_dir, worker, self._stop),
+                                        name=f"render-{worker}", daemon=True)
+        process.start()
+        self._processes[worker] = process
+
+    def start(self) -> None:
+        """Start the workers and the supervisor thread"""
+        self._queue = JobQueue(self.service_dir)
+        requeued = self._queue.requeue_running()
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted render jobs")
+        self._stop.clear()
+        for index in range(self.workers):
+            self._spawn(f"w{index}-{uuid.uuid4().hex[:6]}")
+        self._monitor = threading.Thread(target=self._supervise, name="render-supervisor", daemon=True)
+        self._monitor.start()
+        logger.info(f"Render service started with {self.workers} workers in {self.service_dir}")
+
+    def _supervise(self) -> None:
+        """Replace workers that died and requeue the jobs they held"""
+        while not self._stop.wait(1.0):
+            for worker, process in list(self._processes.items()):
+                if process.is_alive():
+                    continue
+                del self._processes[worker]
+                requeued = self._queue.requeue_worker(worker)
+                logger.warning(f"Render worker {worker} exited ({process.exitcode}); "
+                               f"requeued {requeued} jobs")
+                self._spawn(f"w{len(self._processes)}-{uuid.uuid4().hex[:6]}")
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs older than a number of seconds (see JobQueue.purge)"""
+        return self._queue.purge(older_than) if self._queue is not None else 0
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stop the workers after their current jobs"""
+        self._stop.set()
+        for process in self._processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes.clear()
+        if self._monitor is not None:
+            self._monitor.join()
+        if self._queue is not None:
+            self._queue.close()
+            self._queue = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class RenderClient:
+    """Submits jobs to a render service and collects the results"""
+
+    def __init__(self, service_dir: Optional[str] = None):
+        """
+        Initialize the client
+
+        Args:
+            service_dir (str): Service directory (default: default_service_dir())
+        """
+        self.queue = JobQueue(service_dir)
+
+    def submit_html(self, html_content: str, orientation: str = "portrait", engine: Optional[str] = None) -> str:
+        """
+        Queue an HTML document
+
+        Returns:
+            str: Job id
+        """
+        return self.queue.enqueue("html", {"html": html_content, "orientation": orientation, "engine": engine})
+
+    def submit_sheet(self, sheet_name: str, data: Dict[str, Any], orientation: str = "portrait",
+                     template_dir: str = "templates", optimize: bool = False) -> str:
+        """
+        Queue a bill sheet (rendered with exports.renderers.generate_pdf_bytes)
+
+        Returns:
+            str: Job id
+        """
+        return self.queue.enqueue("sheet", {"sheet_name": sheet_name, "data": data, "orientation": orientation,
+                                            "template_dir": os.path.abspath(template_dir), "optimize": optimize})
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's state (status, attempts, error, timings)"""
+        return self.queue.get(job_id)
+
+    def _result(self, job: Dict[str, Any]) -> bytes:
+        if job["status"] == FAILED:
+            raise RuntimeError(f"Render job {job['id']} failed: {job['error']}")
+        with open(job["result_path"], "rb") as f:
+            return f.read()
+
+    def result(self, job_id: str) -> Optional[bytes]:
+        """
+        Get a job's PDF if it is finished (poll)
+
+        Returns:
+            Optional[bytes]: PDF bytes, or None while queued/running
+
+        Raises:
+            RuntimeError: The job failed
+        """
+        job = self.queue.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return self._result(job) if job["status"] in (DONE, FAILED) else None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, poll_interval: float = POLL_INTERVAL) -> bytes:
+        """
+        Block until a job finishes
+
+        Returns:
+            bytes: PDF bytes
+
+        Raises:
+            TimeoutError: The job did not finish in time
+            RuntimeError: The job failed
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            pdf = self.result(job_id)
+            if pdf is not None:
+                return pdf
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Render job {job_id} not finished after {timeout}s")
+            time.sleep(poll_interval)
+
+    async def await_result(self, job_id: str, timeout: Optional[float] = None,
+                           poll_interval: float = POLL_INTERVAL) -> bytes:
+        """Async variant of wait() (polls without blocking the event loop)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            pdf = self.result(job_id)
+            if pdf is not None:
+                return pdf
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Render job {job_id} not finished after {timeout}s")
+            await asyncio.sleep(poll_interval)
+
+    def wait_all(self, job_ids: List[str], timeout: Optional[float] = None) -> List[bytes]:
+        """Wait for several jobs; results in job order"""
+        return [self.wait(job_id, timeout) for job_id in job_ids]
+
+    def close(self) -> None:
+        """Close the queue connection"""
+        self.queue.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the render service until interrupted"""
+    parser = argparse.ArgumentParser(description="Local PDF render service")
+    parser.add_argument("--dir", default=None, help="Queue and result directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--purge-after", type=float, default=24 * 3600,
+                        help="Delete finished jobs after this many seconds")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    service = RenderService(args.dir, args.workers)
+    service.start()
+    try:
+        while True:
+            time.sleep(60)
+            service.purge(args.purge_after)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,10 +11,10 @@ import streamlit as st
 
 # Import the optimized PDF generator
 try:
-    from core.pdf_generator_optimized import PDFGenerator
+    from core.pdf_generator_optimized import PDFGenerator, get_pdf_generator
 except ImportError:
     # Fallback for direct execution
-    from pdf_generator_optimized import PDFGenerator
+    from pdf_generator_optimized import PDFGenerator, get_pdf_generator
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -171,8 +171,8 @@ class StreamlitPDFManager:
             Path to generated PDF or None if failed
         """
         try:
-            # Create PDF generator with configuration
-            generator = PDFGenerator(
+            # Shared PDF generator for this page setup
+            generator = get_pdf_generator(
                 orientation=config['orientation'],
                 custom_margins=config['margins']
             )
@@ -334,7 +334,7 @@ class StreamlitPDFManager:
             st.write(f"**Cloud Mode:** {'Yes' if self.is_cloud else 'No'}")
             
             # Check available PDF engines
-            generator = PDFGenerator()
+            generator = get_pdf_generator()
             st.write(f"**Available PDF Engines:** {', '.join(generator.available_engines)}")
             
             if not generator.available_engines:
@@ -0,0 +1,169 @@
+"""
+Long-lived WeasyPrint backend
+Keeps one FontConfiguration for the process (fontconfig lookups are expensive)
+and caches parsed stylesheets: the @page rule per orientation/margin set and
+hoisted shared stylesheets per digest. Several documents can be rendered and
+concatenated at the WeasyPrint document level (Document.copy) instead of
+writing separate PDFs and merging them with pypdf.
+
+WeasyPrint is imported on first use; ImportError/OSError propagate so callers
+can mark the engine unavailable.
+
+Renders are serialized by design: layout runs in-process under the GIL, and
+the shared FontConfiguration (a Pango font map) must not be used by two
+layouts at once. exports.pdf_scheduler accordingly runs in-process engines
+one document at a time; the render service's worker processes are the way
+to render WeasyPrint documents in parallel.
+"""
+
+import logging
+import threading
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple, Union
+
+try:
+    from core.html_optimizer import get_stylesheet_cache, split_shared_stylesheets
+except ImportError:
+    # Fallback for direct execution
+    from html_optimizer import get_stylesheet_cache, split_shared_stylesheets
+
+logger = logging.getLogger(__name__)
+
+# (top, right, bottom, left) in mm
+Margins = Tuple[float, float, float, float]
+
+
+class WeasyPrintBackend:
+    """WeasyPrint renderer with process-wide font configuration and stylesheet caches"""
+
+    def __init__(self):
+        """Initialize the backend (WeasyPrint is loaded lazily)"""
+        self._weasyprint = None
+        self._font_config = None
+        self._page_css: Dict[Tuple[str, Margins], object] = {}
+        self._shared_css: Dict[str, object] = {}
+        # Guards the caches and serializes layout (the shared FontConfiguration is not thread-safe)
+        self._lock = threading.RLock()
+
+    def _load(self):
+        """Import WeasyPrint and create the font configuration once"""
+        if self._weasyprint is None:
+            import weasyprint
+            from weasyprint.text.fonts import FontConfiguration
+            self._font_config = FontConfiguration()
+            self._weasyprint = weasyprint
+        return self._weasyprint
+
+    def page_stylesheet(self, orientation: str, margins: Margins):
+        """
+        Get the parsed @page stylesheet for a page setup
+
+        Args:
+            orientation (str): "portrait" or "landscape"
+            margins (Margins): (top, right, bottom, left) in mm
+
+        Returns:
+            weasyprint.CSS: Cached stylesheet
+        """
+        key = (orientation, tuple(margins))
+        with self._lock:
+            if key not in self._page_css:
+                weasyprint = self._load()
+                top, right, bottom, left = margins
+                self._page_css[key] = weasyprint.CSS(
+                    string=f"@page {{ size: A4 {orientation}; margin: {top}mm {right}mm {bottom}mm {left}mm; }}",
+                    font_config=self._font_config,
+                )
+            return self._page_css[key]
+
+    def _shared_stylesheet(self, digest: str):
+        """Parsed hoisted stylesheet for a digest (parsed once per process)"""
+        if digest not in self._shared_css:
+            self._shared_css[digest] = self._weasyprint.CSS(
+                string=get_stylesheet_cache().get_css(digest) or "",
+                font_config=self._font_config,
+            )
+        return self._shared_css[digest]
+
+    def render(self, html_content: str, orientation: str = "portrait",
+               margins: Margins = (10, 10, 10, 10), base_url: Optional[str] = None):
+        """
+        Lay out HTML into a WeasyPrint document
+
+        Holds the backend lock for the whole layout (see the module docstring).
+
+        Args:
+            html_content (str): HTML to render (hoisted stylesheet links are resolved from the cache)
+            orientation (str): "portrait" or "landscape"
+            margins (Margins): (top, right, bottom, left) in mm
+            base_url (str): Base for relative resources
+
+        Returns:
+            weasyprint.Document: Rendered document
+        """
+        with self._lock:
+            weasyprint = self._load()
+            html_content, digests = split_shared_stylesheets(html_content)
+            stylesheets = [self._shared_stylesheet(digest) for digest in digests]
+            stylesheets.append(self.page_stylesheet(orientation, margins))
+            return weasyprint.HTML(string=html_content, base_url=base_url).render(
+                stylesheets=stylesheets, font_config=self._font_config)
+
+    def write_pdf(self, html_content: str, output: Union[str, BinaryIO], orientation: str = "portrait",
+                  margins: Margins = (10, 10, 10, 10)) -> None:
+        """
+        Render HTML to a PDF file or binary stream
+
+        Args:
+            html_content (str): HTML to render
+            output: File path or binary stream
+            orientation (str): "portrait" or "landscape"
+            margins (Margins): (top, right, bottom, left) in mm
+        """
+        document = self.render(html_content, orientation, margins)
+        document.write_pdf(output)
+
+    def write_merged_pdf(self, documents: Iterable[Tuple[str, str, Margins]],
+                         output: Optional[Union[str, BinaryIO]] = None) -> Optional[bytes]:
+        """
+        Render several HTML documents and write them as one PDF
+
+        Pages are concatenated at the document level, so fonts are embedded
+        once and no intermediate PDFs are written or re-parsed.
+
+        Args:
+            documents (Iterable[Tuple[str, str, Margins]]): (html, orientation, margins) per document
+            output: File path or binary stream; None to return bytes
+
+        Returns:
+            Optional[bytes]: PDF bytes when output is None
+        """
+        rendered = [self.render(html, orientation, margins) for html, orientation, margins in documents]
+        if not rendered:
+            raise ValueError("No documents to merge")
+        pages = [page for document in rendered for page in document.pages]
+        return rendered[0].copy(pages).write_pdf(output)
+
+    def clear(self) -> None:
+        """Drop cached stylesheets (e.g. after fonts or hoisted CSS change)"""
+        with self._lock:
+            self._page_css.clear()
+            self._shared_css.clear()
+
+
+# Global backend instance (created on first use)
+_weasyprint_backend = None
+_weasyprint_backend_lock = threading.Lock()
+
+
+def get_weasyprint_backend() -> WeasyPrintBackend:
+    """
+    Get the global WeasyPrint backend instance
+
+    Returns:
+        WeasyPrintBackend: Global backend
+    """
+    global _weasyprint_backend
+    with _weasyprint_backend_lock:
+        if _weasyprint_backend is None:
+            _weasyprint_backend = WeasyPrintBackend()
+        return _weasyprint_backend
@@ -0,0 +1,270 @@
+"""
+Persistent content-addressed artifact store for the Stream Bill Generator
+Generated documents are stored on disk under the hash of everything that
+determines their bytes (template version, engine, page setup, data), so
+identical documents are printed once across users and restarts.
+
+Files are sharded by the first two hex digits of the key, written atomically
+(temp file + os.replace) and evicted least-recently-used first once the store
+grows beyond its size limit. Access time is tracked with the file mtime, which
+survives restarts.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def artifact_key(**parts: Any) -> str:
+    """
+    Build a stable content key from the inputs that determine an artifact
+
+    Args:
+        **parts: e.g. template=..., engine=..., orientation=..., margins=..., data=...
+
+    Returns:
+        str: Hex digest
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ArtifactStore:
+    """Disk-backed artifact store with size-bounded LRU eviction"""
+
+    def __init__(self, root_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 extension: str = ".pdf"):
+        """
+        Initialize the ArtifactStore
+
+        Args:
+            root_dir (str): Store directory (default: <system temp>/billgen_artifacts)
+            max_bytes (int): Evict least recently used artifacts beyond this size
+            extension (str): File extension for stored artifacts
+        """
+        self.root_dir = root_dir or os.path.join(tempfile.gettempdir(), "billgen_artifacts")
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._lock = threading.Lock()
+        self._total_bytes = None  # computed lazily from disk
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def path_for(self, key: str) -> str:
+        """Get the sharded file path for a key"""
+        return os.path.join(self.root_dir, key[:2], key + self.extension)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up an artifact and mark it as recently used
+
+        Args:
+            key (str): Artifact key
+
+        Returns:
+            Optional[str]: Path of the stored artifact or None on a miss
+        """
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            self._stats["hits"] += 1
+        return path
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        Read an artifact's content
+
+        Args:
+            key (str): Artifact key
+
+        Returns:
+            Optional[bytes]: Content or None on a miss
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            # Evicted between lookup and read
+            return None
+
+    def copy_to(self, key: str, target_path: str) -> bool:
+        """
+        Copy an artifact to a caller-owned path
+
+        Args:
+            key (str): Artifact key
+            target_path (str): Destination file
+
+        Returns:
+            bool: True on a hit
+        """
+        path = self.get(key)
+        if path is None:
+            return False
+        try:
+            shutil.copyfile(path, target_path)
+            return True
+        except OSError:
+            return False
+
+    def put_bytes(self, key: str, content: bytes) -> str:
+        """
+        Store artifact content atomically
+
+        Args:
+            key (str): Artifact key
+            content (bytes): Artifact content
+
+        Returns:
+            str: Path of the stored artifact
+        """
+        path = self.path_for(key)
+        shard_dir = os.path.dirname(path)
+        os.makedirs(shard_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=shard_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            self._commit(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return path
+
+    def put_file(self, key: str, source_path: str) -> str:
+        """
+        Store a copy of an existing file atomically
+
+        Args:
+            key (str): Artifact key
+            source_path (str): File to store
+
+        Returns:
+            str: Path of the stored artifact
+        """
+        path = self.path_for(key)
+        shard_dir = os.path.dirname(path)
+        os.makedirs(shard_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=shard_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, tmp_path)
+            self._commit(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return path
+
+    def _commit(self, tmp_path: str, path: str) -> None:
+        """Move a finished temp file into place and enforce the size limit"""
+        size = os.path.getsize(tmp_path)
+        with self._lock:
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._stats["writes"] += 1
+            if self._total_bytes is not None:
+                self._total_bytes += size - previous
+        self._evict()
+
+    def _scan(self):
+        """List (mtime, size, path) of stored artifacts"""
+        entries = []
+        if not os.path.isdir(self.root_dir):
+            return entries
+        for shard in os.listdir(self.root_dir):
+            shard_dir = os.path.join(self.root_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if not name.endswith(self.extension):
+                    continue
+                path = os.path.join(shard_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """Remove least recently used artifacts until the store fits max_bytes"""
+        with self._lock:
+            entries = None
+            if self._total_bytes is None:
+                entries = self._scan()
+                self._total_bytes = sum(size for _, size, _ in entries)
+            if self._total_bytes <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries if entries is not None else self._scan()):
+                if self._total_bytes <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                self._total_bytes -= size
+                self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics
+
+        Returns:
+            Dict[str, Any]: hits, misses, writes, evictions, hit_rate, entries, bytes
+        """
+        entries = self._scan()
+        with self._lock:
+            stats = dict(self._stats)
+            self._total_bytes = sum(size for _, size, _ in entries)
+            stats["bytes"] = self._total_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["entries"] = len(entries)
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def clear(self) -> None:
+        """Remove every stored artifact"""
+        with self._lock:
+            shutil.rmtree(self.root_dir, ignore_errors=True)
+            self._total_bytes = 0
+
+
+# Global artifact store instance (created on first use)
+_artifact_store = None
+_artifact_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    Get the global artifact store instance
+
+    The "performance.artifact_cache_dir" and "performance.artifact_cache_max_mb"
+    settings configure its location and size.
+
+    Returns:
+        ArtifactStore: Global artifact store
+    """
+    global _artifact_store
+    with _artifact_store_lock:
+        if _artifact_store is None:
+            try:
+                from config.settings import get_setting
+                root_dir = get_setting("performance.artifact_cache_dir")
+                max_mb = get_setting("performance.artifact_cache_max_mb", 512)
+            except ImportError:
+                root_dir, max_mb = None, 512
+            _artifact_store = ArtifactStore(root_dir, max_bytes=int(max_mb) * 1024 * 1024)
+        return _artifact_store
@@ -0,0 +1,369 @@
+"""
+Template-PDF mode for mostly static documents (Certificate II)
+Certificate II differs between bills only in a handful of fields. Instead of
+converting its HTML for every bill, the page is printed once per template
+version and engine with fixed-width, hidden field slots; the per-bill values
+are then drawn as a small vector text layer and merged onto the cached page.
+
+The slot positions are found by printing the template a second time with the
+slot markers visible. The template is only used for stamping if both prints
+have identical text outside the slots (i.e. the engine honoured the fixed
+slot widths); otherwise documents are rendered normally.
+
+Values are drawn with the bundled metric-compatible TTF (core.font_bundle)
+when present, or the built-in Type1 font otherwise. A bill whose values have
+characters the overlay font cannot draw (e.g. a Devanagari officer name) is
+rendered from the HTML template instead.
+"""
+
+import functools
+import io
+import logging
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from pypdf import PdfReader, PdfWriter
+
+logger = logging.getLogger(__name__)
+
+try:
+    from reportlab.lib.colors import HexColor
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+try:
+    from core.font_bundle import FONT_DIR
+except ImportError:
+    FONT_DIR = None
+
+try:
+    from data.artifact_store import artifact_key, get_artifact_store
+except ImportError:
+    artifact_key = get_artifact_store = None
+
+# Bump when the overlay drawing changes so persisted template PDFs are rebuilt
+STAMP_VERSION = "2"
+
+# Built-in slot font -> bundled TTF with the same metrics (and far more glyphs)
+BUNDLED_OVERLAY_FONTS = {"Times-Bold": "LiberationSerif-Bold.ttf"}
+
+_MARKER = re.compile(r"\[\[(\w+)\]\]")
+_MM = 72 / 25.4
+
+
+class FieldSlot(NamedTuple):
+    """A per-bill field of a stamped document (must match the template's field() macro)"""
+    default: str
+    width_mm: float
+    align: str  # "left" or "right" (right-aligned paragraphs end with the slot)
+    font: str
+    color: str
+
+
+_HIGHLIGHT = ("Times-Bold", "#1565c0")
+_OFFICER = ("Times-Bold", "#1a1a1a")
+
+# Sheet name -> field name -> slot
+STAMP_SHEETS: Dict[str, Dict[str, FieldSlot]] = {
+    "Certificate II": {
+        "measurement_officer": FieldSlot("Junior Engineer", 45, "left", *_HIGHLIGHT),
+        "measurement_date": FieldSlot("01/03/2025", 24, "left", *_HIGHLIGHT),
+        "measurement_book_page": FieldSlot("04-20", 18, "left", *_HIGHLIGHT),
+        "measurement_book_no": FieldSlot("887", 18, "left", *_HIGHLIGHT),
+        "officer_name": FieldSlot("Name of Officer", 80, "right", *_OFFICER),
+        "officer_designation": FieldSlot("Assistant Engineer", 80, "right", *_OFFICER),
+        "bill_date": FieldSlot("__/__/____", 28, "right", *_OFFICER),
+        "authorising_officer_name": FieldSlot("Name of Authorising Officer", 80, "right", *_OFFICER),
+        "authorising_officer_designation": FieldSlot("Executive Engineer", 80, "right", *_OFFICER),
+        "authorisation_date": FieldSlot("__/__/____", 28, "right", *_OFFICER),
+    },
+}
+
+
+@functools.lru_cache(maxsize=None)
+def overlay_font(font: str) -> str:
+    """
+    Get the ReportLab font used to draw a slot's values
+
+    Args:
+        font (str): The slot's built-in font, e.g. "Times-Bold"
+
+    Returns:
+        str: Registered name of the bundled TTF when present, otherwise font
+    """
+    file_name = BUNDLED_OVERLAY_FONTS.get(font)
+    if FONT_DIR and file_name:
+        path = os.path.join(FONT_DIR, file_name)
+        if os.path.exists(path):
+            name = os.path.splitext(file_name)[0]
+            try:
+                pdfmetrics.registerFont(TTFont(name, path))
+                return name
+            except Exception as e:
+                logger.warning(f"Could not load bundled overlay font {file_name}: {e}")
+    return font
+
+
+def can_draw(value: str, font: str) -> bool:
+    """
+    Check that a font has a glyph for every character of a value
+
+    Args:
+        value (str): Text to draw
+        font (str): Registered ReportLab font name
+
+    Returns:
+        bool: False if any character would come out as a missing glyph
+    """
+    face = getattr(pdfmetrics.getFont(font), "face", None)
+    char_to_glyph = getattr(face, "charToGlyph", None)
+    if char_to_glyph is not None:
+        return all(ord(char) in char_to_glyph for char in value)
+    # Built-in Type1 fonts use WinAnsiEncoding
+    try:
+        value.encode("cp1252")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+class _Placement(NamedTuple):
+    page: int
+    x: float
+    y: float
+    size: float
+
+
+def _text_runs(page) -> List[tuple]:
+    """(text, x, y, font size) of each text run on a page, in user space"""
+    runs = []
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        if not text.strip():
+            return
+        a = tm[0] * cm[0] + tm[1] * cm[2]
+        b = tm[0] * cm[1] + tm[1] * cm[3]
+        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        runs.append((text, x, y, font_size * math.hypot(a, b)))
+
+    page.extract_text(visitor_text=visitor)
+    return runs
+
+
+def _normalized_text(reader: PdfReader) -> str:
+    return " ".join(" ".join(page.extract_text() or "" for page in reader.pages).split())
+
+
+class StampTemplate:
+    """A cached static PDF plus the positions of its per-bill fields"""
+
+    def __init__(self, base_pdf: bytes, placements: Dict[str, _Placement], fields: Dict[str, FieldSlot]):
+        self.base_pdf = base_pdf
+        self.placements = placements
+        self.fields = fields
+
+    @classmethod
+    def build(cls, locate_pdf: bytes, base_pdf: bytes, fields: Dict[str, FieldSlot]) -> Optional["StampTemplate"]:
+        """
+        Derive a stamp template from the marker (locate) and hidden-slot (base) prints
+
+        Args:
+            locate_pdf (bytes): Print with visible [[field]] markers
+            base_pdf (bytes): Print with the same slots hidden
+            fields (Dict[str, FieldSlot]): Fields of the document
+
+        Returns:
+            Optional[StampTemplate]: None if the prints do not share one static layout
+        """
+        locate, base = PdfReader(io.BytesIO(locate_pdf)), PdfReader(io.BytesIO(base_pdf))
+        if len(locate.pages) != len(base.pages):
+            return None
+
+        placements = {}
+        for page_index, page in enumerate(locate.pages):
+            for text, x, y, size in _text_runs(page):
+                for match in _MARKER.finditer(text):
+                    if match.group(1) not in fields:
+                        continue
+                    if text[:match.start()].strip():
+                        # Marker shares a run with preceding text: its x offset is unknown
+                        return None
+                    placements[match.group(1)] = _Placement(page_index, x, y, size)
+
+        if set(placements) != set(fields):
+            return None
+        # The slots must not have changed the surrounding layout
+        if "[[" in _normalized_text(base) or \
+                _normalized_text(base) != " ".join(_MARKER.sub(" ", _normalized_text(locate)).split()):
+            return None
+        return cls(base_pdf, placements, fields)
+
+    def stamp(self, data: Dict[str, Any]) -> Optional[bytes]:
+        """
+        Overlay per-bill values onto the cached page
+
+        Args:
+            data (dict): Template data (missing fields use the template defaults)
+
+        Returns:
+            Optional[bytes]: PDF document, or None if a value cannot be drawn with the overlay font
+        """
+        values = {}
+        for name in self.placements:
+            slot = self.fields[name]
+            values[name] = str(data[name]) if name in data else slot.default
+            if not can_draw(values[name], overlay_font(slot.font)):
+                logger.info(f"Cannot stamp {name} with {overlay_font(slot.font)}; rendering from HTML")
+                return None
+
+        writer = PdfWriter(clone_from=PdfReader(io.BytesIO(self.base_pdf)))
+        overlay_pages = {}
+        for name, placement in self.placements.items():
+            overlay_pages.setdefault(placement.page, []).append((name, placement))
+
+        for page_index, items in overlay_pages.items():
+            page = writer.pages[page_index]
+            buffer = io.BytesIO()
+            overlay = canvas.Canvas(buffer, pagesize=(float(page.mediabox.width), float(page.mediabox.height)))
+            for name, placement in items:
+                slot = self.fields[name]
+                value = values[name]
+                font = overlay_font(slot.font)
+                width = slot.width_mm * _MM
+                size = placement.size
+                text_width = stringWidth(value, font, size)
+                if text_width > width:
+                    size = size * width / text_width
+                overlay.setFont(font, size)
+                overlay.setFillColor(HexColor(slot.color))
+                if slot.align == "right":
+                    overlay.drawRightString(placement.x + width, placement.y, value)
+                else:
+                    overlay.drawString(placement.x, placement.y, value)
+            overlay.save()
+            page.merge_page(PdfReader(io.BytesIO(buffer.getvalue())).pages[0])
+
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue()
+
+
+# (sheet, template version, engine, orientation) -> StampTemplate, or None if unsupported
+_templates: Dict[tuple, Optional[StampTemplate]] = {}
+# One lock per cache key, so a cold print only blocks callers waiting for the same template
+_template_locks: Dict[tuple, threading.Lock] = {}
+_templates_lock = threading.Lock()
+
+
+def _print_pair(sheet_name, orientation, template_dir, engine, template_version):
+    """Print (or load from the artifact store) the locate and base PDFs"""
+    from exports import renderers
+
+    generator = renderers.pdf_generator_for(sheet_name, orientation)
+    prints = []
+    for mode in ("locate", "base"):
+        store = key = None
+        if get_artifact_store is not None:
+            store = get_artifact_store()
+            key = artifact_key(template=template_version, engine=engine, orientation=orientation,
+                               stamp_mode=mode, stamp_version=STAMP_VERSION)
+            cached = store.get_bytes(key)
+            if cached:
+                prints.append(cached)
+                continue
+        html = renderers.render_template(sheet_name, {"stamp_mode": mode}, template_dir)
+        pdf = generator.generate_pdf_bytes(html, engine=engine)
+        if not pdf:
+            return None
+        renderers.save_pdf_artifact(store, key, content=pdf)
+        prints.append(pdf)
+    return prints
+
+
+def get_stamp_template(sheet_name: str, orientation: str, template_dir: str) -> Optional[StampTemplate]:
+    """
+    Get the stamp template for a sheet, printing it on first use
+
+    Args:
+        sheet_name (str): Sheet name, e.g. "Certificate II"
+        orientation (str): Page orientation
+        template_dir (str): Directory containing templates
+
+    Returns:
+        Optional[StampTemplate]: None if the sheet cannot be stamped with the current engine
+    """
+    if not REPORTLAB_AVAILABLE or sheet_name not in STAMP_SHEETS:
+        return None
+    from exports import renderers
+
+    generator = renderers.pdf_generator_for(sheet_name, orientation)
+    engines = generator.select_engines(renderers.pdf_route(sheet_name, generator.orientation), log=False)
+    if not engines:
+        return None
+    template_version = renderers.template_version(template_dir, sheet_name)
+    cache_key = (sheet_name, template_version, engines[0], generator.orientation)
+
+    with _templates_lock:
+        if cache_key in _templates:
+            return _templates[cache_key]
+        key_lock = _template_locks.setdefault(cache_key, threading.Lock())
+
+    with key_lock:
+        with _templates_lock:
+            if cache_key in _templates:
+                return _templates[cache_key]
+        try:
+            prints = _print_pair(sheet_name, generator.orientation, template_dir, engines[0], template_version)
+        except Exception as e:
+            logger.warning(f"Could not prepare {sheet_name} template PDF: {e}")
+            return None
+        if not prints:
+            # Transient print failure: try again on the next bill
+            return None
+        try:
+            template = StampTemplate.build(prints[0], prints[1], STAMP_SHEETS[sheet_name])
+        except Exception as e:
+            logger.warning(f"Could not read {sheet_name} template PDFs: {e}")
+            template = None
+        if template is None:
+            logger.info(f"{sheet_name} stamping unavailable with engine {engines[0]}; rendering per bill")
+        with _templates_lock:
+            _templates[cache_key] = template
+        return template
+
+
+def render_stamped_pdf(sheet_name: str, data: Dict[str, Any], orientation: str,
+                       template_dir: str) -> Optional[bytes]:
+    """
+    Render a sheet by stamping its values onto the cached template PDF
+
+    The "pdf.stamp_certificates" setting (default True) enables this mode.
+
+    Args:
+        sheet_name (str): Sheet name
+        data (dict): Template data
+        orientation (str): Page orientation
+        template_dir (str): Directory containing templates
+
+    Returns:
+        Optional[bytes]: PDF document, or None if the sheet must be rendered normally
+    """
+    if sheet_name not in STAMP_SHEETS:
+        return None
+    try:
+        from config.settings import get_setting
+        if not get_setting("pdf.stamp_certificates", True):
+            return None
+    except ImportError:
+        pass
+    template = get_stamp_template(sheet_name, orientation, template_dir)
+    return template.stamp(data) if template is not None else None
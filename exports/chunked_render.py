@@ -0,0 +1,115 @@
+"""
+Row chunking for very long bill tables
+HTML engines slow down super-linearly on huge tables, so First Page and
+Deviation Statement documents with many items are split into fixed-size row
+chunks. Each chunk is a complete document (repeated table header) that ends
+with a "Carried Forward" subtotal row; the next chunk opens with the same
+figures as "Brought Forward". Only the last chunk prints the bill totals, so
+the concatenated PDF carries exactly the totals of the single-document output.
+Running subtotals are carried unrounded (like the bill totals, they are only
+rounded when printed), so no rounding error builds up from chunk to chunk.
+
+Each chunk is printed as its own document, so a chunk's last page may be only
+partly filled: the chunked PDF can have up to one page per chunk boundary more
+than a single-document render of the same bill.
+
+The templates read the chunk context from data["chunk"].
+"""
+
+from typing import Any, Dict, List, Optional
+
+try:
+    from config.settings import get_setting
+except ImportError:
+    get_setting = None
+
+DEFAULT_CHUNK_ROWS = 500
+
+# Sheet name -> item amount columns carried between chunks
+CHUNKED_SHEETS = {
+    "First Page": ("amount", "amount_previous"),
+    "Deviation Statement": ("amt_wo", "amt_bill", "excess_amt", "saving_amt"),
+}
+
+
+def chunk_rows() -> int:
+    """
+    Get the configured rows per chunk
+
+    The "performance.pdf_chunk_rows" setting overrides the default; 0 disables chunking.
+
+    Returns:
+        int: Rows per chunk
+    """
+    configured = get_setting("performance.pdf_chunk_rows", DEFAULT_CHUNK_ROWS) if get_setting else None
+    return DEFAULT_CHUNK_ROWS if configured is None else int(configured)
+
+
+def needs_chunking(sheet_name: str, data: Dict[str, Any], rows: Optional[int] = None) -> bool:
+    """
+    Check whether a document is long enough to be rendered in chunks
+
+    Args:
+        sheet_name (str): Sheet name, e.g. "Deviation Statement"
+        data (dict): The sheet's template data
+        rows (int): Rows per chunk (default: chunk_rows())
+
+    Returns:
+        bool: True if the items table spans more than one chunk
+    """
+    rows = chunk_rows() if rows is None else rows
+    if sheet_name not in CHUNKED_SHEETS or rows <= 0 or "chunk" in data:
+        return False
+    return len(data.get("items") or []) > rows
+
+
+def _amount(value: Any) -> float:
+    """Numeric value of an item amount ('' and non-numeric values count as 0)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "").strip() or 0)
+    except ValueError:
+        return 0.0
+
+
+def split_into_chunks(sheet_name: str, data: Dict[str, Any], rows: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Split a document's template data into row chunks with running subtotals
+
+    Args:
+        sheet_name (str): Sheet name, e.g. "First Page"
+        data (dict): The sheet's template data
+        rows (int): Rows per chunk (default: chunk_rows())
+
+    Returns:
+        List[dict]: Template data per chunk, in order
+    """
+    rows = chunk_rows() if rows is None else rows
+    columns = CHUNKED_SHEETS[sheet_name]
+    items = data.get("items") or []
+    slices = [items[start:start + rows] for start in range(0, len(items), rows)] or [[]]
+
+    running = {column: 0.0 for column in columns}
+    chunks = []
+    for index, chunk_items in enumerate(slices):
+        brought_forward = dict(running) if index else None
+        for item in chunk_items:
+            if item.get("is_divider"):
+                continue
+            for column in columns:
+                running[column] += _amount(item.get(column))
+        chunk = dict(data)
+        chunk["items"] = chunk_items
+        if index and "header" in chunk:
+            # The bill header block is printed once, on the first chunk
+            chunk["header"] = []
+        chunk["chunk"] = {
+            "index": index,
+            "count": len(slices),
+            "last": index == len(slices) - 1,
+            "brought_forward": brought_forward,
+            "carried_forward": dict(running),
+        }
+        chunks.append(chunk)
+    return chunks
@@ -0,0 +1,331 @@
+"""
+Skeleton-based Word documents
+Instead of building every .docx from Document() (page setup, headings, styles
+and widths set in code on each run), a prebuilt and styled skeleton per
+document type ships in templates/ (first_page.docx, ...) and only its XML is
+filled in. The skeletons can be edited in Word like any other document.
+
+Skeleton conventions (placeholders are plain text in the document):
+
+- {{name}}: a field, replaced by the sheet's value for that name
+- a table row containing {{item.<field>}}: repeated once per item (the whole
+  table is dropped when the sheet has no items)
+- a table row containing {{divider.description}}: used for divider items
+- a paragraph containing {{line}}: repeated once per header line
+
+Only the parts holding placeholders (word/document.xml, headers, footers) are
+rewritten; every other part of the package is copied byte-for-byte. Word may
+split a placeholder across runs while a skeleton is edited; such runs are
+joined before filling.
+
+python scripts/build_docx_skeletons.py regenerates the stock skeletons.
+"""
+
+import copy
+import logging
+import os
+import re
+import threading
+import zipfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+try:
+    from config.settings import get_setting
+except ImportError:
+    get_setting = None
+
+logger = logging.getLogger(__name__)
+
+SKELETON_DIR = str(Path(__file__).resolve().parent.parent / "templates")
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*([\w.]+)\s*\}\}")
+_ROW_PREFIXES = ("item.", "divider.")
+# Package parts that may hold placeholders
+_FILLED_PART_RE = re.compile(r"^word/(document|header\d*|footer\d*)\.xml$")
+
+_cache: Dict[str, Tuple[float, List[Tuple[zipfile.ZipInfo, bytes]]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _w(tag: str) -> str:
+    return f"{{{W_NS}}}{tag}"
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _percent(value: Any) -> float:
+    """Premium percent as a fraction (strings accepted, invalid values count as 0)"""
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _first_page_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    totals = data.get("totals", {}) or {}
+    premium = totals.get("premium", {}) or {}
+    extra_sum = totals.get("extra_items_sum", 0)
+    last_bill = totals.get("last_bill_amount", 0)
+    net_payable = totals.get("net_payable", totals.get("payable", 0))
+    return {
+        "grand_total": totals.get("grand_total", ""),
+        "premium_label": f"Tender Premium @ {_percent(premium.get('percent')) * 100:.2f}%",
+        "premium_amount": premium.get("amount", ""),
+        "extra_items_text": "Sum of Extra Items (including Tender Premium): "
+                            + (f"Rs. {extra_sum}" if extra_sum and extra_sum > 0 else "NIL"),
+        "payable": totals.get("payable", ""),
+        "last_bill": f"{last_bill:.2f}" if last_bill else "0.00",
+        "net_payable": f"{net_payable:.2f}" if isinstance(net_payable, (int, float)) else _text(net_payable),
+    }
+
+
+def _deviation_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    summary = data.get("summary", {}) or {}
+    premium = summary.get("premium", {}) or {}
+    fields = {key: summary.get(key, "") for key in (
+        "work_order_total", "executed_total", "overall_excess", "overall_saving", "net_difference",
+        "tender_premium_f", "tender_premium_h", "tender_premium_j", "tender_premium_l",
+        "grand_total_f", "grand_total_h", "grand_total_j", "grand_total_l",
+    )}
+    fields["premium_label"] = f"Add Tender Premium ({_percent(premium.get('percent')) * 100:.2f}%)"
+    fields["net_difference_label"] = ("Overall Saving With Respect to the Work Order Amount Rs."
+                                      if summary.get("is_saving", False)
+                                      else "Overall Excess With Respect to the Work Order Amount Rs.")
+    fields["percentage_deviation"] = f"{summary.get('percentage_deviation', 0):.2f}%"
+    return fields
+
+
+def _header_lines(data: Dict[str, Any]) -> List[str]:
+    return [" ".join(_text(value) for value in row if value and _text(value).strip())
+            for row in data.get("header", []) or []
+            if row and any(_text(value).strip() for value in row if value)]
+
+
+# Sheet name -> (skeleton file, fields builder)
+SKELETONS: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Dict[str, Any]]]] = {
+    "First Page": ("first_page.docx", _first_page_fields),
+    "Deviation Statement": ("deviation_statement.docx", _deviation_fields),
+    "Extra Items": ("extra_items.docx", lambda data: {}),
+}
+
+
+def skeletons_enabled() -> bool:
+    """The "word.skeleton_templates" setting (default: on)"""
+    enabled = get_setting("word.skeleton_templates", True) if get_setting else True
+    return bool(enabled)
+
+
+def skeleton_path(sheet_name: str, template_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Get the skeleton for a sheet
+
+    Args:
+        sheet_name (str): Sheet name, e.g. "First Page"
+        template_dir (str): Directory holding the skeletons (default: SKELETON_DIR)
+
+    Returns:
+        Optional[str]: Path, or None if the sheet has no skeleton or it is missing
+    """
+    if sheet_name not in SKELETONS:
+        return None
+    path = os.path.join(template_dir or SKELETON_DIR, SKELETONS[sheet_name][0])
+    return path if os.path.exists(path) else None
+
+
+def _read_package(path: str) -> List[Tuple[zipfile.ZipInfo, bytes]]:
+    """A skeleton's parts, cached until the file changes"""
+    mtime = os.path.getmtime(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    with zipfile.ZipFile(path) as package:
+        parts = [(info, package.read(info)) for info in package.infolist()]
+    with _cache_lock:
+        _cache[path] = (mtime, parts)
+    return parts
+
+
+def _join_split_placeholders(root) -> None:
+    """Merge runs Word split a placeholder across, so each placeholder sits in one w:t"""
+    for paragraph in root.iter(_w("p")):
+        texts = list(paragraph.iter(_w("t")))
+        index = 0
+        while index < len(texts):
+            node = texts[index]
+            value = node.text or ""
+            following = index + 1
+            while value.rfind("{{") > value.rfind("}}") and following < len(texts):
+                value += texts[following].text or ""
+                texts[following].text = ""
+                following += 1
+            if "{{" in value:
+                node.text = value
+                node.set(XML_SPACE, "preserve")
+            index = following
+
+
+def _value_xml(value: Any) -> str:
+    """A value as w:t content; line breaks become w:br"""
+    text = _text(value)
+    if "\n" not in text:
+        return escape(text)
+    return '</w:t><w:br/><w:t xml:space="preserve">'.join(escape(line) for line in text.split("\n"))
+
+
+def _fill_rows(root, items: List[Dict[str, Any]]) -> None:
+    """Replace the item/divider template rows with one row per item"""
+    templates = {}
+    anchor = None
+    for row in list(root.iter(_w("tr"))):
+        text = "".join(node.text or "" for node in row.iter(_w("t")))
+        kind = "divider" if "{{divider." in text else "item" if "{{item." in text else None
+        if kind is None:
+            continue
+        parent = row.getparent()
+        if anchor is None:
+            anchor = (parent, parent.index(row))
+        templates.setdefault(kind, etree.tostring(row, encoding="unicode"))
+        parent.remove(row)
+    if anchor is None:
+        return
+    if not items:
+        # Like the in-code builders (exports.word_generator), a bill without items has no table
+        table = anchor[0]
+        while table is not None and table.tag != _w("tbl"):
+            table = table.getparent()
+        if table is not None and table.getparent() is not None:
+            table.getparent().remove(table)
+        return
+
+    # Precompiled row templates: literal XML chunks and placeholder names, alternating
+    compiled = {kind: _PLACEHOLDER_RE.split(xml) for kind, xml in templates.items()}
+    rows = []
+    for item in items:
+        kind = "divider" if item.get("is_divider") and "divider" in compiled else "item"
+        if kind not in compiled:
+            continue
+        chunks = compiled[kind]
+        rows.append("".join(
+            chunk if position % 2 == 0 else _value_xml(item.get(chunk.split(".", 1)[-1], ""))
+            for position, chunk in enumerate(chunks)
+        ))
+    if not rows:
+        return
+    table = etree.fromstring(f'<w:tbl xmlns:w="{W_NS}">{"".join(rows)}</w:tbl>')
+    parent, index = anchor
+    following = parent[index] if index < len(parent) else None
+    # Row by row: moving one large subtree between documents is super-linear (see exports.docx_tables)
+    for row in list(table):
+        if following is not None:
+            following.addprevious(row)
+        else:
+            parent.append(row)
+
+
+def _fill_lines(root, lines: List[str]) -> None:
+    """Repeat each {{line}} paragraph once per header line"""
+    for paragraph in list(root.iter(_w("p"))):
+        if "{{line}}" not in "".join(node.text or "" for node in paragraph.iter(_w("t"))):
+            continue
+        parent = paragraph.getparent()
+        index = parent.index(paragraph)
+        for offset, line in enumerate(lines):
+            copied = copy.deepcopy(paragraph)
+            for node in copied.iter(_w("t")):
+                if node.text and "{{line}}" in node.text:
+                    node.text = node.text.replace("{{line}}", line)
+            parent.insert(index + offset, copied)
+        parent.remove(paragraph)
+
+
+def _fill_fields(root, fields: Dict[str, Any]) -> None:
+    """Replace {{name}} fields (row placeholders are left for _fill_rows)"""
+    def _replace(match):
+        name = match.group(1)
+        if name.startswith(_ROW_PREFIXES):
+            return match.group(0)
+        return _text(fields.get(name, ""))
+
+    for node in root.iter(_w("t")):
+        if node.text and "{{" in node.text:
+            node.text = _PLACEHOLDER_RE.sub(_replace, node.text)
+
+
+def fill_part(xml: bytes, fields: Dict[str, Any], items: Optional[List[Dict[str, Any]]] = None,
+              lines: Optional[List[str]] = None) -> bytes:
+    """
+    Fill one XML part of a skeleton
+
+    Args:
+        xml (bytes): Part content
+        fields (dict): {{name}} values
+        items (list): Rows for the {{item.*}}/{{divider.*}} template rows
+        lines (list): Paragraphs for the {{line}} template paragraph
+
+    Returns:
+        bytes: Filled part
+    """
+    root = etree.fromstring(xml)
+    _join_split_placeholders(root)
+    # Rows last: the other passes then only walk the skeleton, and values are never re-parsed
+    _fill_lines(root, lines or [])
+    _fill_fields(root, fields)
+    _fill_rows(root, items or [])
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def fill_skeleton(path: str, output_path: str, fields: Dict[str, Any],
+                  items: Optional[List[Dict[str, Any]]] = None, lines: Optional[List[str]] = None) -> str:
+    """
+    Write a filled copy of a skeleton
+
+    Args:
+        path (str): Skeleton .docx
+        output_path (str): Output .docx
+        fields (dict): {{name}} values
+        items (list): Table rows
+        lines (list): Header lines
+
+    Returns:
+        str: output_path
+    """
+    with zipfile.ZipFile(output_path, "w") as output:
+        for info, content in _read_package(path):
+            if _FILLED_PART_RE.match(info.filename) and b"{{" in content:
+                content = fill_part(content, fields, items, lines)
+            # Same entry metadata and compression; untouched parts keep their exact bytes
+            output.writestr(info, content)
+    return output_path
+
+
+def render_skeleton(sheet_name: str, data: Dict[str, Any], output_path: str,
+                    template_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Produce a sheet's Word document from its skeleton
+
+    Args:
+        sheet_name (str): Sheet name
+        data (dict): The sheet's data (as for the HTML templates)
+        output_path (str): Output .docx
+        template_dir (str): Directory holding the skeletons (default: SKELETON_DIR)
+
+    Returns:
+        Optional[str]: output_path, or None when skeletons are disabled or the sheet has none
+    """
+    if not skeletons_enabled():
+        return None
+    path = skeleton_path(sheet_name, template_dir)
+    if path is None:
+        return None
+    fields = SKELETONS[sheet_name][1](data)
+    return fill_skeleton(path, output_path, fields, data.get("items", []) or [], _header_lines(data))
@@ -0,0 +1,178 @@
+"""
+Bulk DOCX table construction
+Filling a python-docx table cell by cell (cell.text, per-cell borders and
+widths) walks and rebuilds the table's XML on every access, so large bills
+take minutes. Here the whole table is generated as WordprocessingML text from
+per-column templates prepared once per table (widths, spans, run properties),
+parsed in one pass and moved into the document one row subtree at a time.
+Borders are set once at table level and the header row repeats on each page.
+
+Rows are lists of cell values; a DocxCell adds column spans, bold text or
+alignment to a value.
+"""
+
+import re
+from typing import Any, List, NamedTuple, Optional, Sequence, Union
+from xml.sax.saxutils import escape
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.table import Table
+
+TWIPS_PER_MM = 1440 / 25.4
+
+# Text width of a default python-docx Document (Letter, 1 inch margins)
+DEFAULT_TEXT_WIDTH_MM = 165.1
+
+# Characters XML 1.0 cannot carry (python-docx rejects them too)
+_INVALID_XML_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_BORDERS = "".join(
+    f'<w:{edge} w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+    for edge in ("top", "left", "bottom", "right", "insideH", "insideV")
+)
+
+
+class DocxCell(NamedTuple):
+    """A cell value with formatting"""
+    text: Any = ""
+    span: int = 1
+    bold: bool = False
+    align: Optional[str] = None  # "left", "center" or "right"
+
+
+Row = Sequence[Union[Any, DocxCell]]
+
+
+def even_widths(columns: int, total_mm: float = DEFAULT_TEXT_WIDTH_MM) -> List[float]:
+    """Equal column widths filling total_mm (what "Table Grid" autofit gives a new table)"""
+    return [total_mm / columns] * columns
+
+
+def _twips(mm: float) -> int:
+    return int(round(mm * TWIPS_PER_MM))
+
+
+def _run(text: Any, run_properties: str) -> str:
+    """Paragraph content for a value: one run, line breaks as <w:br/>"""
+    text = "" if text is None else _INVALID_XML_RE.sub("", str(text))
+    if not text:
+        return ""
+    body = '</w:t><w:br/><w:t xml:space="preserve">'.join(escape(line) for line in text.split("\n"))
+    return f'<w:r>{run_properties}<w:t xml:space="preserve">{body}</w:t></w:r>'
+
+
+class DocxTableBuilder:
+    """Builds a fixed-layout table's XML in bulk"""
+
+    def __init__(self, widths_mm: Sequence[float], font_size: Optional[float] = None,
+                 header_font_size: Optional[float] = 8):
+        """
+        Initialize a builder for one table layout
+
+        Args:
+            widths_mm (Sequence[float]): Column widths in millimetres
+            font_size (float): Body text size in points (default: document default)
+            header_font_size (float): Header text size in points
+        """
+        self.widths = [_twips(width) for width in widths_mm]
+        self.font_size = font_size
+        self.header_font_size = header_font_size
+        self._rows: List[str] = []
+        # Cell property templates per (start column, span)
+        self._tc_pr = {}
+        self._run_properties = {}
+
+    def _cell_properties(self, column: int, span: int) -> str:
+        key = (column, span)
+        properties = self._tc_pr.get(key)
+        if properties is None:
+            width = sum(self.widths[column:column + span])
+            grid_span = f'<w:gridSpan w:val="{span}"/>' if span > 1 else ""
+            properties = f'<w:tcPr><w:tcW w:w="{width}" w:type="dxa"/>{grid_span}</w:tcPr>'
+            self._tc_pr[key] = properties
+        return properties
+
+    def _rpr(self, bold: bool, size: Optional[float]) -> str:
+        key = (bold, size)
+        properties = self._run_properties.get(key)
+        if properties is None:
+            parts = ("<w:b/>" if bold else "") + (f'<w:sz w:val="{int(size * 2)}"/>' if size else "")
+            properties = f"<w:rPr>{parts}</w:rPr>" if parts else ""
+            self._run_properties[key] = properties
+        return properties
+
+    def _row_xml(self, cells: Row, header: bool, bold: bool) -> str:
+        size = self.header_font_size if header else self.font_size
+        parts = ["<w:tr>", "<w:trPr><w:tblHeader/></w:trPr>" if header else ""]
+        column = 0
+        for cell in cells:
+            if column >= len(self.widths):
+                break
+            if not isinstance(cell, DocxCell):
+                cell = DocxCell(cell)
+            span = max(1, min(cell.span, len(self.widths) - column))
+            paragraph_properties = f'<w:pPr><w:jc w:val="{cell.align}"/></w:pPr>' if cell.align else ""
+            parts.append(
+                f"<w:tc>{self._cell_properties(column, span)}<w:p>{paragraph_properties}"
+                f"{_run(cell.text, self._rpr(header or bold or cell.bold, size))}</w:p></w:tc>"
+            )
+            column += span
+        # Pad short rows so every row covers the grid
+        while column < len(self.widths):
+            parts.append(f"<w:tc>{self._cell_properties(column, 1)}<w:p/></w:tc>")
+            column += 1
+        parts.append("</w:tr>")
+        return "".join(parts)
+
+    def add_header(self, labels: Row) -> None:
+        """Add a bold header row that repeats on every page"""
+        self._rows.append(self._row_xml(labels, header=True, bold=True))
+
+    def add_row(self, cells: Row, bold: bool = False) -> None:
+        """
+        Add a body row
+
+        Args:
+            cells (Row): Values or DocxCells, left to right (short rows are padded)
+            bold (bool): Bold every cell
+        """
+        self._rows.append(self._row_xml(cells, header=False, bold=bold))
+
+    def add_rows(self, rows: Sequence[Row]) -> None:
+        """Add several plain body rows"""
+        self._rows.extend(self._row_xml(cells, header=False, bold=False) for cells in rows)
+
+    def to_xml(self) -> str:
+        """The table's WordprocessingML"""
+        grid = "".join(f'<w:gridCol w:w="{width}"/>' for width in self.widths)
+        return (
+            f"<w:tbl {nsdecls('w')}>"
+            f'<w:tblPr><w:tblW w:w="{sum(self.widths)}" w:type="dxa"/>'
+            f"<w:tblBorders>{_BORDERS}</w:tblBorders>"
+            '<w:tblLayout w:type="fixed"/>'
+            '<w:tblCellMar><w:left w:w="57" w:type="dxa"/><w:right w:w="57" w:type="dxa"/></w:tblCellMar>'
+            f"</w:tblPr><w:tblGrid>{grid}</w:tblGrid>"
+            f"{''.join(self._rows)}</w:tbl>"
+        )
+
+    def insert(self, doc) -> Table:
+        """
+        Parse the table once and append it to a document's body
+
+        Args:
+            doc: python-docx Document
+
+        Returns:
+            Table: The inserted table
+        """
+        tbl = parse_xml(self.to_xml())
+        rows = tbl.findall(qn("w:tr"))
+        for row in rows:
+            tbl.remove(row)
+        doc.element.body._insert_tbl(tbl)
+        # Moving one huge subtree between lxml documents reconciles namespaces
+        # (xml:space) super-linearly; moving row by row stays linear
+        for row in rows:
+            tbl.append(row)
+        return Table(tbl, doc._body)
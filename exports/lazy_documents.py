@@ -0,0 +1,137 @@
+"""
+Lazily generated bill documents
+A bill's downloads (PDFs, Word files, the merged PDF, the ZIP) are registered
+with a builder instead of being generated up front. Each document is built the
+first time it is requested (e.g. when its download button is clicked), or
+speculatively on a background thread via prefetch(), and the bytes are kept
+for the lifetime of the set, so the UI only pays for what users download.
+
+The set holds no Streamlit state itself; the app keeps one per bill in
+st.session_state.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, READY, FAILED = "pending", "running", "ready", "failed"
+
+
+class LazyDocument(NamedTuple):
+    """A downloadable document and how to build it"""
+    file_name: str
+    mime: str
+    build: Callable[[], bytes]
+
+
+class LazyDocumentSet:
+    """Memoized on-demand builds of a bill's documents"""
+
+    def __init__(self, max_workers: int = 2):
+        """
+        Initialize an empty set
+
+        Args:
+            max_workers (int): Background threads used by prefetch()
+        """
+        self.documents: Dict[str, LazyDocument] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def add(self, name: str, file_name: str, mime: str, build: Callable[[], bytes]) -> None:
+        """
+        Register a document
+
+        Args:
+            name (str): Key used by get()/prefetch()
+            file_name (str): Download file name
+            mime (str): MIME type
+            build (Callable[[], bytes]): Produces the document; may call get() for other documents
+        """
+        self.documents[name] = LazyDocument(file_name, mime, build)
+
+    def _start(self, name: str):
+        """Claim a build: returns (future, True) if the caller must run it, else (existing future, False)"""
+        with self._lock:
+            future = self._futures.get(name)
+            if future is not None and not (future.done() and future.exception() is not None):
+                return future, False
+            # Not started yet, or failed before: (re)build
+            future = Future()
+            future.set_running_or_notify_cancel()
+            self._futures[name] = future
+            return future, True
+
+    def _build(self, name: str) -> Future:
+        future, owner = self._start(name)
+        if owner:
+            try:
+                future.set_result(self.documents[name].build())
+            except Exception as e:
+                logger.warning(f"Building {self.documents[name].file_name} failed: {e}")
+                future.set_exception(e)
+        return future
+
+    def get(self, name: str) -> bytes:
+        """
+        Get a document, building it on this thread unless it is already built or in progress
+
+        Args:
+            name (str): Document key
+
+        Returns:
+            bytes: Document content
+
+        Raises:
+            KeyError: Unknown document
+            Exception: The builder's error
+        """
+        if name not in self.documents:
+            raise KeyError(name)
+        return self._build(name).result()
+
+    def getter(self, name: str) -> Callable[[], bytes]:
+        """Zero-argument callable returning the document (for deferred download buttons)"""
+        return lambda: self.get(name)
+
+    def prefetch(self, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Build documents speculatively on background threads
+
+        Args:
+            names (Iterable[str]): Documents to build (default: all)
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                     thread_name_prefix="lazy-documents")
+            executor = self._executor
+        for name in (self.documents if names is None else names):
+            if self.status(name) == PENDING:
+                executor.submit(self._build, name)
+
+    def status(self, name: str) -> str:
+        """pending, running, ready or failed (failed documents are rebuilt on the next request)"""
+        with self._lock:
+            future = self._futures.get(name)
+        if future is None:
+            return PENDING
+        if not future.done():
+            return RUNNING
+        return FAILED if future.exception() is not None else READY
+
+    def ready(self) -> List[str]:
+        """Names of the documents built so far"""
+        return [name for name in self.documents if self.status(name) == READY]
+
+    def shutdown(self) -> None:
+        """Stop the background threads (queued prefetches are dropped)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
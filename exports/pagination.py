@@ -0,0 +1,391 @@
+"""
+Page layout estimation for the long bill tables
+Government formats print "Carried Forward" subtotals at the foot of every page
+of the First Page and Deviation Statement, and "Brought Forward" at the top of
+the next. Instead of rendering a PDF and inspecting where the engine broke the
+table, the page breaks are computed here in Python: the templates use fixed
+column widths (their <colgroup>), fixed font sizes, padding and line height, so
+each row's height follows from wrapping its cell text with the font's metrics.
+
+paginate() injects the result into the template data as data["pagination"];
+the templates print the subtotal rows at the predicted breaks and force the
+page break there, so the engine's pages match the estimate. The estimate errs
+on the side of shorter pages (PAGE_FILL) so a forced break never comes after
+the engine would have broken on its own.
+
+Font metrics come from ReportLab: the bundled Carlito (core.font_bundle) when
+present, otherwise Helvetica, which is wider than Calibri and so conservative.
+The native ReportLab renderer splits its tables itself and ignores this.
+"""
+
+import functools
+import logging
+import os
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from exports.chunked_render import CHUNKED_SHEETS, _amount, needs_chunking, split_into_chunks
+
+try:
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+except ImportError:
+    pdfmetrics = TTFont = None
+
+try:
+    from core.font_bundle import FONT_DIR
+except ImportError:
+    FONT_DIR = None
+
+try:
+    from config.settings import get_setting
+except ImportError:
+    get_setting = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the estimate changes so cached PDFs are invalidated
+PAGINATION_VERSION = "1"
+
+PT_PER_MM = 72 / 25.4
+PT_PER_PX = 0.75
+
+# Share of the printable height the estimate may fill (headroom for metric differences)
+PAGE_FILL = 0.96
+
+# Template CSS: th, td { border: 1px; padding: 3px 2px } and body { line-height: 1.2 }
+CELL_PADDING_V = 3 * PT_PER_PX
+CELL_PADDING_H = 2 * PT_PER_PX
+CELL_BORDER = 1 * PT_PER_PX
+LINE_HEIGHT = 1.2
+
+# Average glyph width (in em) when no font metrics are available
+FALLBACK_EM_WIDTH = 0.55
+
+
+class Column(NamedTuple):
+    """A table column: width from the template's <colgroup> and how a row fills it"""
+    width_mm: float
+    value: Callable[[Dict[str, Any]], Any]
+
+
+class SheetLayout(NamedTuple):
+    """Page geometry and table structure of a paginated template"""
+    page_mm: Tuple[float, float]
+    margin_mm: float
+    font_size: float
+    title_size: float
+    title_gap_px: float
+    columns: Sequence[Column]
+    header_labels: Sequence[str]
+    label_column: int
+    tail_labels: Sequence[str]
+    bold: Callable[[Dict[str, Any]], bool]
+    span: Callable[[Dict[str, Any]], Optional[Tuple[int, int]]]
+    header_rows: bool
+
+
+def _field(name: str) -> Callable[[Dict[str, Any]], Any]:
+    return lambda item: item.get(name, "")
+
+
+def _quantity_upto_date(item: Dict[str, Any]) -> Any:
+    value = item.get("quantity_upto_date")
+    return value if str(value or "").strip() else item.get("quantity", "")
+
+
+SHEET_LAYOUTS: Dict[str, SheetLayout] = {
+    "First Page": SheetLayout(
+        page_mm=(210, 297),
+        margin_mm=10,
+        font_size=8,
+        title_size=11,
+        title_gap_px=4 + 8,
+        columns=[
+            Column(11, _field("unit")),
+            Column(16, _field("quantity_since_last")),
+            Column(16, _quantity_upto_date),
+            Column(11, _field("serial_no")),
+            Column(70, _field("description")),
+            Column(15, _field("rate")),
+            Column(22, _field("amount")),
+            Column(17, _field("amount_previous")),
+            Column(12, _field("remark")),
+        ],
+        header_labels=[
+            "Unit",
+            "Quantity executed (or supplied) since last certificate",
+            "Quantity executed (or supplied) upto date as per MB",
+            "S. No.",
+            'Item of Work supplies (Grouped under "sub-head" and "sub work" of estimate)',
+            "Rate",
+            "Upto date Amount",
+            "Amount Since previous bill (Total for each sub-head)",
+            "Remarks",
+        ],
+        label_column=4,
+        tail_labels=[
+            "Grand Total Rs.",
+            "Tender Premium @ 00.00%",
+            "Sum of Extra Items (including Tender Premium): NIL",
+            "Payable Amount Rs.",
+            "Less Amount Paid vide Last Bill Rs.",
+            "Net Payable Amount Rs.",
+        ],
+        bold=lambda item: bool(item.get("bold")),
+        span=lambda item: None,
+        header_rows=True,
+    ),
+    "Deviation Statement": SheetLayout(
+        page_mm=(297, 210),
+        margin_mm=10,
+        font_size=8,
+        title_size=11,
+        title_gap_px=4 + 8,
+        columns=[Column(8, _field("serial_no")), Column(120, _field("description"))]
+        + [Column(12, _field(name)) for name in ("unit", "qty_wo", "rate", "amt_wo", "qty_bill", "amt_bill",
+                                                  "excess_qty", "excess_amt", "saving_qty", "saving_amt")]
+        + [Column(37, _field("remark"))],
+        header_labels=[
+            "ITEM No.", "Description", "Unit", "Qty as per Work Order", "Rate",
+            "Amt as per Work Order Rs.", "Qty Executed", "Amt as per Executed Rs.",
+            "Excess Qty", "Excess Amt Rs.", "Saving Qty", "Saving Amt Rs.", "REMARKS/ REASON.",
+        ],
+        label_column=1,
+        tail_labels=[
+            "Grand Total Rs.",
+            "Add Tender Premium (00.00%)",
+            "Grand Total including Tender Premium Rs.",
+            "Overall Excess With Respect to the Work Order Amount Rs.",
+            "Percentage of Deviation %",
+        ],
+        bold=lambda item: bool(item.get("is_divider")),
+        span=lambda item: (1, 12) if item.get("is_divider") else None,
+        header_rows=False,
+    ),
+}
+
+
+def page_subtotals_enabled(sheet_name: str) -> bool:
+    """
+    Check whether a sheet gets per-page subtotals
+
+    The "pdf.page_subtotals" setting switches them off for all sheets.
+
+    Args:
+        sheet_name (str): Sheet name, e.g. "First Page"
+
+    Returns:
+        bool: True if the sheet's template data should be paginated
+    """
+    enabled = get_setting("pdf.page_subtotals", True) if get_setting else True
+    return bool(enabled) and sheet_name in SHEET_LAYOUTS
+
+
+@functools.lru_cache(maxsize=None)
+def _fonts() -> Tuple[Optional[str], Optional[str]]:
+    """(regular, bold) font names registered with ReportLab; (None, None) without ReportLab"""
+    if pdfmetrics is None:
+        return None, None
+    if FONT_DIR:
+        regular = os.path.join(FONT_DIR, "Carlito-Regular.ttf")
+        bold = os.path.join(FONT_DIR, "Carlito-Bold.ttf")
+        if os.path.exists(regular) and os.path.exists(bold):
+            try:
+                pdfmetrics.registerFont(TTFont("Carlito", regular))
+                pdfmetrics.registerFont(TTFont("Carlito-Bold", bold))
+                return "Carlito", "Carlito-Bold"
+            except Exception as e:
+                logger.warning(f"Could not load bundled font metrics: {e}")
+    return "Helvetica", "Helvetica-Bold"
+
+
+@functools.lru_cache(maxsize=65536)
+def _text_width(text: str, bold: bool, size: float) -> float:
+    regular, bold_font = _fonts()
+    if regular is None:
+        return len(text) * size * FALLBACK_EM_WIDTH
+    return pdfmetrics.stringWidth(text, bold_font if bold else regular, size)
+
+
+def count_lines(text: Any, width: float, size: float, bold: bool = False) -> int:
+    """
+    Count the lines a text wraps to in a cell (white-space: normal; word-wrap: break-word)
+
+    Args:
+        text (Any): Cell value
+        width (float): Content width in points
+        size (float): Font size in points
+        bold (bool): Bold face
+
+    Returns:
+        int: Number of lines (at least 1)
+    """
+    text = "" if text is None else str(text)
+    space = _text_width(" ", bold, size)
+    lines = 0
+    for paragraph in text.split("\n"):
+        lines += 1
+        line_width = 0.0
+        for word in paragraph.split():
+            word_width = _text_width(word, bold, size)
+            if line_width and line_width + space + word_width <= width:
+                line_width += space + word_width
+                continue
+            if line_width:
+                lines += 1
+            # Words wider than the cell break anywhere
+            while word_width > width:
+                lines += 1
+                word_width -= width
+            line_width = word_width
+    return max(lines, 1)
+
+
+def _row_height(cells: Sequence[Tuple[Any, float]], size: float, bold: bool = False) -> float:
+    """Height of a table row from (text, column width in mm) cells"""
+    lines = max((count_lines(text, width_mm * PT_PER_MM - 2 * CELL_PADDING_H - CELL_BORDER, size, bold)
+                 for text, width_mm in cells), default=1)
+    return lines * size * LINE_HEIGHT + 2 * CELL_PADDING_V + CELL_BORDER
+
+
+def _item_height(layout: SheetLayout, item: Dict[str, Any]) -> float:
+    span = layout.span(item)
+    widths = [column.width_mm for column in layout.columns]
+    if span:
+        first, last = span
+        cells = [(layout.columns[i].value(item), widths[i]) for i in range(first)]
+        cells.append((layout.columns[first].value(item), sum(widths[first:last + 1])))
+        cells += [(layout.columns[i].value(item), widths[i]) for i in range(last + 1, len(widths))]
+    else:
+        cells = [(column.value(item), column.width_mm) for column in layout.columns]
+    return _row_height(cells, layout.font_size, layout.bold(item))
+
+
+def _label_height(layout: SheetLayout, label: str) -> float:
+    return _row_height([(label, layout.columns[layout.label_column].width_mm)], layout.font_size, bold=True)
+
+
+def _title_height(layout: SheetLayout, data: Dict[str, Any]) -> float:
+    """Height of the block above the table (title, and the bill header lines on the First Page)"""
+    height = layout.title_size * LINE_HEIGHT + layout.title_gap_px * PT_PER_PX
+    if layout.header_rows:
+        width = (layout.page_mm[0] - 2 * layout.margin_mm) * PT_PER_MM
+        for row in data.get("header") or []:
+            text = " ".join(str(value).strip() for value in row if str(value).strip())
+            if text:
+                height += count_lines(text, width, layout.font_size) * layout.font_size * LINE_HEIGHT
+    return height
+
+
+def paginate(sheet_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Predict a document's page breaks and the subtotals carried across them
+
+    Each page holds the repeated column header, a "Brought Forward" row (except
+    on the first page, unless the data is a later chunk), its items and, if
+    more items follow, a "Carried Forward" row. The totals at the end of the
+    table flow onto a new page when they do not fit.
+
+    Args:
+        sheet_name (str): Sheet name, e.g. "Deviation Statement"
+        data (dict): The sheet's template data (may be a chunk from split_into_chunks)
+
+    Returns:
+        dict: {"version", "pages": page count, "breaks": {item index: break},
+        "page_totals": per page}. A break holds the page number and the
+        carried_forward amounts after that item; page totals hold each page's
+        first/last item index and the sum of its own items.
+    """
+    layout = SHEET_LAYOUTS[sheet_name]
+    columns = CHUNKED_SHEETS[sheet_name]
+    items = data.get("items") or []
+    chunk = data.get("chunk") or {}
+
+    available = (layout.page_mm[1] - 2 * layout.margin_mm) * PT_PER_MM * PAGE_FILL
+    thead = _row_height(list(zip(layout.header_labels, (c.width_mm for c in layout.columns))),
+                        layout.font_size, bold=True)
+    forward_row = _label_height(layout, "Brought Forward Rs.")
+
+    running = {column: _amount((chunk.get("brought_forward") or {}).get(column)) for column in columns}
+    breaks: Dict[int, Dict[str, Any]] = {}
+    page_totals: List[Dict[str, Any]] = []
+
+    def new_page(first: int) -> Dict[str, Any]:
+        page = {"page": len(page_totals) + 1, "first": first, "last": first - 1,
+                "total": {column: 0.0 for column in columns}}
+        page_totals.append(page)
+        return page
+
+    used = _title_height(layout, data) + thead + (forward_row if chunk.get("brought_forward") else 0)
+    page = new_page(0)
+    for index, item in enumerate(items):
+        height = _item_height(layout, item)
+        # Room for this item and the Carried Forward row below it
+        if page["last"] >= page["first"] and used + height + forward_row > available:
+            breaks[page["last"]] = {
+                "page": page["page"],
+                # Exact running sums; the templates round them when printing
+                "carried_forward": dict(running),
+            }
+            page = new_page(index)
+            used = thead + forward_row
+        used += height
+        page["last"] = index
+        if not item.get("is_divider"):
+            for column in columns:
+                amount = _amount(item.get(column))
+                running[column] += amount
+                page["total"][column] += amount
+
+    tail = ["Carried Forward Rs."] if chunk and not chunk.get("last") else layout.tail_labels
+    pages = len(page_totals)
+    for label in tail:
+        height = _label_height(layout, label)
+        if used + height > available:
+            pages += 1
+            used = thead
+        used += height
+
+    for page in page_totals:
+        page["total"] = {column: round(value) for column, value in page["total"].items()}
+    return {"version": PAGINATION_VERSION, "pages": pages, "breaks": breaks, "page_totals": page_totals}
+
+
+def with_pagination(sheet_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get template data with data["pagination"] filled in (input is not modified)
+
+    Sheets without a layout, disabled sheets and data already paginated are
+    returned unchanged.
+
+    Args:
+        sheet_name (str): Sheet name
+        data (dict): The sheet's template data
+
+    Returns:
+        dict: Template data
+    """
+    if not page_subtotals_enabled(sheet_name) or not isinstance(data, dict) or "pagination" in data:
+        return data
+    paginated = dict(data)
+    paginated["pagination"] = paginate(sheet_name, data)
+    return paginated
+
+
+def predict_page_count(sheet_name: str, data: Dict[str, Any]) -> Optional[int]:
+    """
+    Predict how many pages a sheet renders to, without any PDF engine
+
+    Long documents rendered in row chunks count the pages of every chunk.
+
+    Args:
+        sheet_name (str): Sheet name
+        data (dict): The sheet's template data
+
+    Returns:
+        Optional[int]: Page count, or None for sheets without a layout
+    """
+    if sheet_name not in SHEET_LAYOUTS:
+        return None
+    parts = split_into_chunks(sheet_name, data) if needs_chunking(sheet_name, data) else [data]
+    return sum(paginate(sheet_name, part)["pages"] for part in parts)
@@ -0,0 +1,116 @@
+"""
+Post-merge PDF size optimization
+Merging with PdfWriter.add_page copies every source document's fonts, images
+and content streams, so a merged bill repeats identical resources once per
+page source. This stage deduplicates identical objects, drops objects nothing
+references any more and compresses content streams, and reports the size
+before and after. (renderers.merge_pdfs applies the same optimizations while
+streaming, see exports.pdf_stream; this module optimizes in-memory writers
+and existing PDFs.)
+"""
+
+import io
+import logging
+import os
+from typing import Any, BinaryIO, Dict, Optional, Tuple, Union
+
+from pypdf import PdfReader, PdfWriter
+
+logger = logging.getLogger(__name__)
+
+
+def optimize_writer(writer: PdfWriter) -> None:
+    """
+    Optimize a PdfWriter in place before it is written
+
+    Args:
+        writer (PdfWriter): Writer holding the merged pages
+    """
+    for page in writer.pages:
+        try:
+            page.compress_content_streams()
+        except Exception as e:
+            # Malformed streams are left as they are
+            logger.debug(f"Could not compress a content stream: {e}")
+
+    compress = getattr(writer, "compress_identical_objects", None)
+    if compress is None:
+        # pypdf < 4.3 has no object deduplication
+        return
+    try:
+        compress(remove_duplicates=True, remove_unreferenced=True)
+    except TypeError:
+        # Older keyword names
+        compress(remove_identicals=True, remove_orphans=True)
+
+
+def write_optimized(writer: PdfWriter, original_bytes: int,
+                    output_path: Union[str, BinaryIO, None] = None) -> Tuple[Optional[bytes], Dict[str, Any]]:
+    """
+    Optimize a writer and serialize it, measuring the size saved
+
+    Args:
+        writer (PdfWriter): Writer holding the merged pages
+        original_bytes (int): Size of the unoptimized input (e.g. the sum of the merged sources)
+        output_path: Path or writable binary stream for the PDF; None to return bytes
+
+    Returns:
+        Tuple[Optional[bytes], Dict[str, Any]]: PDF bytes (None if written to
+        output_path) and {"original_bytes", "optimized_bytes", "saved_bytes", "saved_ratio"}
+    """
+    optimize_writer(writer)
+    after = io.BytesIO()
+    writer.write(after)
+
+    stats = size_stats(original_bytes, after.tell())
+    logger.info(f"Optimized PDF: {stats['original_bytes']} -> {stats['optimized_bytes']} bytes "
+                f"({stats['saved_ratio']:.1%} smaller)")
+
+    content = after.getvalue()
+    if output_path is None:
+        return content, stats
+    if not isinstance(output_path, (str, os.PathLike)):
+        output_path.write(content)
+        return None, stats
+    with open(output_path, "wb") as f:
+        f.write(content)
+    return None, stats
+
+
+def optimize_pdf(pdf: Union[bytes, str], output_path: Union[str, BinaryIO, None] = None) -> Tuple[Optional[bytes], Dict[str, Any]]:
+    """
+    Optimize an existing PDF
+
+    Args:
+        pdf: PDF bytes or file path
+        output_path: Path or writable binary stream for the optimized PDF; None to return bytes
+
+    Returns:
+        Tuple[Optional[bytes], Dict[str, Any]]: See write_optimized()
+    """
+    if isinstance(pdf, (bytes, bytearray)):
+        original_bytes, reader = len(pdf), PdfReader(io.BytesIO(pdf))
+    else:
+        original_bytes, reader = os.path.getsize(pdf), PdfReader(pdf)
+    writer = PdfWriter(clone_from=reader)
+    return write_optimized(writer, original_bytes, output_path)
+
+
+def size_stats(original_bytes: int, optimized_bytes: int) -> Dict[str, Any]:
+    """
+    Summarize a size reduction
+
+    Args:
+        original_bytes (int): Size before optimization
+        optimized_bytes (int): Size after optimization
+
+    Returns:
+        Dict[str, Any]: original_bytes, optimized_bytes, saved_bytes, saved_ratio
+    """
+    saved = original_bytes - optimized_bytes
+    return {
+        "original_bytes": original_bytes,
+        "optimized_bytes": optimized_bytes,
+        "saved_bytes": saved,
+        "saved_ratio": saved / original_bytes if original_bytes else 0.0,
+    }
@@ -0,0 +1,96 @@
+"""
+Bill-level PDF scheduler
+Runs the PDF jobs of a bill (First Page, Last Page, Deviation Statement, ...)
+concurrently and returns the results in their canonical order, so a bill takes
+about as long as its slowest document instead of the sum of all of them.
+
+Concurrency is engine-aware: external engines (Chrome, wkhtmltopdf) run in
+their own processes and scale with workers, while in-process engines
+(WeasyPrint, ReportLab, xhtml2pdf) hold the GIL and gain little from threads.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+try:
+    from core.engine_detection import detect_engines
+except ImportError:
+    from engine_detection import detect_engines  # type: ignore
+
+try:
+    from config.settings import get_setting
+except ImportError:
+    get_setting = None
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for engines that run out of process
+MAX_EXTERNAL_CONCURRENCY = 4
+
+
+def engine_concurrency(engine: Optional[str] = None) -> int:
+    """
+    Get the number of documents to render at once for an engine
+
+    The "performance.pdf_concurrency" setting overrides the engine default.
+
+    Args:
+        engine (str): Engine name (default: the best available engine)
+
+    Returns:
+        int: Concurrency limit (at least 1)
+    """
+    configured = get_setting("performance.pdf_concurrency") if get_setting else None
+    if configured:
+        return max(1, int(configured))
+
+    if engine is None:
+        engines = detect_engines()
+        engine = engines[0] if engines else None
+
+    if engine == "chrome":
+        try:
+            from core.chrome_pool import get_chrome_pool
+            pool = get_chrome_pool()
+            if pool.available:
+                # More threads than browsers would only queue on the pool
+                return pool.size
+        except ImportError:
+            pass
+        return min(MAX_EXTERNAL_CONCURRENCY, os.cpu_count() or 1)
+    if engine == "pdfkit":
+        return min(MAX_EXTERNAL_CONCURRENCY, os.cpu_count() or 1)
+    return 1
+
+
+def run_jobs(jobs: Sequence[Callable[[], Any]], max_workers: Optional[int] = None) -> List[Any]:
+    """
+    Run document jobs concurrently and return their results in job order
+
+    Every job runs to completion; if any job failed, the first failure (in
+    job order) is re-raised after the others finish.
+
+    Args:
+        jobs (Sequence[Callable]): Zero-argument callables, in canonical order
+        max_workers (int): Concurrency limit (default: engine_concurrency())
+
+    Returns:
+        List[Any]: Job results, in the same order as jobs
+    """
+    if max_workers is None:
+        max_workers = engine_concurrency()
+    max_workers = max(1, min(max_workers, len(jobs) or 1))
+
+    if max_workers == 1:
+        return [job() for job in jobs]
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bill-pdf") as executor:
+        futures = [executor.submit(job) for job in jobs]
+        errors = [future.exception() for future in futures]
+
+    for error in errors:
+        if error is not None:
+            raise error
+    return [future.result() for future in futures]
@@ -0,0 +1,276 @@
+"""
+Streaming PDF merge with bounded memory
+PdfWriter keeps every merged page and resource in memory until the final
+write. This merger instead copies each input's pages and the objects they
+reference straight to the output as it goes, renumbering object references,
+and keeps only the byte offset of each written object. An input's reader is
+released before the next one is opened, so memory is bounded by the largest
+single input rather than by the whole batch.
+
+The output may be a file path or any writable binary stream (including
+non-seekable ones such as sockets or HTTP responses).
+
+With optimize=True the merger also does what exports.pdf_optimizer does for an
+in-memory writer, while streaming: objects are written bottom-up, so an object
+whose serialized form matches one already written (the same font or image in
+several inputs) is replaced by a reference to it; unfiltered streams are
+Flate-compressed; and only objects reachable from the merged pages are
+written. Only a digest per written object is kept for this.
+
+    stream_merge_pdfs(["first_page.pdf", ("deviation.pdf", "0:2")], "bill.pdf")
+"""
+
+import hashlib
+import io
+import logging
+import os
+import zlib
+from typing import BinaryIO, Dict, Iterable, List, Sequence, Tuple, Union
+
+from pypdf import PageRange, PdfReader
+from pypdf.generic import (ArrayObject, DictionaryObject, IndirectObject, NameObject,
+                           NullObject, NumberObject, StreamObject)
+
+logger = logging.getLogger(__name__)
+
+PdfSource = Union[str, bytes, bytearray, BinaryIO]
+# Pages: None (all), a PageRange string such as "0:3" or "-1", a slice, or 0-based indices
+PageSelection = Union[None, str, slice, Sequence[int]]
+
+
+class _CountingWriter:
+    """Track the output position without seeking (works on sockets)"""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.position = 0
+
+    def write(self, data: bytes) -> int:
+        self.stream.write(data)
+        self.position += len(data)
+        return len(data)
+
+
+class StreamingPdfMerger:
+    """Append PDF documents page by page to an output stream"""
+
+    def __init__(self, output: BinaryIO, optimize: bool = False):
+        """
+        Start a merged PDF on a writable binary stream
+
+        Args:
+            output (BinaryIO): Destination stream (need not be seekable)
+            optimize (bool): Deduplicate identical objects and compress unfiltered streams
+        """
+        self._out = _CountingWriter(output)
+        self._offsets: List[int] = []  # index i holds the offset of object i + 1
+        self._page_refs: List[int] = []
+        self.optimize = optimize
+        # Serialized object digest -> output number (optimize only)
+        self._digests: Dict[bytes, int] = {}
+        # Object 1 is the page tree; it is written last, once all kids are known
+        self._pages_root = self._reserve()
+        self._out.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        self._closed = False
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages appended so far"""
+        return len(self._page_refs)
+
+    @property
+    def bytes_written(self) -> int:
+        """Size of the output so far"""
+        return self._out.position
+
+    def _reserve(self) -> int:
+        self._offsets.append(0)
+        return len(self._offsets)
+
+    def _write_object(self, number: int, obj) -> None:
+        body = io.BytesIO()
+        obj.write_to_stream(body)
+        self._write_serialized(number, body.getvalue())
+
+    def _write_serialized(self, number: int, body: bytes) -> None:
+        self._offsets[number - 1] = self._out.position
+        self._out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    def append(self, source: PdfSource, pages: PageSelection = None) -> int:
+        """
+        Append pages of a PDF
+
+        Args:
+            source: File path, PDF bytes or a readable binary stream
+            pages: Pages to take (default: all), see PageSelection
+
+        Returns:
+            int: Number of pages appended
+        """
+        if self._closed:
+            raise ValueError("Merger is closed")
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        reader = PdfReader(source)
+        if reader.is_encrypted:
+            reader.decrypt("")
+
+        numbers: Dict[Tuple[int, int], int] = {}
+        in_progress = set()
+
+        def resolve(reference: IndirectObject) -> int:
+            """Write a referenced object (after everything it references) and return its output number"""
+            key = (reference.idnum, reference.generation)
+            if key in numbers:
+                return numbers[key]
+            if key in in_progress:
+                # Reference cycle: the object gets its number now and is written when its copy completes
+                numbers[key] = self._reserve()
+                return numbers[key]
+            in_progress.add(key)
+            target = reference.get_object()
+            if target is None or (isinstance(target, DictionaryObject) and target.get("/Type") == "/Page"):
+                # Dangling reference, or a link to a page that is not part of the selection
+                target = NullObject()
+            body = io.BytesIO()
+            remap(target).write_to_stream(body)
+            body = body.getvalue()
+            in_progress.discard(key)
+
+            if key in numbers:
+                self._write_serialized(numbers[key], body)
+                return numbers[key]
+            if self.optimize:
+                digest = hashlib.sha256(body).digest()
+                if digest in self._digests:
+                    numbers[key] = self._digests[digest]
+                    return numbers[key]
+            numbers[key] = self._reserve()
+            self._write_serialized(numbers[key], body)
+            if self.optimize:
+                self._digests[digest] = numbers[key]
+            return numbers[key]
+
+        def remap(value):
+            """Copy a value, writing the objects it references and renumbering the references"""
+            if isinstance(value, IndirectObject):
+                return IndirectObject(resolve(value), 0, None)
+            if isinstance(value, StreamObject):
+                copy = value.__class__()
+                copy._data = value._data
+                for name, item in value.items():
+                    if name != "/Length":  # rewritten from the data on output
+                        copy[NameObject(name)] = remap(item)
+                if self.optimize and "/Filter" not in copy and "/DecodeParms" not in copy:
+                    copy._data = zlib.compress(value._data)
+                    copy[NameObject("/Filter")] = NameObject("/FlateDecode")
+                return copy
+            if isinstance(value, DictionaryObject):
+                copy = DictionaryObject()
+                for name, item in value.items():
+                    copy[NameObject(name)] = remap(item)
+                return copy
+            if isinstance(value, ArrayObject):
+                return ArrayObject(remap(item) for item in value)
+            return value
+
+        count = 0
+        for index in select_pages(len(reader.pages), pages):
+            page = reader.pages[index]  # inherited attributes are already flattened onto the page
+            page_number = self._reserve()
+            if page.indirect_reference is not None:
+                numbers[(page.indirect_reference.idnum, page.indirect_reference.generation)] = page_number
+            # Everything the page references is written before the page itself
+            copy = DictionaryObject()
+            for name, item in page.items():
+                if name != "/Parent":
+                    copy[NameObject(name)] = remap(item)
+            copy[NameObject("/Parent")] = IndirectObject(self._pages_root, 0, None)
+            self._write_object(page_number, copy)
+            self._page_refs.append(page_number)
+            count += 1
+
+        # Drop the reader (and its object cache) before the next input is opened
+        del reader
+        return count
+
+    def close(self) -> None:
+        """Write the page tree, catalog, cross-reference table and trailer"""
+        if self._closed:
+            return
+        self._closed = True
+        pages = DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(IndirectObject(n, 0, None) for n in self._page_refs),
+            NameObject("/Count"): NumberObject(len(self._page_refs)),
+        })
+        self._write_object(self._pages_root, pages)
+        catalog = self._reserve()
+        self._write_object(catalog, DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): IndirectObject(self._pages_root, 0, None),
+        }))
+
+        xref_offset = self._out.position
+        lines = [f"xref\n0 {len(self._offsets) + 1}\n", "0000000000 65535 f \n"]
+        lines += [f"{offset:010d} 00000 n \n" for offset in self._offsets]
+        lines.append(f"trailer\n<< /Size {len(self._offsets) + 1} /Root {catalog} 0 R >>\n"
+                     f"startxref\n{xref_offset}\n%%EOF\n")
+        self._out.write("".join(lines).encode())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+def select_pages(total: int, pages: PageSelection) -> Iterable[int]:
+    """
+    Resolve a page selection to 0-based indices
+
+    Args:
+        total (int): Number of pages in the document
+        pages: None (all), a PageRange string ("0:3", "-1"), a slice or indices
+
+    Returns:
+        Iterable[int]: Page indices
+    """
+    if pages is None:
+        return range(total)
+    if isinstance(pages, str):
+        return range(*PageRange(pages).indices(total))
+    if isinstance(pages, slice):
+        return range(*pages.indices(total))
+    return [index for index in pages if -total <= index < total]
+
+
+def stream_merge_pdfs(sources: Iterable[Union[PdfSource, Tuple[PdfSource, PageSelection]]],
+                      output: Union[str, BinaryIO], optimize: bool = False) -> int:
+    """
+    Merge PDFs into a file or stream without holding the merged document in memory
+
+    Args:
+        sources: PDF paths/bytes/streams, or (source, pages) tuples to merge
+            only selected pages (e.g. ("deviation.pdf", "0:2") or (path, [0, 3]))
+        output: Output file path or writable binary stream
+        optimize (bool): Deduplicate identical objects and compress unfiltered streams
+
+    Returns:
+        int: Number of pages written
+    """
+    target = open(output, "wb") if isinstance(output, (str, os.PathLike)) else output
+    try:
+        merger = StreamingPdfMerger(target, optimize=optimize)
+        for source in sources:
+            source, pages = source if isinstance(source, tuple) else (source, None)
+            if isinstance(source, (str, os.PathLike)) and not os.path.exists(source):
+                logger.warning(f"Skipping missing PDF: {source}")
+                continue
+            merger.append(source, pages)
+        merger.close()
+        return merger.page_count
+    finally:
+        if target is not output:
+            target.close()
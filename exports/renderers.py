@@ -5,30 +5,66 @@ This module handles the output generation while preserving the core computation
 Foolproof PDF generation flow:
 - Render HTML via Jinja2
 - Generate PDF via a unified engine with intelligent fallbacks
-- Optional in-memory caching to reduce repeated conversions
+- Durable content-addressed PDF cache (data.artifact_store) to avoid repeated conversions
+- Optional render-time minification with hoisted, cached stylesheets
+- Async counterparts (agenerate_*) for overlapping renders on one event loop
+- Merged PDFs are deduplicated and compressed (exports.pdf_optimizer)
+- Very long First Page / Deviation Statement tables render as parallel row
+  chunks with brought/carried-forward subtotals (exports.chunked_render)
+- Native ReportLab rendering (exports.reportlab_renderer) for the table-heavy
+  sheets, straight from the bill data without HTML or a browser
+- Per-page Carried/Brought Forward subtotals at page breaks predicted in
+  Python from the templates' column widths and font metrics (exports.pagination)
+
+The rendering building blocks (render_template, pdf_generator_for, pdf_route,
+preferred_engine, template_version, use_native, native_engine,
+generate_chunked_pdf, save_pdf_artifact) are public for the other export
+modules (exports.section_graph, exports.certificate_stamp).
 """
 
+import asyncio
+import io
 import os
 import tempfile
 import json
 import hashlib
 from jinja2 import Environment, FileSystemLoader
 from docx import Document
-from pypdf import PdfReader, PdfWriter
+from exports.docx_tables import DocxTableBuilder, even_widths
 import zipfile
 
 # Unified PDF generator with fallbacks (weasyprint/reportlab/xhtml2pdf/pdfkit)
 try:
-    from core.pdf_generator_optimized import PDFGenerator
+    from core.pdf_generator_optimized import PDFGenerator, get_pdf_generator
 except Exception:  # Fallback for legacy path
-    from pdf_generator_optimized import PDFGenerator  # type: ignore
+    from pdf_generator_optimized import PDFGenerator, get_pdf_generator  # type: ignore
+
+from core.html_optimizer import inline_stylesheets, optimize_html
+from core.font_bundle import bundle_signature, inject_font_faces
+from core.engine_variants import VARIANT_VERSION, variants_enabled
+from exports.pdf_optimizer import size_stats
+from exports.pdf_stream import stream_merge_pdfs
+from exports.chunked_render import needs_chunking, split_into_chunks
+from exports.certificate_stamp import render_stamped_pdf
+from exports.pagination import PAGINATION_VERSION, page_subtotals_enabled, with_pagination
+
+# Durable content-addressed PDF cache (falls back silently if unavailable)
+try:
+    from data.artifact_store import artifact_key, get_artifact_store
+except Exception:
+    artifact_key = get_artifact_store = None
 
-# Lightweight in-memory cache (falls back silently if unavailable)
+# Native ReportLab renderer for First Page / Deviation Statement / Extra Items
 try:
-    from data.cache_utils import get_cache
-    _CACHE = get_cache()
+    from exports import reportlab_renderer
 except Exception:
-    _CACHE = None
+    reportlab_renderer = None
+
+try:
+    from core.engine_detection import detect_engines
+    from core.engine_router import ENGINE_FIDELITY, FIDELITY_TIERS
+except Exception:
+    detect_engines = ENGINE_FIDELITY = FIDELITY_TIERS = None
 
 
 def setup_jinja_environment(template_dir):
@@ -46,31 +82,258 @@ def _hash_dict_stable(data: dict) -> str:
     return hashlib.sha256(payload).hexdigest()
 
 
-def generate_html(sheet_name, data, template_dir, temp_dir):
+def render_template(sheet_name, data, template_dir, optimize=False):
     """
-    Generate HTML file from template
+    Render a sheet's template to an HTML string
 
     Args:
-        sheet_name (str): Name of the sheet to generate
-        data (dict): Data to render in the template
+        sheet_name (str): Sheet name, e.g. "First Page"
+        data (dict): Template data
         template_dir (str): Directory containing templates
-        temp_dir (str): Directory for temporary files
+        optimize (bool): Minify and hoist stylesheets (core.html_optimizer)
 
     Returns:
-        str: Path to generated HTML file
+        str: HTML document
     """
     env = setup_jinja_environment(template_dir)
     template = env.get_template(f"{sheet_name.lower().replace(' ', '_')}.html")
-    html_content = template.render(data=data)
-    html_path = os.path.join(temp_dir, f"{sheet_name.lower().replace(' ', '_')}.html")
+    html_content = inject_font_faces(template.render(data=with_pagination(sheet_name, data)))
+    if optimize:
+        html_content = optimize_html(html_content)
+    return html_content
+
 
+def _write_html(sheet_name, html_content, temp_dir):
+    """Write rendered HTML next to the other temp files and return its path"""
+    html_path = os.path.join(temp_dir, f"{sheet_name.lower().replace(' ', '_')}.html")
     with open(html_path, "w", encoding="utf-8") as f:
         f.write(html_content)
-
     return html_path
 
 
-def generate_pdf(sheet_name, data, orientation, template_dir, temp_dir, config=None):
+def template_version(template_dir, sheet_name):
+    """
+    Get the digest of a sheet's template source (template edits invalidate cached PDFs)
+
+    Args:
+        template_dir (str): Directory containing templates
+        sheet_name (str): Sheet name
+
+    Returns:
+        str: SHA-256 hex digest, or "" if the template is missing
+    """
+    path = os.path.join(template_dir, f"{sheet_name.lower().replace(' ', '_')}.html")
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+def pdf_route(sheet_name, orientation):
+    """
+    Get the engine-router key for a sheet
+
+    Args:
+        sheet_name (str): Sheet name
+        orientation (str): Page orientation
+
+    Returns:
+        str: Route key, e.g. "first_page/portrait"
+    """
+    return f"{sheet_name.lower().replace(' ', '_')}/{orientation}"
+
+
+def preferred_engine(sheet_name, generator):
+    """
+    Get the engine the router would pick for a sheet now
+
+    Args:
+        sheet_name (str): Sheet name
+        generator (PDFGenerator): Generator the sheet is rendered with
+
+    Returns:
+        str: Engine name
+    """
+    return generator.select_engines(pdf_route(sheet_name, generator.orientation), log=False)[0]
+
+
+def _pdf_artifact(sheet_name, data, generator, template_dir, optimize, engine=None):
+    """
+    Return (store, key) for a PDF render; (None, None) when caching is unavailable
+
+    The key includes the engine; by default the one the router would pick now.
+    """
+    if get_artifact_store is None:
+        return None, None
+    try:
+        store = get_artifact_store()
+        if engine is None:
+            engine = preferred_engine(sheet_name, generator)
+    except Exception:
+        return None, None
+    parts = dict(
+        template=template_version(template_dir, sheet_name),
+        engine=engine,
+        orientation=generator.orientation,
+        margins=[generator.margin_top, generator.margin_right,
+                 generator.margin_bottom, generator.margin_left],
+        optimize=optimize,
+        data=_hash_dict_stable(data),
+    )
+    fonts = bundle_signature()
+    if fonts:
+        parts["fonts"] = fonts
+    if page_subtotals_enabled(sheet_name):
+        parts["pagination"] = PAGINATION_VERSION
+    if variants_enabled(engine):
+        parts["variant"] = VARIANT_VERSION
+    key = artifact_key(**parts)
+    return store, key
+
+
+def save_pdf_artifact(store, key, pdf_path=None, content=None):
+    """
+    Store a generated PDF in the artifact store (write failures never fail the render)
+
+    Args:
+        store (ArtifactStore): Store, or None when caching is unavailable
+        key (str): Artifact key
+        pdf_path (str): PDF file to store
+        content (bytes): PDF bytes to store instead of a file
+    """
+    if store is None:
+        return
+    try:
+        if content is not None:
+            store.put_bytes(key, content)
+        else:
+            store.put_file(key, pdf_path)
+    except OSError:
+        pass
+
+
+def use_native(sheet_name, native=None):
+    """
+    Decide whether a sheet is rendered natively with ReportLab
+
+    With native=None the "pdf.native_renderer" setting decides: True/False, or
+    "auto" (default) to render natively only when no installed HTML engine
+    meets the "pdf.min_fidelity" tier (e.g. containers without Chrome).
+
+    Args:
+        sheet_name (str): Sheet name
+        native (bool): Force native rendering on or off (default: the setting)
+
+    Returns:
+        bool: True if the sheet is rendered with exports.reportlab_renderer
+    """
+    if reportlab_renderer is None or not reportlab_renderer.supports_native(sheet_name):
+        return False
+    if native is None:
+        try:
+            from config.settings import get_setting
+            native = get_setting("pdf.native_renderer", "auto")
+        except ImportError:
+            native = "auto"
+    if native != "auto":
+        return bool(native)
+    if ENGINE_FIDELITY is None:
+        return False
+    try:
+        from config.settings import get_setting
+        min_fidelity = get_setting("pdf.min_fidelity", "exact")
+    except ImportError:
+        min_fidelity = "exact"
+    min_rank = FIDELITY_TIERS.index(min_fidelity) if min_fidelity in FIDELITY_TIERS else 0
+    return not any(FIDELITY_TIERS.index(ENGINE_FIDELITY.get(engine, "text")) >= min_rank
+                   for engine in detect_engines())
+
+
+def native_engine():
+    """
+    Get the engine name used in artifact keys for natively rendered PDFs
+
+    Returns:
+        str: e.g. "native-3" (changes with the renderer's layout version)
+    """
+    return f"native-{reportlab_renderer.RENDERER_VERSION}"
+
+
+def pdf_generator_for(sheet_name, orientation):
+    """
+    Get the shared PDFGenerator with the page setup used for a sheet
+
+    Args:
+        sheet_name (str): Sheet name
+        orientation (str): Page orientation
+
+    Returns:
+        PDFGenerator: Shared generator (see get_pdf_generator)
+    """
+    # Note Sheet has special margins in the legacy flow; approximate in mm
+    custom_margins = None
+    if sheet_name == "Note Sheet":
+        custom_margins = {"top": 6, "right": 6, "bottom": 15, "left": 6}
+
+    return get_pdf_generator(
+        orientation=("landscape" if orientation == "landscape" else "portrait"),
+        custom_margins=custom_margins,
+    )
+
+
+def _generate_chunked_pdf_bytes(sheet_name, data, orientation, template_dir, optimize=False):
+    """Render a long document as row chunks in parallel and concatenate them"""
+    return generate_chunked_pdf(sheet_name, data, orientation, template_dir, optimize)[0]
+
+
+def generate_chunked_pdf(sheet_name, data, orientation, template_dir, optimize=False):
+    """
+    Render a long document as row chunks in parallel and concatenate them
+
+    Args:
+        sheet_name (str): Sheet name (see exports.chunked_render)
+        data (dict): Template data
+        orientation (str): Page orientation
+        template_dir (str): Directory containing templates
+        optimize (bool): Optimize the chunks' HTML
+
+    Returns:
+        tuple: (PDF bytes, engine(s) that produced the chunks, "a+b" when mixed)
+    """
+    from exports.pdf_scheduler import run_jobs
+
+    jobs = [
+        (lambda chunk=chunk: _generate_pdf_bytes(sheet_name, chunk, orientation, template_dir, optimize,
+                                                 native=False))
+        for chunk in split_into_chunks(sheet_name, data)
+    ]
+    results = run_jobs(jobs)
+    engines = "+".join(sorted({engine for _, engine in results}))
+    return merge_pdfs([pdf for pdf, _ in results]), engines
+
+
+def generate_html(sheet_name, data, template_dir, temp_dir, optimize=False):
+    """
+    Generate HTML file from template
+
+    Args:
+        sheet_name (str): Name of the sheet to generate
+        data (dict): Data to render in the template
+        template_dir (str): Directory containing templates
+        temp_dir (str): Directory for temporary files
+        optimize (bool): Minify the output (hoisted CSS is inlined again, so the file stands alone)
+
+    Returns:
+        str: Path to generated HTML file
+    """
+    html_content = render_template(sheet_name, data, template_dir, optimize)
+    # Files handed to users must not link the stylesheet cache in the system temp directory
+    return _write_html(sheet_name, inline_stylesheets(html_content), temp_dir)
+
+
+def generate_pdf(sheet_name, data, orientation, template_dir, temp_dir, config=None, optimize=False,
+                 native=None):
     """
     Generate PDF via unified engine with robust fallbacks (no hard dependency on wkhtmltopdf).
 
@@ -81,48 +344,221 @@ def generate_pdf(sheet_name, data, orientation, template_dir, temp_dir, config=N
         template_dir (str): Directory containing templates
         temp_dir (str): Directory for temporary files
         config: Unused; kept for backward compatibility
+        optimize (bool): Minify the HTML and hoist CSS into a cached stylesheet
+        native (bool): Render supported sheets directly with ReportLab
+            (default: the "pdf.native_renderer" setting)
 
     Returns:
         str: Path to generated PDF file
     """
-    env = setup_jinja_environment(template_dir)
-    template = env.get_template(f"{sheet_name.lower().replace(' ', '_')}.html")
-    html_content = template.render(data=data)
-
     os.makedirs(temp_dir, exist_ok=True)
     pdf_path = os.path.join(temp_dir, f"{sheet_name.replace(' ', '_')}.pdf")
 
-    # Cache key for memoizing generated PDFs
-    cache_key = None
-    if _CACHE is not None:
-        cache_key = f"pdf:{sheet_name}:{orientation}:{_hash_dict_stable(data)}"
-        cached_path = _CACHE.get(cache_key)
-        if isinstance(cached_path, str) and os.path.exists(cached_path):
-            return cached_path
+    # Static documents are stamped onto a template PDF printed once per template version
+    stamped = render_stamped_pdf(sheet_name, data, orientation, template_dir)
+    if stamped is not None:
+        with open(pdf_path, "wb") as f:
+            f.write(stamped)
+        return pdf_path
+
+    # Identical documents (same template, engine, page setup and data) are printed once
+    generator = pdf_generator_for(sheet_name, orientation)
+    native_pdf = use_native(sheet_name, native)
+    engine = native_engine() if native_pdf else None
+    store, key = _pdf_artifact(sheet_name, data, generator, template_dir, optimize, engine)
+    if store is not None and store.copy_to(key, pdf_path):
+        return pdf_path
+
+    if native_pdf:
+        reportlab_renderer.render_pdf(sheet_name, data, pdf_path, generator.orientation)
+        save_pdf_artifact(store, key, pdf_path)
+        return pdf_path
+
+    if needs_chunking(sheet_name, data):
+        # Chunks are cached individually by generate_pdf_bytes
+        with open(pdf_path, "wb") as f:
+            f.write(_generate_chunked_pdf_bytes(sheet_name, data, orientation, template_dir, optimize))
+        return pdf_path
+
+    html_content = render_template(sheet_name, data, template_dir, optimize)
+    success = generator.generate_pdf(html_content, pdf_path, route=pdf_route(sheet_name, generator.orientation))
+    if not success or not os.path.exists(pdf_path):
+        raise RuntimeError("Failed to generate PDF with available engines")
+
+    # Store under the engine that actually produced the PDF (it may have fallen back)
+    store, key = _pdf_artifact(sheet_name, data, generator, template_dir, optimize, generator.last_engine)
+    save_pdf_artifact(store, key, pdf_path)
+    return pdf_path
 
-    # Note Sheet has special margins in the legacy flow; approximate in mm
-    custom_margins = None
-    if sheet_name == "Note Sheet":
-        custom_margins = {"top": 6, "right": 6, "bottom": 15, "left": 6}
 
-    generator = PDFGenerator(
-        orientation=("landscape" if orientation == "landscape" else "portrait"),
-        custom_margins=custom_margins,
+def generate_pdf_bytes(sheet_name, data, orientation, template_dir, optimize=False, native=None):
+    """
+    Generate a PDF in memory (no HTML or PDF files written)
+
+    Args:
+        sheet_name (str): Name of the sheet to generate
+        data (dict): Data to render in the template
+        orientation (str): Page orientation ("portrait" or "landscape")
+        template_dir (str): Directory containing templates
+        optimize (bool): Minify the HTML and hoist CSS into a cached stylesheet
+        native (bool): Render supported sheets directly with ReportLab
+            (default: the "pdf.native_renderer" setting)
+
+    Returns:
+        bytes: PDF document
+    """
+    return _generate_pdf_bytes(sheet_name, data, orientation, template_dir, optimize, native)[0]
+
+
+def _generate_pdf_bytes(sheet_name, data, orientation, template_dir, optimize=False, native=None):
+    """generate_pdf_bytes() plus the engine that produced the PDF (a fallback engine when the preferred one failed)"""
+    generator = pdf_generator_for(sheet_name, orientation)
+    stamped = render_stamped_pdf(sheet_name, data, orientation, template_dir)
+    if stamped is not None:
+        # Stamped onto the template printed by the preferred engine
+        return stamped, preferred_engine(sheet_name, generator)
+
+    native_pdf = use_native(sheet_name, native)
+    engine = native_engine() if native_pdf else preferred_engine(sheet_name, generator)
+    store, key = _pdf_artifact(sheet_name, data, generator, template_dir, optimize, engine)
+    if store is not None:
+        cached = store.get_bytes(key)
+        if cached:
+            return cached, engine
+
+    if native_pdf:
+        pdf = reportlab_renderer.render_pdf(sheet_name, data, orientation=generator.orientation)
+        save_pdf_artifact(store, key, content=pdf)
+        return pdf, engine
+
+    if needs_chunking(sheet_name, data):
+        return generate_chunked_pdf(sheet_name, data, orientation, template_dir, optimize)
+
+    html_content = render_template(sheet_name, data, template_dir, optimize)
+    pdf = generator.generate_pdf_bytes(html_content, route=pdf_route(sheet_name, generator.orientation))
+    if not pdf:
+        raise RuntimeError("Failed to generate PDF with available engines")
+
+    store, key = _pdf_artifact(sheet_name, data, generator, template_dir, optimize, generator.last_engine)
+    save_pdf_artifact(store, key, content=pdf)
+    return pdf, generator.last_engine
+
+
+async def agenerate_html(sheet_name, data, template_dir, temp_dir, optimize=False):
+    """
+    Async counterpart of generate_html; template rendering runs on the default executor
+
+    Args:
+        sheet_name (str): Name of the sheet to generate
+        data (dict): Data to render in the template
+        template_dir (str): Directory containing templates
+        temp_dir (str): Directory for temporary files
+        optimize (bool): Minify the output (hoisted CSS is inlined again, so the file stands alone)
+
+    Returns:
+        str: Path to generated HTML file
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, generate_html, sheet_name, data, template_dir, temp_dir, optimize
+    )
+
+
+async def agenerate_pdf(sheet_name, data, orientation, template_dir, temp_dir, config=None, optimize=False,
+                        native=None):
+    """
+    Async counterpart of generate_pdf
+
+    Template rendering runs on the default executor; Chrome and wkhtmltopdf run
+    as asyncio subprocesses so several documents can convert concurrently.
+
+    Args:
+        sheet_name (str): Name of the sheet to generate
+        data (dict): Data to render in the template
+        orientation (str): Page orientation ("portrait" or "landscape")
+        template_dir (str): Directory containing templates
+        temp_dir (str): Directory for temporary files
+        config: Unused; kept for backward compatibility
+        optimize (bool): Minify the HTML and hoist CSS into a cached stylesheet
+        native (bool): Render supported sheets directly with ReportLab
+            (default: the "pdf.native_renderer" setting)
+
+    Returns:
+        str: Path to generated PDF file
+    """
+    loop = asyncio.get_running_loop()
+
+    os.makedirs(temp_dir, exist_ok=True)
+    pdf_path = os.path.join(temp_dir, f"{sheet_name.replace(' ', '_')}.pdf")
+
+    stamped = await loop.run_in_executor(None, render_stamped_pdf, sheet_name, data, orientation, template_dir)
+    if stamped is not None:
+        with open(pdf_path, "wb") as f:
+            f.write(stamped)
+        return pdf_path
+
+    generator = pdf_generator_for(sheet_name, orientation)
+    native_pdf = use_native(sheet_name, native)
+    engine = native_engine() if native_pdf else None
+    store, key = _pdf_artifact(sheet_name, data, generator, template_dir, optimize, engine)
+    if store is not None and await loop.run_in_executor(None, store.copy_to, key, pdf_path):
+        return pdf_path
+
+    if native_pdf:
+        await loop.run_in_executor(None, reportlab_renderer.render_pdf, sheet_name, data, pdf_path,
+                                   generator.orientation)
+        await loop.run_in_executor(None, save_pdf_artifact, store, key, pdf_path)
+        return pdf_path
+
+    if needs_chunking(sheet_name, data):
+        pdf = await loop.run_in_executor(None, _generate_chunked_pdf_bytes, sheet_name, data, orientation,
+                                         template_dir, optimize)
+        with open(pdf_path, "wb") as f:
+            f.write(pdf)
+        return pdf_path
+
+    html_content = await loop.run_in_executor(
+        None, render_template, sheet_name, data, template_dir, optimize
     )
 
-    success = generator.generate_pdf(html_content, pdf_path)
+    success = await generator.agenerate_pdf(html_content, pdf_path, route=pdf_route(sheet_name, generator.orientation))
     if not success or not os.path.exists(pdf_path):
         raise RuntimeError("Failed to generate PDF with available engines")
 
-    if _CACHE is not None and cache_key:
-        try:
-            _CACHE.set(cache_key, pdf_path, ttl=1800)  # 30 minutes
-        except Exception:
-            pass
-
+    store, key = _pdf_artifact(sheet_name, data, generator, template_dir, optimize, generator.last_engine)
+    await loop.run_in_executor(None, save_pdf_artifact, store, key, pdf_path)
     return pdf_path
 
 
+async def agenerate_bill_package(documents, template_dir, output_dir, merged_name="Complete_Bill.pdf",
+                                 optimize=False):
+    """
+    Render every document of a bill concurrently and merge them into one PDF
+
+    Args:
+        documents (list): (sheet_name, data, orientation) tuples, in merge order
+        template_dir (str): Directory containing templates
+        output_dir (str): Directory for the generated PDFs
+        merged_name (str): File name of the merged PDF (None to skip merging)
+        optimize (bool): Minify the HTML and hoist CSS into a cached stylesheet
+
+    Returns:
+        dict: {"pdf_files": [paths in document order], "merged_pdf": path or None}
+    """
+    pdf_files = await asyncio.gather(*[
+        agenerate_pdf(sheet_name, data, orientation, template_dir, output_dir, optimize=optimize)
+        for sheet_name, data, orientation in documents
+    ])
+
+    merged_pdf = None
+    if merged_name:
+        merged_pdf = os.path.join(output_dir, merged_name)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, merge_pdfs, list(pdf_files), merged_pdf)
+
+    return {"pdf_files": list(pdf_files), "merged_pdf": merged_pdf}
+
+
 def create_word_doc(sheet_name, data, doc_path):
     """
     Create Word document from data
@@ -134,98 +570,61 @@ def create_word_doc(sheet_name, data, doc_path):
     """
     doc = Document()
     if sheet_name == "First Page":
-        table = doc.add_table(rows=len(data["items"]) + 3, cols=9)
-        table.style = "Table Grid"
-        for i, item in enumerate(data["items"]):
-            row = table.rows[i]
-            row.cells[0].text = str(item.get("unit", ""))
-            row.cells[2].text = str(item.get("quantity", ""))
-            row.cells[3].text = str(item.get("serial_no", ""))
-            row.cells[4].text = str(item.get("description", ""))
-            row.cells[5].text = str(item.get("rate", ""))
-            row.cells[6].text = str(item.get("amount", ""))
-            row.cells[8].text = str(item.get("remark", ""))
-        row = table.rows[-3]
-        row.cells[4].text = "Grand Total"
-        row.cells[6].text = str(data["totals"].get("grand_total", ""))
-        row = table.rows[-2]
+        table = DocxTableBuilder(even_widths(9))
+        table.add_rows([
+            [item.get("unit", ""), "", item.get("quantity", ""), item.get("serial_no", ""),
+             item.get("description", ""), item.get("rate", ""), item.get("amount", ""), "",
+             item.get("remark", "")]
+            for item in data["items"]
+        ])
         premium_percent_value = data['totals']['premium'].get('percent', 0)
         if isinstance(premium_percent_value, str):
             try:
                 premium_percent_value = float(premium_percent_value)
             except (ValueError, TypeError):
                 premium_percent_value = 0
-        row.cells[4].text = f"Tender Premium @ {premium_percent_value:.2%}"
-        row.cells[6].text = str(data["totals"]["premium"].get("amount", ""))
-        row = table.rows[-1]
-        row.cells[4].text = "Payable Amount"
-        row.cells[6].text = str(data["totals"].get("payable", ""))
+        for label, amount in (("Grand Total", data["totals"].get("grand_total", "")),
+                              (f"Tender Premium @ {premium_percent_value:.2%}",
+                               data["totals"]["premium"].get("amount", "")),
+                              ("Payable Amount", data["totals"].get("payable", ""))):
+            table.add_row(["", "", "", "", label, "", amount])
+        table.insert(doc)
     elif sheet_name == "Last Page":
         doc.add_paragraph(f"Payable Amount: {data.get('payable_amount', '')}")
         doc.add_paragraph(f"Total in Words: {data.get('amount_words', '')}")
     elif sheet_name == "Extra Items":
-        table = doc.add_table(rows=len(data["items"]) + 1, cols=7)
-        table.style = "Table Grid"
-        headers = ["Serial No.", "Remark", "Description", "Quantity", "Unit", "Rate", "Amount"]
-        for j, header in enumerate(headers):
-            table.rows[0].cells[j].text = header
-        for i, item in enumerate(data["items"]):
-            row = table.rows[i + 1]
-            row.cells[0].text = str(item.get("serial_no", ""))
-            row.cells[1].text = str(item.get("remark", ""))
-            row.cells[2].text = str(item.get("description", ""))
-            row.cells[3].text = str(item.get("quantity", ""))
-            row.cells[4].text = str(item.get("unit", ""))
-            row.cells[5].text = str(item.get("rate", ""))
-            row.cells[6].text = str(item.get("amount", ""))
+        table = DocxTableBuilder(even_widths(7), header_font_size=None)
+        table.add_header(["Serial No.", "Remark", "Description", "Quantity", "Unit", "Rate", "Amount"])
+        fields = ["serial_no", "remark", "description", "quantity", "unit", "rate", "amount"]
+        table.add_rows([[item.get(field, "") for field in fields] for item in data["items"]])
+        table.insert(doc)
     elif sheet_name == "Deviation Statement":
-        table = doc.add_table(rows=len(data["items"]) + 5, cols=12)
-        table.style = "Table Grid"
-        headers = ["Serial No.", "Description", "Unit", "Qty WO", "Rate", "Amt WO", "Qty Bill", "Amt Bill", "Excess Qty", "Excess Amt", "Saving Qty", "Saving Amt"]
-        for j, header in enumerate(headers):
-            table.rows[0].cells[j].text = header
-        for i, item in enumerate(data["items"]):
-            row = table.rows[i + 1]
-            row.cells[0].text = str(item.get("serial_no", ""))
-            row.cells[1].text = str(item.get("description", ""))
-            row.cells[2].text = str(item.get("unit", ""))
-            row.cells[3].text = str(item.get("qty_wo", ""))
-            row.cells[4].text = str(item.get("rate", ""))
-            row.cells[5].text = str(item.get("amt_wo", ""))
-            row.cells[6].text = str(item.get("qty_bill", ""))
-            row.cells[7].text = str(item.get("amt_bill", ""))
-            row.cells[8].text = str(item.get("excess_qty", ""))
-            row.cells[9].text = str(item.get("excess_amt", ""))
-            row.cells[10].text = str(item.get("saving_qty", ""))
-            row.cells[11].text = str(item.get("saving_amt", ""))
-        row = table.rows[-4]
-        row.cells[1].text = "Grand Total"
-        row.cells[5].text = str(data["summary"].get("work_order_total", ""))
-        row.cells[7].text = str(data["summary"].get("executed_total", ""))
-        row.cells[9].text = str(data["summary"].get("overall_excess", ""))
-        row.cells[11].text = str(data["summary"].get("overall_saving", ""))
-        row = table.rows[-3]
-        premium_percent_value = data['summary']['premium'].get('percent', 0)
+        table = DocxTableBuilder(even_widths(12), header_font_size=None)
+        table.add_header(["Serial No.", "Description", "Unit", "Qty WO", "Rate", "Amt WO", "Qty Bill", "Amt Bill",
+                          "Excess Qty", "Excess Amt", "Saving Qty", "Saving Amt"])
+        fields = ["serial_no", "description", "unit", "qty_wo", "rate", "amt_wo", "qty_bill", "amt_bill",
+                  "excess_qty", "excess_amt", "saving_qty", "saving_amt"]
+        table.add_rows([[item.get(field, "") for field in fields] for item in data["items"]])
+        summary = data["summary"]
+        premium_percent_value = summary['premium'].get('percent', 0)
         if isinstance(premium_percent_value, str):
             try:
                 premium_percent_value = float(premium_percent_value)
             except (ValueError, TypeError):
                 premium_percent_value = 0
-        row.cells[1].text = f"Add Tender Premium ({premium_percent_value:.2%})"
-        row.cells[5].text = str(data["summary"].get("tender_premium_f", ""))
-        row.cells[7].text = str(data["summary"].get("tender_premium_h", ""))
-        row.cells[9].text = str(data["summary"].get("tender_premium_j", ""))
-        row.cells[11].text = str(data["summary"].get("tender_premium_l", ""))
-        row = table.rows[-2]
-        row.cells[1].text = "Grand Total including Tender Premium"
-        row.cells[5].text = str(data["summary"].get("grand_total_f", ""))
-        row.cells[7].text = str(data["summary"].get("grand_total_h", ""))
-        row.cells[9].text = str(data["summary"].get("grand_total_j", ""))
-        row.cells[11].text = str(data["summary"].get("grand_total_l", ""))
-        row = table.rows[-1]
-        net_difference = data["summary"].get("net_difference", 0)
-        row.cells[1].text = "Overall Excess" if net_difference > 0 else "Overall Saving"
-        row.cells[7].text = str(abs(round(net_difference)))
+        for label, prefix in (("Grand Total", None), (f"Add Tender Premium ({premium_percent_value:.2%})",
+                                                      "tender_premium"),
+                              ("Grand Total including Tender Premium", "grand_total")):
+            if prefix is None:
+                amounts = [summary.get(key, "") for key in
+                           ("work_order_total", "executed_total", "overall_excess", "overall_saving")]
+            else:
+                amounts = [summary.get(f"{prefix}_{column}", "") for column in "fhjl"]
+            table.add_row(["", label, "", "", "", amounts[0], "", amounts[1], "", amounts[2], "", amounts[3]])
+        net_difference = summary.get("net_difference", 0)
+        table.add_row(["", "Overall Excess" if net_difference > 0 else "Overall Saving",
+                       "", "", "", "", "", abs(round(net_difference))])
+        table.insert(doc)
     elif sheet_name == "Note Sheet":
         for note in data.get("notes", []):
             doc.add_paragraph(str(note))
@@ -392,35 +791,115 @@ def create_word_doc(sheet_name, data, doc_path):
     doc.save(doc_path)
 
 
-def merge_pdfs(pdf_files, output_path):
+def merge_pdfs(pdf_files, output_path=None, optimize=True, stats=None):
     """
     Merge multiple PDF files into a single PDF
 
+    The merge streams page by page (exports.pdf_stream), so memory stays
+    bounded by the largest input whether or not the output is optimized.
+
     Args:
-        pdf_files (list): List of paths to PDF files to merge
-        output_path (str): Path where to save the merged PDF
+        pdf_files (list): PDF file paths and/or in-memory PDFs (bytes), or
+            (pdf, pages) tuples to merge only selected pages, e.g. (path, "0:2")
+        output_path (str): Path (or writable binary stream) for the merged PDF; None to return bytes
+        optimize (bool): Deduplicate identical objects (fonts, images), drop
+            unreferenced objects and compress content streams while streaming
+        stats (dict): If given, filled with the size before/after optimization
+
+    Returns:
+        bytes: The merged PDF when output_path is None
     """
-    writer = PdfWriter()
+    sources = [pdf if isinstance(pdf, tuple) else (pdf, None) for pdf in pdf_files]
+    original_bytes = sum(len(pdf) if isinstance(pdf, (bytes, bytearray)) else os.path.getsize(pdf)
+                         for pdf, _ in sources
+                         if isinstance(pdf, (bytes, bytearray)) or os.path.exists(pdf))
+
+    if output_path is None:
+        target = io.BytesIO()
+    elif isinstance(output_path, (str, os.PathLike)):
+        target = open(output_path, "wb")
+    else:
+        target = output_path
+    counter = _ByteCounter(target)
+    try:
+        stream_merge_pdfs(sources, counter, optimize=optimize)
+    finally:
+        if target is not output_path and output_path is not None:
+            target.close()
+    if stats is not None:
+        stats.update(size_stats(original_bytes, counter.count))
+    return target.getvalue() if output_path is None else None
+
+
+class _ByteCounter:
+    """Pass-through binary stream that counts the bytes written (the target need not be seekable)"""
 
-    for pdf in pdf_files:
-        if os.path.exists(pdf):
-            reader = PdfReader(pdf)
-            for page in reader.pages:
-                writer.add_page(page)
+    def __init__(self, target):
+        self.target = target
+        self.count = 0
 
-    with open(output_path, "wb") as out_file:
-        writer.write(out_file)
+    def write(self, data):
+        self.count += len(data)
+        return self.target.write(data)
 
 
-def create_zip_archive(files, zip_path):
+def generate_merged_pdf(documents, template_dir, output_path=None, optimize=False):
+    """
+    Render several documents straight into one PDF
+
+    When WeasyPrint is the routed engine, the documents are laid out with the
+    shared backend and concatenated at the document level; otherwise each
+    document is generated in memory and merged with pypdf.
+
+    Args:
+        documents (list): (sheet_name, data, orientation) tuples, in merge order
+        template_dir (str): Directory containing templates
+        output_path (str): Where to write the merged PDF; None to return bytes
+        optimize (bool): Minify the HTML and hoist CSS into a cached stylesheet
+
+    Returns:
+        bytes: The merged PDF when output_path is None
+    """
+    generators = [pdf_generator_for(sheet_name, orientation) for sheet_name, _, orientation in documents]
+    first_route = pdf_route(documents[0][0], generators[0].orientation) if documents else None
+    if first_route and generators[0].select_engines(first_route, log=False)[:1] == ["weasyprint"]:
+        try:
+            from core.weasyprint_backend import get_weasyprint_backend
+            pages = [
+                (render_template(sheet_name, data, template_dir, optimize), generator.orientation,
+                 (generator.margin_top, generator.margin_right, generator.margin_bottom, generator.margin_left))
+                for (sheet_name, data, _), generator in zip(documents, generators)
+            ]
+            return get_weasyprint_backend().write_merged_pdf(pages, output_path)
+        except (ImportError, OSError):
+            # Installed but unusable (e.g. missing Pango); fall back to per-document generation
+            from core.engine_detection import mark_engine_unavailable
+            mark_engine_unavailable("weasyprint")
+
+    pdfs = [generate_pdf_bytes(sheet_name, data, orientation, template_dir, optimize)
+            for sheet_name, data, orientation in documents]
+    return merge_pdfs(pdfs, output_path)
+
+
+def create_zip_archive(files, zip_path=None):
     """
     Create a ZIP archive containing the specified files
 
     Args:
-        files (list): List of file paths to include in the ZIP
-        zip_path (str): Path where to save the ZIP archive
+        files (list): File paths and/or (archive_name, bytes) tuples
+        zip_path (str): Path where to save the ZIP archive; None to return bytes
+
+    Returns:
+        bytes: The ZIP archive when zip_path is None
     """
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+    target = io.BytesIO() if zip_path is None else zip_path
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zipf:
         for file_path in files:
-            if os.path.exists(file_path):
+            if isinstance(file_path, tuple):
+                archive_name, content = file_path
+                zipf.writestr(archive_name, content)
+            elif os.path.exists(file_path):
                 zipf.write(file_path, os.path.basename(file_path))
+
+    if zip_path is None:
+        return target.getvalue()
@@ -0,0 +1,310 @@
+"""
+Native ReportLab renderer for the high-volume bill documents
+Builds ReportLab flowables straight from the process_bill output structures
+(First Page, Deviation Statement, Extra Items) instead of rendering HTML and
+converting it, so these documents need no browser and no HTML parsing.
+
+Column widths match the <colgroup> of the HTML templates, scaled down (as
+browsers do) when they add up to more than the page frame. Long tables split
+at page boundaries by row, with the column header repeated on every page.
+"""
+
+import io
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# Bump when the layout changes so cached native PDFs are invalidated
+RENDERER_VERSION = "3"
+
+PAGE_MARGIN_MM = 10
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+FONT_SIZE = 8
+
+_CELL_STYLE = ParagraphStyle("cell", fontName=FONT, fontSize=FONT_SIZE, leading=FONT_SIZE + 1.5,
+                             alignment=TA_LEFT)
+_HEADER_STYLE = ParagraphStyle("header", parent=_CELL_STYLE, fontName=FONT_BOLD, alignment=TA_CENTER)
+_TITLE_STYLE = ParagraphStyle("title", fontName=FONT_BOLD, fontSize=11, leading=14,
+                              alignment=TA_CENTER, spaceAfter=4)
+_INFO_STYLE = ParagraphStyle("info", parent=_CELL_STYLE, spaceAfter=1)
+
+_BASE_TABLE_STYLE = [
+    ("FONTNAME", (0, 0), (-1, -1), FONT),
+    ("FONTSIZE", (0, 0), (-1, -1), FONT_SIZE),
+    ("LEADING", (0, 0), (-1, -1), FONT_SIZE + 1.5),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 2),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 2),
+    ("TOPPADDING", (0, 0), (-1, -1), 1.5),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 1.5),
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
+]
+
+
+def _text(value: Any) -> str:
+    """Format a cell value the way the Jinja templates print it"""
+    if value is None:
+        return ""
+    return str(value)
+
+
+def _para(value: Any, style: ParagraphStyle = _CELL_STYLE) -> Paragraph:
+    """Wrap text to the column width (only used for free-text columns)"""
+    return Paragraph(escape(_text(value)), style)
+
+
+def _header_row(labels: List[str]) -> List[Paragraph]:
+    return [Paragraph(escape(label), _HEADER_STYLE) for label in labels]
+
+
+def _format_header_value(value: Any) -> str:
+    """Render ISO dates (YYYY-MM-DD...) as DD/MM/YYYY, like first_page.html"""
+    text = _text(value).strip()
+    if len(text) >= 10 and text[4:5] == "-" and text[7:8] == "-" and \
+            text[:4].isdigit() and text[5:7].isdigit() and text[8:10].isdigit():
+        return f"{text[8:10]}/{text[5:7]}/{text[:4]}"
+    return text
+
+
+def _percent(value: Any) -> str:
+    """Format a fraction as a percentage, like first_page.html (unparseable values print as-is)"""
+    if value is None:
+        return ""
+    try:
+        return "%.2f%%" % (float(value) * 100)
+    except (TypeError, ValueError):
+        return _text(value)
+
+
+def _first_page(data: Dict) -> Tuple[str, List, List[List], List[float], List[tuple]]:
+    """Build the First Page (contractor bill) table"""
+    widths = [11, 16, 16, 11, 70, 15, 22, 17, 12]
+    header = _header_row([
+        "Unit",
+        "Quantity executed (or supplied) since last certificate",
+        "Quantity executed (or supplied) upto date as per MB",
+        "S. No.",
+        'Item of Work supplies (Grouped under "sub-head" and "sub work" of estimate)',
+        "Rate",
+        "Upto date Amount",
+        "Amount Since previous bill (Total for each sub-head)",
+        "Remarks",
+    ])
+
+    intro = []
+    for row in data.get("header", []) or []:
+        values = [_format_header_value(v) for v in row if _text(v).strip()]
+        if values:
+            intro.append(Paragraph(escape(" ".join(values)), _INFO_STYLE))
+
+    rows, styles = [header], []
+    for item in data.get("items", []):
+        description = escape(_text(item.get("description", "")))
+        if item.get("underline"):
+            description = f"<u>{description}</u>"
+        if item.get("bold"):
+            description = f"<b>{description}</b>"
+        quantity_upto_date = item.get("quantity_upto_date")
+        if not _text(quantity_upto_date).strip():
+            quantity_upto_date = item.get("quantity")
+        rows.append([
+            _text(item.get("unit", "")),
+            _text(item.get("quantity_since_last", "")),
+            _text(quantity_upto_date),
+            _text(item.get("serial_no", "")),
+            Paragraph(description, _CELL_STYLE),
+            _text(item.get("rate", "")),
+            _text(item.get("amount", "")),
+            _text(item.get("amount_previous", "")),
+            _para(item.get("remark", "")),
+        ])
+
+    totals = data.get("totals", {}) or {}
+    premium = totals.get("premium", {}) or {}
+    extra_sum = totals.get("extra_items_sum")
+    last_bill = totals.get("last_bill_amount")
+    last_bill = f"{round(last_bill, 2)}" if last_bill else "0.00"
+    net_payable = totals.get("net_payable", totals.get("payable"))
+    net_payable = _text(round(net_payable, 2) if isinstance(net_payable, (int, float)) else net_payable)
+
+    def total_row(label, col5, amount):
+        return ["", "", "", "", _para(label), col5, amount, amount, ""]
+
+    first_total = len(rows)
+    rows.append(total_row("Grand Total Rs.", "", _text(totals.get("grand_total", ""))))
+    rows.append(total_row(f"Tender Premium @ {_percent(premium.get('percent'))}",
+                          _percent(premium.get("percent")), _text(premium.get("amount", ""))))
+    extra_row = len(rows)
+    rows.append([_para("Sum of Extra Items (including Tender Premium): "
+                       + (f"Rs. {extra_sum}" if extra_sum and extra_sum > 0 else "NIL"))]
+                + [""] * 8)
+    rows.append(total_row("Payable Amount Rs.", "", _text(totals.get("payable", ""))))
+    rows.append(total_row("Less Amount Paid vide Last Bill Rs.", "", last_bill))
+    rows.append(total_row("Net Payable Amount Rs.", "", net_payable))
+    net_row = len(rows) - 1
+    rows[net_row][4] = Paragraph("<b>Net Payable Amount Rs.</b>", _CELL_STYLE)
+
+    for row_index in range(first_total, len(rows)):
+        if row_index != extra_row:
+            styles.append(("SPAN", (0, row_index), (3, row_index)))
+    styles += [
+        ("SPAN", (0, extra_row), (-1, extra_row)),
+        ("BACKGROUND", (0, net_row), (-1, net_row), colors.HexColor("#f0f0f0")),
+        ("FONTNAME", (6, net_row), (7, net_row), FONT_BOLD),
+    ]
+    return "CONTRACTOR BILL", intro, rows, widths, styles
+
+
+def _deviation_statement(data: Dict) -> Tuple[str, List, List[List], List[float], List[tuple]]:
+    """Build the Deviation Statement table"""
+    widths = [8, 120] + [12] * 10 + [37]
+    header = _header_row([
+        "ITEM No.", "Description", "Unit", "Qty as per Work Order", "Rate",
+        "Amt as per Work Order Rs.", "Qty Executed", "Amt as per Executed Rs.",
+        "Excess Qty", "Excess Amt Rs.", "Saving Qty", "Saving Amt Rs.", "REMARKS/ REASON.",
+    ])
+    fields = ["unit", "qty_wo", "rate", "amt_wo", "qty_bill", "amt_bill",
+              "excess_qty", "excess_amt", "saving_qty", "saving_amt"]
+
+    rows, styles = [header], []
+    for item in data.get("items", []):
+        if item.get("is_divider"):
+            row_index = len(rows)
+            rows.append([_text(item.get("serial_no", "")),
+                         Paragraph(f"<b>{escape(_text(item.get('description', '')))}</b>", _HEADER_STYLE)]
+                        + [""] * 11)
+            styles += [
+                ("SPAN", (1, row_index), (12, row_index)),
+                ("BACKGROUND", (0, row_index), (-1, row_index), colors.HexColor("#f0f0f0")),
+                ("FONTNAME", (0, row_index), (-1, row_index), FONT_BOLD),
+            ]
+            continue
+        rows.append([_text(item.get("serial_no", "")), _para(item.get("description", ""))]
+                    + [_text(item.get(field, "")) for field in fields]
+                    + [_para(item.get("remark", ""))])
+
+    summary = data.get("summary", {}) or {}
+    premium = summary.get("premium", {}) or {}
+
+    def summary_row(label, f="", h="", j="", l=""):
+        return ["", _para(label), "", "", "", _text(f), "", _text(h), "", _text(j), "", _text(l), ""]
+
+    rows.append(summary_row("Grand Total Rs.", summary.get("work_order_total", ""),
+                            summary.get("executed_total", ""), summary.get("overall_excess", ""),
+                            summary.get("overall_saving", "")))
+    rows.append(summary_row(f"Add Tender Premium ({_percent(premium.get('percent'))})",
+                            summary.get("tender_premium_f", ""), summary.get("tender_premium_h", ""),
+                            summary.get("tender_premium_j", ""), summary.get("tender_premium_l", "")))
+    rows.append(summary_row("Grand Total including Tender Premium Rs.",
+                            summary.get("grand_total_f", ""), summary.get("grand_total_h", ""),
+                            summary.get("grand_total_j", ""), summary.get("grand_total_l", "")))
+    direction = "Saving" if summary.get("is_saving") else "Excess"
+    rows.append(summary_row(f"Overall {direction} With Respect to the Work Order Amount Rs.",
+                            h=summary.get("net_difference", "")))
+    rows.append(summary_row("Percentage of Deviation %",
+                            h="%0.2f%%" % (summary.get("percentage_deviation") or 0)))
+    return "Deviation Statement", [], rows, widths, styles
+
+
+def _extra_items(data: Dict) -> Tuple[str, List, List[List], List[float], List[tuple]]:
+    """Build the Extra Items table"""
+    widths = [12, 15, 80, 18, 12, 18, 35]
+    header = _header_row(["S. No.", "Remarks", "Description", "Quantity", "Unit", "Rate", "Amount"])
+    rows = [header]
+    for item in data.get("items", []):
+        rows.append([
+            _text(item.get("serial_no", "")),
+            _para(item.get("remark", "")),
+            _para(item.get("description", "")),
+            _text(item.get("quantity", "")),
+            _text(item.get("unit", "")),
+            _text(item.get("rate", "")),
+            _text(item.get("amount", "")),
+        ])
+    return "Extra Items", [], rows, widths, []
+
+
+# Sheet name -> (table builder, default orientation as declared by the template's @page rule)
+NATIVE_SHEETS: Dict[str, Tuple[Callable, str]] = {
+    "First Page": (_first_page, "portrait"),
+    "Deviation Statement": (_deviation_statement, "landscape"),
+    "Extra Items": (_extra_items, "portrait"),
+}
+
+
+def supports_native(sheet_name: str) -> bool:
+    """
+    Check whether a sheet has a native renderer
+
+    Args:
+        sheet_name (str): Sheet name, e.g. "First Page"
+
+    Returns:
+        bool: True if render_pdf can build it without HTML
+    """
+    return sheet_name in NATIVE_SHEETS
+
+
+def fit_widths(widths_mm: List[float], frame_width: float) -> List[float]:
+    """
+    Column widths in points, scaled down proportionally to fit the frame
+
+    Args:
+        widths_mm (List[float]): Column widths in millimetres (the HTML colgroup)
+        frame_width (float): Available width in points
+
+    Returns:
+        List[float]: Widths in points (unchanged when they already fit)
+    """
+    total = sum(widths_mm) * mm
+    scale = min(1.0, frame_width / total) if total else 1.0
+    return [width * mm * scale for width in widths_mm]
+
+
+def render_pdf(sheet_name: str, data: Dict, output: Optional[Union[str, io.BufferedIOBase]] = None,
+               orientation: Optional[str] = None) -> Optional[bytes]:
+    """
+    Render a sheet directly from its process_bill data
+
+    Args:
+        sheet_name (str): "First Page", "Deviation Statement" or "Extra Items"
+        data (Dict): The sheet's data as returned by process_bill
+        output: File path or binary stream; None to return the PDF as bytes
+        orientation (str): "portrait" or "landscape" (default: the sheet's usual orientation)
+
+    Returns:
+        Optional[bytes]: PDF bytes when output is None, otherwise None
+    """
+    if sheet_name not in NATIVE_SHEETS:
+        raise ValueError(f"No native renderer for sheet: {sheet_name}")
+    builder, default_orientation = NATIVE_SHEETS[sheet_name]
+    title, intro, rows, widths, extra_styles = builder(data)
+
+    page_size = landscape(A4) if (orientation or default_orientation) == "landscape" else A4
+    target = io.BytesIO() if output is None else output
+    doc = SimpleDocTemplate(
+        target,
+        pagesize=page_size,
+        topMargin=PAGE_MARGIN_MM * mm,
+        rightMargin=PAGE_MARGIN_MM * mm,
+        bottomMargin=PAGE_MARGIN_MM * mm,
+        leftMargin=PAGE_MARGIN_MM * mm,
+        title=title,
+    )
+
+    table = Table(rows, colWidths=fit_widths(widths, doc.width), repeatRows=1, hAlign="LEFT")
+    table.setStyle(TableStyle(_BASE_TABLE_STYLE + extra_styles))
+    story = [Paragraph(escape(title), _TITLE_STYLE)] + intro + [Spacer(1, 2 * mm), table]
+    doc.build(story)
+
+    if output is None:
+        return target.getvalue()
+    return None
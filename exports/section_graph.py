@@ -0,0 +1,358 @@
+"""
+Section-level dependency graph for bill documents
+Each document section declares the slice of the bill it actually reads. The
+slice (plus the template source and page setup) is hashed, and rendered
+HTML/PDF artifacts are memoized per section hash, so a re-run only regenerates
+the sections whose inputs changed. Section PDFs are keyed by the engine that
+produced them and looked up with the engine the router would pick now, so a
+fallback render (e.g. xhtml2pdf while Chrome was failing) is not reused once
+the preferred engine works again. The memo is a size-bounded LRU store
+(data.artifact_store).
+
+    bill = build_bill_context(*process_bill(...), certificate_data=meta)
+    results = render_sections(bill, template_dir, output_dir)
+    results["extra_items"]["reused"]  # True if nothing it depends on changed
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from core.font_bundle import bundle_signature
+from core.html_optimizer import inline_stylesheets
+from data.artifact_store import ArtifactStore, artifact_key
+from exports.pdf_scheduler import run_jobs
+from exports.chunked_render import needs_chunking
+from exports.certificate_stamp import render_stamped_pdf
+from exports.pagination import PAGINATION_VERSION, page_subtotals_enabled
+from exports.renderers import (generate_chunked_pdf, native_engine, pdf_generator_for, preferred_engine,
+                               render_template, use_native)
+
+try:
+    from exports import reportlab_renderer
+except ImportError:
+    reportlab_renderer = None
+
+try:
+    from config.settings import get_setting
+except ImportError:
+    get_setting = None
+
+# Metadata read by templates/certificate_ii.html
+CERTIFICATE_II_KEYS = (
+    "measurement_officer", "measurement_date", "measurement_book_page",
+    "measurement_book_no", "officer_name", "officer_designation", "bill_date",
+    "authorising_officer_name", "authorising_officer_designation", "authorisation_date",
+)
+
+
+class Section:
+    """One document of the bill package and the inputs it depends on"""
+
+    def __init__(self, name: str, sheet_name: str, orientation: str,
+                 selector: Callable[[Dict[str, Any]], Any]):
+        """
+        Initialize a section
+
+        Args:
+            name (str): Section key (also the template name)
+            sheet_name (str): Display name used for output files and page setup
+            orientation (str): "portrait" or "landscape"
+            selector (callable): Picks the section's template data out of the bill context
+        """
+        self.name = name
+        self.sheet_name = sheet_name
+        self.orientation = orientation
+        self.selector = selector
+
+
+def _certificate_iii_inputs(bill):
+    first_page = bill.get("first_page") or {}
+    return {"totals": first_page.get("totals", {}), "payable_words": first_page.get("payable_words")}
+
+
+def _certificate_ii_inputs(bill):
+    certificate_data = bill.get("certificate") or {}
+    return {key: certificate_data[key] for key in CERTIFICATE_II_KEYS if key in certificate_data}
+
+
+# Sections in package (merge) order
+SECTIONS = OrderedDict((section.name, section) for section in [
+    Section("first_page", "First Page", "portrait", lambda bill: bill.get("first_page") or {}),
+    Section("last_page", "Last Page", "portrait", lambda bill: bill.get("last_page") or {}),
+    Section("deviation_statement", "Deviation Statement", "landscape",
+            lambda bill: bill.get("deviation") or {}),
+    Section("extra_items", "Extra Items", "portrait", lambda bill: bill.get("extra_items") or {}),
+    Section("note_sheet", "Note Sheet", "portrait", lambda bill: bill.get("note_sheet") or {}),
+    Section("certificate_ii", "Certificate II", "portrait", _certificate_ii_inputs),
+    Section("certificate_iii", "Certificate III", "portrait", _certificate_iii_inputs),
+])
+
+
+def build_bill_context(first_page_data, last_page_data, deviation_data, extra_items_data,
+                       note_sheet_data, certificate_data=None):
+    """
+    Bundle process_bill() output into the context the section selectors read
+
+    Args:
+        first_page_data, last_page_data, deviation_data, extra_items_data,
+        note_sheet_data: The tuple returned by process_bill()
+        certificate_data (dict): Measurement/signature metadata for Certificate II
+
+    Returns:
+        dict: Bill context
+    """
+    return {
+        "first_page": first_page_data,
+        "last_page": last_page_data,
+        "deviation": deviation_data,
+        "extra_items": extra_items_data,
+        "note_sheet": note_sheet_data,
+        "certificate": certificate_data or {},
+    }
+
+
+def _template_digest(template_dir, name):
+    """Digest of a template's source so template edits invalidate the memo"""
+    path = os.path.join(template_dir, f"{name}.html")
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+def section_input_hash(section: Section, inputs: Any, template_dir: str, optimize: bool = False,
+                       renderer: Optional[str] = None) -> str:
+    """
+    Hash everything a section's rendered output depends on
+
+    Args:
+        section (Section): Section being rendered
+        inputs: Data returned by the section's selector
+        template_dir (str): Directory containing templates
+        optimize (bool): Whether the HTML is minified/hoisted
+        renderer (str): Engine or renderer producing the PDF (e.g. "chrome" or the native ReportLab renderer)
+
+    Returns:
+        str: Hex digest of the section's inputs
+    """
+    parts = {
+        "inputs": inputs,
+        "template": _template_digest(template_dir, section.name),
+        "orientation": section.orientation,
+        "optimize": optimize,
+    }
+    if renderer:
+        parts["renderer"] = renderer
+    fonts = bundle_signature()
+    if fonts:
+        parts["fonts"] = fonts
+    if (not renderer or not renderer.startswith("native-")) and page_subtotals_enabled(section.sheet_name):
+        parts["pagination"] = PAGINATION_VERSION
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class SectionMemo:
+    """Size-bounded on-disk memo of rendered section artifacts keyed by section input hash"""
+
+    def __init__(self, memo_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize the memo
+
+        Args:
+            memo_dir (str): Directory for memoized artifacts (default: system temp)
+            max_bytes (int): Evict least recently used artifacts beyond this size, per format
+                (default: the "performance.section_memo_max_mb" setting)
+        """
+        self.memo_dir = memo_dir or os.path.join(tempfile.gettempdir(), "billgen_sections")
+        if max_bytes is None:
+            max_mb = get_setting("performance.section_memo_max_mb", 256) if get_setting else 256
+            max_bytes = int(max_mb) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self._stores: Dict[str, ArtifactStore] = {}
+        self._lock = threading.Lock()
+
+    def _store(self, extension: str) -> ArtifactStore:
+        with self._lock:
+            store = self._stores.get(extension)
+            if store is None:
+                store = ArtifactStore(os.path.join(self.memo_dir, extension), self.max_bytes, f".{extension}")
+                self._stores[extension] = store
+            return store
+
+    @staticmethod
+    def _key(section_name: str, digest: str) -> str:
+        return artifact_key(section=section_name, digest=digest)
+
+    def path_for(self, section_name: str, digest: str, extension: str) -> str:
+        """Get the artifact path for a section hash"""
+        return self._store(extension).path_for(self._key(section_name, digest))
+
+    def get(self, section_name: str, digest: str, extension: str) -> Optional[str]:
+        """
+        Look up a memoized artifact and mark it as recently used
+
+        Returns:
+            Optional[str]: Artifact path or None if not rendered yet (or evicted)
+        """
+        return self._store(extension).get(self._key(section_name, digest))
+
+    def put_bytes(self, section_name: str, digest: str, extension: str, content: bytes) -> str:
+        """Store an artifact atomically and return its path"""
+        return self._store(extension).put_bytes(self._key(section_name, digest), content)
+
+    def new_temp_path(self, extension: str) -> str:
+        """Reserve a temporary path inside the memo directory (for engines writing files)"""
+        os.makedirs(self.memo_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.memo_dir, suffix=f".{extension}.tmp")
+        os.close(fd)
+        return tmp_path
+
+    def commit_file(self, section_name: str, digest: str, extension: str, tmp_path: str) -> str:
+        """Store a finished temporary artifact (the temporary file is left to the caller)"""
+        return self._store(extension).put_file(self._key(section_name, digest), tmp_path)
+
+    def clear(self) -> None:
+        """Remove every memoized artifact"""
+        with self._lock:
+            self._stores.clear()
+        shutil.rmtree(self.memo_dir, ignore_errors=True)
+
+
+# Global memo instance (created on first use)
+_section_memo: Optional[SectionMemo] = None
+_section_memo_lock = threading.Lock()
+
+
+def get_section_memo() -> SectionMemo:
+    """
+    Get the global section memo instance
+
+    Returns:
+        SectionMemo: Global section memo
+    """
+    global _section_memo
+    with _section_memo_lock:
+        if _section_memo is None:
+            _section_memo = SectionMemo()
+        return _section_memo
+
+
+def _render_section_pdf(section, html_content, memo, inputs, template_dir, optimize, engine):
+    """
+    Render one section's PDF into the memo (natively from inputs when html_content is None)
+
+    Returns:
+        str: Memo path, stored under the engine that actually produced the PDF
+    """
+    tmp_path = memo.new_temp_path("pdf")
+    try:
+        if html_content is None:
+            reportlab_renderer.render_pdf(section.sheet_name, inputs, tmp_path, section.orientation)
+            success = True
+        else:
+            generator = pdf_generator_for(section.sheet_name, section.orientation)
+            success = generator.generate_pdf(html_content, tmp_path,
+                                             route=f"{section.name}/{section.orientation}")
+            engine = generator.last_engine
+        if not success or not os.path.getsize(tmp_path):
+            raise RuntimeError(f"Failed to generate PDF for {section.sheet_name}")
+        digest = section_input_hash(section, inputs, template_dir, optimize, engine)
+        return memo.commit_file(section.name, digest, "pdf", tmp_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def _render_section(section, bill, template_dir, output_dir, formats, optimize, memo):
+    """Render (or reuse) one section's artifacts"""
+    inputs = section.selector(bill)
+    digest = section_input_hash(section, inputs, template_dir, optimize)
+    native = "pdf" in formats and use_native(section.sheet_name)
+    engine = None
+    if "pdf" in formats:
+        engine = (native_engine() if native else
+                  preferred_engine(section.sheet_name, pdf_generator_for(section.sheet_name, section.orientation)))
+    result = {"hash": digest, "reused": True}
+
+    html_content = None
+    for extension in formats:
+        key = section_input_hash(section, inputs, template_dir, optimize, engine) if extension == "pdf" else digest
+        path = memo.get(section.name, key, extension)
+        if path is None:
+            result["reused"] = False
+            chunked = extension == "pdf" and not native and needs_chunking(section.sheet_name, inputs)
+            stamped = None
+            if extension == "pdf" and not native and not chunked:
+                stamped = render_stamped_pdf(section.sheet_name, inputs, section.orientation, template_dir)
+            if html_content is None and not (native and extension == "pdf") and not chunked and stamped is None:
+                html_content = render_template(section.sheet_name, inputs, template_dir, optimize)
+            if extension == "html":
+                # HTML artifacts are handed to users: no links into the stylesheet cache
+                path = memo.put_bytes(section.name, digest, "html",
+                                      inline_stylesheets(html_content).encode("utf-8"))
+            elif stamped is not None:
+                # Stamped onto the template printed by the preferred engine
+                path = memo.put_bytes(section.name, key, "pdf", stamped)
+            elif chunked:
+                pdf, chunk_engines = generate_chunked_pdf(section.sheet_name, inputs, section.orientation,
+                                                           template_dir, optimize)
+                chunked_key = section_input_hash(section, inputs, template_dir, optimize, chunk_engines)
+                path = memo.put_bytes(section.name, chunked_key, "pdf", pdf)
+            elif extension == "pdf":
+                path = _render_section_pdf(section, None if native else html_content, memo, inputs,
+                                           template_dir, optimize, engine)
+            else:
+                raise ValueError(f"Unsupported section format: {extension}")
+
+        if output_dir:
+            target = os.path.join(output_dir, f"{section.sheet_name.replace(' ', '_')}.{extension}")
+            shutil.copyfile(path, target)
+            path = target
+        result[extension] = path
+
+    return result
+
+
+def render_sections(bill: Dict[str, Any], template_dir: str, output_dir: Optional[str] = None,
+                    sections: Optional[Iterable[str]] = None, formats: Iterable[str] = ("pdf",),
+                    optimize: bool = False, memo: Optional[SectionMemo] = None,
+                    max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Render bill sections, regenerating only those whose inputs changed
+
+    Sections that need rendering run concurrently (see exports.pdf_scheduler);
+    results keep the package order.
+
+    Args:
+        bill (dict): Bill context from build_bill_context()
+        template_dir (str): Directory containing templates
+        output_dir (str): If given, artifacts are copied here as <Sheet_Name>.<ext>
+        sections (iterable): Section keys to render (default: all, in package order)
+        formats (iterable): Any of "html", "pdf"
+        optimize (bool): Minify the HTML and hoist CSS into a cached stylesheet
+        memo (SectionMemo): Memo to use (default: global memo)
+        max_workers (int): Concurrency limit (default: engine-aware, see engine_concurrency)
+
+    Returns:
+        dict: {section_key: {"hash": str, "reused": bool, "html": path, "pdf": path}}
+    """
+    memo = memo or get_section_memo()
+    formats = tuple(formats)
+    names = list(sections) if sections is not None else list(SECTIONS)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    jobs = [
+        partial(_render_section, SECTIONS[name], bill, template_dir, output_dir, formats, optimize, memo)
+        for name in names
+    ]
+    return OrderedDict(zip(names, run_jobs(jobs, max_workers)))
@@ -8,8 +8,16 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 
+from exports.docx_skeleton import render_skeleton
+from exports.docx_tables import DocxCell, DocxTableBuilder
+
+# Column widths (mm) matching the HTML templates, fitted to the printable width
+FIRST_PAGE_WIDTHS_MM = [11, 16, 16, 11, 70, 15, 22, 17, 12]
+DEVIATION_WIDTHS_MM = [8, 112] + [12] * 10 + [37]
+EXTRA_ITEMS_WIDTHS_MM = [12, 15, 80, 18, 12, 18, 35]
+
 def set_cell_border(cell, **kwargs):
-    """Set cell borders"""
+    """Set cell borders (tables built with DocxTableBuilder have table-level borders instead)"""
     tc = cell._tc
     tcPr = tc.get_or_add_tcPr()
     
@@ -28,7 +36,10 @@ def set_cell_border(cell, **kwargs):
     tcPr.append(tcBorders)
 
 def generate_first_page_docx(data, output_path):
-    """Generate First Page as Word document"""
+    """Generate First Page as Word document (from its skeleton in templates/ when available)"""
+    if render_skeleton("First Page", data, output_path):
+        return output_path
+    
     doc = Document()
     
     # Set margins (10mm all around)
@@ -57,124 +68,62 @@ def generate_first_page_docx(data, output_path):
     # Main table
     items = data.get('items', [])
     if items:
-        # Create table with 9 columns - FIXED WIDTHS (NO SHRINKING!)
-        table = doc.add_table(rows=1, cols=9)
-        table.style = 'Table Grid'
-        table.autofit = False
-        table.allow_autofit = False
-        
-        # Set exact column widths (matching HTML template)
-        widths = [Mm(25), Mm(20), Mm(20), Mm(15), Mm(70), Mm(20), Mm(25), Mm(25), Mm(15)]
-        for row in table.rows:
-            for idx, width in enumerate(widths):
-                row.cells[idx].width = width
-        
-        # Header row
-        header_cells = table.rows[0].cells
-        headers = ['Unit', 'Qty Since Last', 'Qty Upto Date', 'S.No.', 
-                   'Description', 'Rate', 'Amount Upto Date', 'Amount Since Previous', 'Remarks']
-        
-        for i, header in enumerate(headers):
-            header_cells[i].text = header
-            header_cells[i].paragraphs[0].runs[0].font.bold = True
-            header_cells[i].paragraphs[0].runs[0].font.size = Pt(8)
-            header_cells[i].width = widths[i]
+        # 9 columns with FIXED WIDTHS matching the HTML template's colgroup
+        table = DocxTableBuilder(FIRST_PAGE_WIDTHS_MM)
+        table.add_header(['Unit', 'Qty Since Last', 'Qty Upto Date', 'S.No.',
+                          'Description', 'Rate', 'Amount Upto Date', 'Amount Since Previous', 'Remarks'])
         
         # Data rows
-        for item in items:
-            if item.get('is_divider'):
-                row = table.add_row()
-                for idx, width in enumerate(widths):
-                    row.cells[idx].width = width
-                row.cells[0].merge(row.cells[8])
-                row.cells[0].text = item.get('description', '')
-                row.cells[0].paragraphs[0].runs[0].font.bold = True
-            else:
-                row = table.add_row()
-                for idx, width in enumerate(widths):
-                    row.cells[idx].width = width
-                row.cells[0].text = str(item.get('unit', ''))
-                row.cells[1].text = str(item.get('quantity_since_last', ''))
-                row.cells[2].text = str(item.get('quantity_upto_date', ''))
-                row.cells[3].text = str(item.get('serial_no', ''))
-                row.cells[4].text = str(item.get('description', ''))
-                row.cells[5].text = str(item.get('rate', ''))
-                row.cells[6].text = str(item.get('amount', ''))
-                row.cells[7].text = str(item.get('amount_previous', ''))
-                row.cells[8].text = str(item.get('remark', ''))
+        table.add_rows([
+            [DocxCell(item.get('description', ''), span=9, bold=True)] if item.get('is_divider') else [
+                item.get('unit', ''),
+                item.get('quantity_since_last', ''),
+                item.get('quantity_upto_date', ''),
+                item.get('serial_no', ''),
+                item.get('description', ''),
+                item.get('rate', ''),
+                item.get('amount', ''),
+                item.get('amount_previous', ''),
+                item.get('remark', ''),
+            ]
+            for item in items
+        ])
         
         # Totals
         totals = data.get('totals', {})
+        premium = totals.get('premium', {})
         
-        # Grand Total
-        row = table.add_row()
-        for idx, width in enumerate(widths):
-            row.cells[idx].width = width
-        row.cells[0].merge(row.cells[3])
-        row.cells[0].text = 'Grand Total Rs.'
-        row.cells[6].text = str(totals.get('grand_total', ''))
-        row.cells[7].text = str(totals.get('grand_total', ''))
+        def total_row(label, amount, bold=False):
+            amount = str(amount)
+            return [DocxCell(label, span=4, bold=bold), '', '', DocxCell(amount, bold=bold), DocxCell(amount, bold=bold)]
         
-        # Premium
-        premium = totals.get('premium', {})
-        row = table.add_row()
-        for idx, width in enumerate(widths):
-            row.cells[idx].width = width
-        row.cells[0].merge(row.cells[3])
-        row.cells[0].text = f"Tender Premium @ {premium.get('percent', 0)*100:.2f}%"
-        row.cells[6].text = str(premium.get('amount', ''))
-        row.cells[7].text = str(premium.get('amount', ''))
+        table.add_row(total_row('Grand Total Rs.', totals.get('grand_total', '')))
+        table.add_row(total_row(f"Tender Premium @ {premium.get('percent', 0)*100:.2f}%", premium.get('amount', '')))
         
         # Extra Items Sum - MERGED ALL COLUMNS, LEFT ALIGNED
-        row = table.add_row()
-        for idx, width in enumerate(widths):
-            row.cells[idx].width = width
-        row.cells[0].merge(row.cells[8])
         extra_sum = totals.get('extra_items_sum', 0)
         if extra_sum and extra_sum > 0:
-            row.cells[0].text = f'Sum of Extra Items (including Tender Premium): Rs. {extra_sum}'
+            extra_text = f'Sum of Extra Items (including Tender Premium): Rs. {extra_sum}'
         else:
-            row.cells[0].text = 'Sum of Extra Items (including Tender Premium): NIL'
-        row.cells[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.LEFT
+            extra_text = 'Sum of Extra Items (including Tender Premium): NIL'
+        table.add_row([DocxCell(extra_text, span=9, align='left')])
         
-        # Payable Amount
-        row = table.add_row()
-        for idx, width in enumerate(widths):
-            row.cells[idx].width = width
-        row.cells[0].merge(row.cells[3])
-        row.cells[0].text = 'Payable Amount Rs.'
-        row.cells[6].text = str(totals.get('payable', ''))
-        row.cells[7].text = str(totals.get('payable', ''))
-        
-        # Less Amount Paid
-        row = table.add_row()
-        for idx, width in enumerate(widths):
-            row.cells[idx].width = width
-        row.cells[0].merge(row.cells[3])
-        row.cells[0].text = 'Less Amount Paid vide Last Bill Rs.'
+        table.add_row(total_row('Payable Amount Rs.', totals.get('payable', '')))
         last_bill = totals.get('last_bill_amount', 0)
-        row.cells[6].text = f"{last_bill:.2f}" if last_bill else "0.00"
-        row.cells[7].text = f"{last_bill:.2f}" if last_bill else "0.00"
-        
-        # Net Payable
-        row = table.add_row()
-        for idx, width in enumerate(widths):
-            row.cells[idx].width = width
-        row.cells[0].merge(row.cells[3])
-        row.cells[0].text = 'Net Payable Amount Rs.'
-        row.cells[0].paragraphs[0].runs[0].font.bold = True
+        table.add_row(total_row('Less Amount Paid vide Last Bill Rs.', f"{last_bill:.2f}" if last_bill else "0.00"))
         net_payable = totals.get('net_payable', totals.get('payable', 0))
-        row.cells[6].text = f"{net_payable:.2f}"
-        row.cells[7].text = f"{net_payable:.2f}"
-        row.cells[6].paragraphs[0].runs[0].font.bold = True
-        row.cells[7].paragraphs[0].runs[0].font.bold = True
+        table.add_row(total_row('Net Payable Amount Rs.', f"{net_payable:.2f}", bold=True))
+        table.insert(doc)
     
     # Save
     doc.save(output_path)
     return output_path
 
 def generate_deviation_statement_docx(data, output_path):
-    """Generate Deviation Statement as Word document"""
+    """Generate Deviation Statement as Word document (from its skeleton in templates/ when available)"""
+    if render_skeleton("Deviation Statement", data, output_path):
+        return output_path
+    
     doc = Document()
     
     # Set margins and landscape
@@ -194,94 +143,55 @@ def generate_deviation_statement_docx(data, output_path):
     # Main table
     items = data.get('items', [])
     if items:
-        table = doc.add_table(rows=1, cols=13)
-        table.style = 'Table Grid'
-        
-        # Header row
-        header_cells = table.rows[0].cells
-        headers = ['ITEM No.', 'Description', 'Unit', 'Qty WO', 'Rate', 'Amt WO', 
-                   'Qty Executed', 'Amt Executed', 'Excess Qty', 'Excess Amt', 
-                   'Saving Qty', 'Saving Amt', 'Remarks']
-        
-        for i, header in enumerate(headers):
-            header_cells[i].text = header
-            header_cells[i].paragraphs[0].runs[0].font.bold = True
-            header_cells[i].paragraphs[0].runs[0].font.size = Pt(8)
+        table = DocxTableBuilder(DEVIATION_WIDTHS_MM)
+        table.add_header(['ITEM No.', 'Description', 'Unit', 'Qty WO', 'Rate', 'Amt WO',
+                          'Qty Executed', 'Amt Executed', 'Excess Qty', 'Excess Amt',
+                          'Saving Qty', 'Saving Amt', 'Remarks'])
         
         # Data rows
-        for item in items:
-            if item.get('is_divider'):
-                row = table.add_row()
-                row.cells[0].merge(row.cells[12])
-                row.cells[0].text = item.get('description', '')
-                row.cells[0].paragraphs[0].runs[0].font.bold = True
-                row.cells[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-            else:
-                row = table.add_row()
-                row.cells[0].text = str(item.get('serial_no', ''))
-                row.cells[1].text = str(item.get('description', ''))
-                row.cells[2].text = str(item.get('unit', ''))
-                row.cells[3].text = str(item.get('qty_wo', ''))
-                row.cells[4].text = str(item.get('rate', ''))
-                row.cells[5].text = str(item.get('amt_wo', ''))
-                row.cells[6].text = str(item.get('qty_bill', ''))
-                row.cells[7].text = str(item.get('amt_bill', ''))
-                row.cells[8].text = str(item.get('excess_qty', ''))
-                row.cells[9].text = str(item.get('excess_amt', ''))
-                row.cells[10].text = str(item.get('saving_qty', ''))
-                row.cells[11].text = str(item.get('saving_amt', ''))
-                row.cells[12].text = str(item.get('remark', ''))
+        fields = ['serial_no', 'description', 'unit', 'qty_wo', 'rate', 'amt_wo', 'qty_bill',
+                  'amt_bill', 'excess_qty', 'excess_amt', 'saving_qty', 'saving_amt', 'remark']
+        table.add_rows([
+            [DocxCell(item.get('description', ''), span=13, bold=True, align='center')]
+            if item.get('is_divider') else [item.get(field, '') for field in fields]
+            for item in items
+        ])
         
         # Summary rows
         summary = data.get('summary', {})
-        
-        # Grand Total
-        row = table.add_row()
-        row.cells[0].merge(row.cells[4])
-        row.cells[0].text = 'Grand Total Rs.'
-        row.cells[5].text = str(summary.get('work_order_total', ''))
-        row.cells[7].text = str(summary.get('executed_total', ''))
-        row.cells[9].text = str(summary.get('overall_excess', ''))
-        row.cells[11].text = str(summary.get('overall_saving', ''))
-        
-        # Premium
         premium = summary.get('premium', {})
-        row = table.add_row()
-        row.cells[0].merge(row.cells[4])
-        row.cells[0].text = f"Add Tender Premium ({premium.get('percent', 0)*100:.2f}%)"
-        row.cells[5].text = str(summary.get('tender_premium_f', ''))
-        row.cells[7].text = str(summary.get('tender_premium_h', ''))
-        row.cells[9].text = str(summary.get('tender_premium_j', ''))
-        row.cells[11].text = str(summary.get('tender_premium_l', ''))
         
-        # Grand Total with Premium
-        row = table.add_row()
-        row.cells[0].merge(row.cells[4])
-        row.cells[0].text = 'Grand Total including Tender Premium Rs.'
-        row.cells[5].text = str(summary.get('grand_total_f', ''))
-        row.cells[7].text = str(summary.get('grand_total_h', ''))
-        row.cells[9].text = str(summary.get('grand_total_j', ''))
-        row.cells[11].text = str(summary.get('grand_total_l', ''))
+        def summary_row(label, f, h, j, l):
+            return [DocxCell(label, span=5), f, '', h, '', j, '', l]
+        
+        table.add_row(summary_row('Grand Total Rs.', summary.get('work_order_total', ''),
+                                  summary.get('executed_total', ''), summary.get('overall_excess', ''),
+                                  summary.get('overall_saving', '')))
+        table.add_row(summary_row(f"Add Tender Premium ({premium.get('percent', 0)*100:.2f}%)",
+                                  summary.get('tender_premium_f', ''), summary.get('tender_premium_h', ''),
+                                  summary.get('tender_premium_j', ''), summary.get('tender_premium_l', '')))
+        table.add_row(summary_row('Grand Total including Tender Premium Rs.',
+                                  summary.get('grand_total_f', ''), summary.get('grand_total_h', ''),
+                                  summary.get('grand_total_j', ''), summary.get('grand_total_l', '')))
         
         # Net Difference
-        row = table.add_row()
-        row.cells[0].merge(row.cells[6])
         is_saving = summary.get('is_saving', False)
-        row.cells[0].text = 'Overall Saving With Respect to the Work Order Amount Rs.' if is_saving else 'Overall Excess With Respect to the Work Order Amount Rs.'
-        row.cells[7].text = str(summary.get('net_difference', ''))
+        label = 'Overall Saving With Respect to the Work Order Amount Rs.' if is_saving else 'Overall Excess With Respect to the Work Order Amount Rs.'
+        table.add_row([DocxCell(label, span=7), summary.get('net_difference', '')])
         
         # Percentage Deviation
-        row = table.add_row()
-        row.cells[0].merge(row.cells[6])
-        row.cells[0].text = 'Percentage of Deviation %'
-        row.cells[7].text = f"{summary.get('percentage_deviation', 0):.2f}%"
+        table.add_row([DocxCell('Percentage of Deviation %', span=7), f"{summary.get('percentage_deviation', 0):.2f}%"])
+        table.insert(doc)
     
     # Save
     doc.save(output_path)
     return output_path
 
 def generate_extra_items_docx(data, output_path):
-    """Generate Extra Items as Word document"""
+    """Generate Extra Items as Word document (from its skeleton in templates/ when available)"""
+    if render_skeleton("Extra Items", data, output_path):
+        return output_path
+    
     doc = Document()
     
     # Set margins
@@ -299,28 +209,13 @@ def generate_extra_items_docx(data, output_path):
     # Main table
     items = data.get('items', [])
     if items:
-        table = doc.add_table(rows=1, cols=7)
-        table.style = 'Table Grid'
-        
-        # Header row
-        header_cells = table.rows[0].cells
-        headers = ['S.No.', 'Remarks', 'Description', 'Quantity', 'Unit', 'Rate', 'Amount']
-        
-        for i, header in enumerate(headers):
-            header_cells[i].text = header
-            header_cells[i].paragraphs[0].runs[0].font.bold = True
-            header_cells[i].paragraphs[0].runs[0].font.size = Pt(8)
+        table = DocxTableBuilder(EXTRA_ITEMS_WIDTHS_MM)
+        table.add_header(['S.No.', 'Remarks', 'Description', 'Quantity', 'Unit', 'Rate', 'Amount'])
         
         # Data rows
-        for item in items:
-            row = table.add_row()
-            row.cells[0].text = str(item.get('serial_no', ''))
-            row.cells[1].text = str(item.get('remark', ''))
-            row.cells[2].text = str(item.get('description', ''))
-            row.cells[3].text = str(item.get('quantity', ''))
-            row.cells[4].text = str(item.get('unit', ''))
-            row.cells[5].text = str(item.get('rate', ''))
-            row.cells[6].text = str(item.get('amount', ''))
+        fields = ['serial_no', 'remark', 'description', 'quantity', 'unit', 'rate', 'amount']
+        table.add_rows([[item.get(field, '') for field in fields] for item in items])
+        table.insert(doc)
     
     # Save
     doc.save(output_path)
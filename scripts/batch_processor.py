@@ -11,7 +11,8 @@ from pathlib import Path
 
 # Import our modular components
 from core.computations.bill_processor import process_bill
-from exports.renderers import generate_pdf, create_word_doc, merge_pdfs, create_zip_archive
+from exports.renderers import create_word_doc, merge_pdfs, create_zip_archive
+from exports.section_graph import build_bill_context, render_sections
 from exports.advanced_formats import export_bill_data
 from scripts.monitoring import log_performance, log_event
 
@@ -70,57 +71,18 @@ def process_single_file(file_path: str,
         # Generate PDFs
         template_dir = os.path.join(os.path.dirname(__file__), "..", "templates")
         
-        pdf_files = []
-        
-        # Generate First Page
-        first_page_pdf = generate_pdf(
-            "First Page", 
-            first_page_data, 
-            "landscape", 
-            template_dir, 
-            file_output_dir
-        )
-        pdf_files.append(first_page_pdf)
-        
-        # Generate Last Page
-        last_page_pdf = generate_pdf(
-            "Last Page", 
-            last_page_data, 
-            "portrait", 
-            template_dir, 
-            file_output_dir
-        )
-        pdf_files.append(last_page_pdf)
-        
-        # Generate Deviation Statement
-        deviation_pdf = generate_pdf(
-            "Deviation Statement", 
-            deviation_data, 
-            "landscape", 
-            template_dir, 
-            file_output_dir
-        )
-        pdf_files.append(deviation_pdf)
-        
-        # Generate Extra Items
-        extra_items_pdf = generate_pdf(
-            "Extra Items", 
-            extra_items_data, 
-            "landscape", 
-            template_dir, 
-            file_output_dir
+        # Only sections whose inputs changed since the last run are re-rendered
+        bill = build_bill_context(
+            first_page_data, last_page_data, deviation_data, extra_items_data, note_sheet_data
         )
-        pdf_files.append(extra_items_pdf)
-        
-        # Generate Note Sheet
-        note_sheet_pdf = generate_pdf(
-            "Note Sheet", 
-            note_sheet_data, 
-            "portrait", 
-            template_dir, 
-            file_output_dir
+        sections = render_sections(
+            bill,
+            template_dir,
+            file_output_dir,
+            sections=["first_page", "last_page", "deviation_statement", "extra_items", "note_sheet"],
+            optimize=True
         )
-        pdf_files.append(note_sheet_pdf)
+        pdf_files = [section["pdf"] for section in sections.values()]
         
         # Create Word documents
         word_files = []
@@ -153,7 +115,9 @@ def process_single_file(file_path: str,
         
         # Merge all PDFs
         merged_pdf = os.path.join(file_output_dir, "complete_bill.pdf")
-        merge_pdfs(pdf_files, merged_pdf)
+        merge_stats = {}
+        merge_pdfs(pdf_files, merged_pdf, stats=merge_stats)
+        result["merged_pdf_stats"] = merge_stats
         
         # Create ZIP archive
         all_files = pdf_files + word_files + advanced_files + [merged_pdf]
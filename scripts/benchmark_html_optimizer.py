@@ -0,0 +1,132 @@
+"""
+Benchmark for render-time HTML optimization
+Compares raw template output with minified output + hoisted shared stylesheets:
+bytes written per bill and time spent by the PDF engine parsing the documents.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from html.parser import HTMLParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+from jinja2 import Environment, FileSystemLoader
+
+from core.computations.bill_processor import process_bill
+from core.html_optimizer import (SharedStylesheetCache, optimize_html,
+                                 split_shared_stylesheets)
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
+INPUT_DIR = Path(__file__).parent.parent / "test_input_files"
+
+
+def render_bill_documents(excel_path):
+    """Render every template for one bill, returning {template_name: html}"""
+    xl_file = pd.ExcelFile(excel_path)
+    ws_wo = pd.read_excel(xl_file, "Work Order", header=None)
+    ws_bq = pd.read_excel(xl_file, "Bill Quantity", header=None)
+    ws_extra = pd.read_excel(xl_file, "Extra Items", header=None)
+    first_page_data, _, deviation_data, extra_items_data, note_sheet_data = process_bill(
+        ws_wo, ws_bq, ws_extra, 5.0, "above", 0
+    )
+
+    env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)))
+    documents = {}
+    for template_name, data in [
+        ("first_page", first_page_data),
+        ("deviation_statement", deviation_data),
+        ("extra_items", extra_items_data),
+        ("note_sheet", note_sheet_data),
+        ("certificate_ii", {"measurement_officer": "Junior Engineer",
+                            "measurement_date": datetime.now().strftime('%d/%m/%Y')}),
+        ("certificate_iii", first_page_data),
+    ]:
+        documents[template_name] = env.get_template(f"{template_name}.html").render(data=data)
+    return documents
+
+
+def _html_parse_seconds(html_documents, repeat=20):
+    """Time a full tokenization pass over the documents (stand-in for engine parsing)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in html_documents:
+            parser = HTMLParser()
+            parser.feed(html)
+            parser.close()
+    return (time.perf_counter() - start) / repeat
+
+
+def _weasyprint_parse_seconds(raw_documents, optimized_documents, cache, repeat=3):
+    """Time WeasyPrint layout with inline CSS vs. hoisted CSS parsed once"""
+    try:
+        from weasyprint import CSS, HTML
+    except Exception:
+        return None
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in raw_documents:
+            HTML(string=html).render()
+    raw_seconds = (time.perf_counter() - start) / repeat
+
+    parsed = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in optimized_documents:
+            body, digests = split_shared_stylesheets(html)
+            sheets = []
+            for digest in digests:
+                if digest not in parsed:
+                    parsed[digest] = CSS(string=cache.get_css(digest))
+                sheets.append(parsed[digest])
+            HTML(string=body).render(stylesheets=sheets)
+    optimized_seconds = (time.perf_counter() - start) / repeat
+    return raw_seconds, optimized_seconds
+
+
+def run_benchmark():
+    """Run the benchmark over all sample workbooks and print a report"""
+    excel_files = sorted(INPUT_DIR.glob("*.xlsx"))
+    if not excel_files:
+        print(f"No sample workbooks found in {INPUT_DIR}")
+        return
+
+    with tempfile.TemporaryDirectory() as css_dir:
+        cache = SharedStylesheetCache(css_dir)
+        raw_documents, optimized_documents = [], []
+        for excel_path in excel_files:
+            for html in render_bill_documents(excel_path).values():
+                raw_documents.append(html)
+                optimized_documents.append(optimize_html(html, cache))
+
+        raw_bytes = sum(len(html.encode("utf-8")) for html in raw_documents)
+        optimized_bytes = sum(len(html.encode("utf-8")) for html in optimized_documents)
+        css_files = [os.path.join(css_dir, name) for name in os.listdir(css_dir)]
+        css_bytes = sum(os.path.getsize(path) for path in css_files)
+
+        print(f"Bills: {len(excel_files)}, documents: {len(raw_documents)}")
+        print(f"Raw HTML:            {raw_bytes:>10,} bytes")
+        print(f"Optimized HTML:      {optimized_bytes:>10,} bytes")
+        print(f"Shared stylesheets:  {css_bytes:>10,} bytes in {len(css_files)} files")
+        print(f"Saved:               {raw_bytes - optimized_bytes - css_bytes:>10,} bytes "
+              f"({(1 - (optimized_bytes + css_bytes) / raw_bytes) * 100:.1f}%)")
+
+        raw_parse = _html_parse_seconds(raw_documents)
+        optimized_parse = _html_parse_seconds(optimized_documents)
+        print(f"HTML parse (raw):       {raw_parse * 1000:8.2f} ms")
+        print(f"HTML parse (optimized): {optimized_parse * 1000:8.2f} ms")
+
+        weasyprint_times = _weasyprint_parse_seconds(raw_documents, optimized_documents, cache)
+        if weasyprint_times is None:
+            print("WeasyPrint not available; skipping engine parse benchmark")
+        else:
+            print(f"WeasyPrint render (inline CSS):  {weasyprint_times[0] * 1000:8.1f} ms")
+            print(f"WeasyPrint render (shared CSS):  {weasyprint_times[1] * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,121 @@
+"""
+Build the stock Word skeletons in templates/ (see exports.docx_skeleton)
+The skeletons reproduce the layout of exports.word_generator with
+placeholders where the bill data goes. Run after changing that layout; edits
+made to the skeletons in Word are overwritten.
+
+    python scripts/build_docx_skeletons.py [--template-dir templates]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Mm
+
+from exports.docx_skeleton import SKELETON_DIR, SKELETONS
+from exports.docx_tables import DocxCell, DocxTableBuilder
+from exports.word_generator import DEVIATION_WIDTHS_MM, EXTRA_ITEMS_WIDTHS_MM, FIRST_PAGE_WIDTHS_MM
+
+
+def _page(doc, width_mm, height_mm=None):
+    for section in doc.sections:
+        section.top_margin = Mm(10)
+        section.bottom_margin = Mm(10)
+        section.left_margin = Mm(10)
+        section.right_margin = Mm(10)
+        if height_mm:
+            section.page_width = Mm(width_mm)
+            section.page_height = Mm(height_mm)
+
+
+def first_page():
+    doc = Document()
+    _page(doc, 210, 297)
+    doc.add_heading("CONTRACTOR BILL", level=1).alignment = WD_ALIGN_PARAGRAPH.LEFT
+    doc.add_paragraph("{{line}}")
+
+    fields = ["unit", "quantity_since_last", "quantity_upto_date", "serial_no", "description",
+              "rate", "amount", "amount_previous", "remark"]
+    table = DocxTableBuilder(FIRST_PAGE_WIDTHS_MM)
+    table.add_header(["Unit", "Qty Since Last", "Qty Upto Date", "S.No.", "Description", "Rate",
+                      "Amount Upto Date", "Amount Since Previous", "Remarks"])
+    table.add_row([f"{{{{item.{field}}}}}" for field in fields])
+    table.add_row([DocxCell("{{divider.description}}", span=9, bold=True)])
+
+    def total_row(label, amount, bold=False):
+        return [DocxCell(label, span=4, bold=bold), "", "", DocxCell(amount, bold=bold), DocxCell(amount, bold=bold)]
+
+    table.add_row(total_row("Grand Total Rs.", "{{grand_total}}"))
+    table.add_row(total_row("{{premium_label}}", "{{premium_amount}}"))
+    table.add_row([DocxCell("{{extra_items_text}}", span=9, align="left")])
+    table.add_row(total_row("Payable Amount Rs.", "{{payable}}"))
+    table.add_row(total_row("Less Amount Paid vide Last Bill Rs.", "{{last_bill}}"))
+    table.add_row(total_row("Net Payable Amount Rs.", "{{net_payable}}", bold=True))
+    table.insert(doc)
+    return doc
+
+
+def deviation_statement():
+    doc = Document()
+    _page(doc, 297, 210)
+    doc.add_heading("Deviation Statement", level=1).alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    fields = ["serial_no", "description", "unit", "qty_wo", "rate", "amt_wo", "qty_bill",
+              "amt_bill", "excess_qty", "excess_amt", "saving_qty", "saving_amt", "remark"]
+    table = DocxTableBuilder(DEVIATION_WIDTHS_MM)
+    table.add_header(["ITEM No.", "Description", "Unit", "Qty WO", "Rate", "Amt WO", "Qty Executed",
+                      "Amt Executed", "Excess Qty", "Excess Amt", "Saving Qty", "Saving Amt", "Remarks"])
+    table.add_row([f"{{{{item.{field}}}}}" for field in fields])
+    table.add_row([DocxCell("{{divider.description}}", span=13, bold=True, align="center")])
+
+    def summary_row(label, prefix):
+        return [DocxCell(label, span=5)] + [cell for column in "fhjl"
+                                            for cell in (f"{{{{{prefix}_{column}}}}}", "")][:-1]
+
+    table.add_row([DocxCell("Grand Total Rs.", span=5), "{{work_order_total}}", "", "{{executed_total}}", "",
+                   "{{overall_excess}}", "", "{{overall_saving}}"])
+    table.add_row(summary_row("{{premium_label}}", "tender_premium"))
+    table.add_row(summary_row("Grand Total including Tender Premium Rs.", "grand_total"))
+    table.add_row([DocxCell("{{net_difference_label}}", span=7), "{{net_difference}}"])
+    table.add_row([DocxCell("Percentage of Deviation %", span=7), "{{percentage_deviation}}"])
+    table.insert(doc)
+    return doc
+
+
+def extra_items():
+    doc = Document()
+    _page(doc, 210)
+    doc.add_heading("Extra Items", level=1).alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    fields = ["serial_no", "remark", "description", "quantity", "unit", "rate", "amount"]
+    table = DocxTableBuilder(EXTRA_ITEMS_WIDTHS_MM)
+    table.add_header(["S.No.", "Remarks", "Description", "Quantity", "Unit", "Rate", "Amount"])
+    table.add_row([f"{{{{item.{field}}}}}" for field in fields])
+    table.insert(doc)
+    return doc
+
+
+BUILDERS = {
+    "First Page": first_page,
+    "Deviation Statement": deviation_statement,
+    "Extra Items": extra_items,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Word skeletons")
+    parser.add_argument("--template-dir", default=SKELETON_DIR, help="Output directory")
+    args = parser.parse_args()
+
+    for sheet_name, build in BUILDERS.items():
+        path = Path(args.template_dir) / SKELETONS[sheet_name][0]
+        build().save(str(path))
+        print(f"{sheet_name}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Build the bundled font set and its fontconfig cache
+Run once at image build time (after installing fonts-crosextra-carlito and
+fonts-liberation): copies the metric-compatible fonts into assets/fonts and
+prebuilds the fontconfig cache, so engines resolve the template fonts
+without scanning font directories at render time.
+
+    python scripts/build_font_cache.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.font_bundle import (BUNDLED_FONTS, FONT_DIR, build_font_cache, bundled_files,
+                              collect_system_fonts)
+
+
+def main():
+    copied = collect_system_fonts()
+    present = bundled_files()
+    expected = sum(len(faces) for faces in BUNDLED_FONTS.values())
+    print(f"Font bundle: {len(present)}/{expected} fonts in {FONT_DIR} ({copied} copied)")
+    if len(present) < expected:
+        print("Missing fonts: install fonts-crosextra-carlito and fonts-liberation")
+    if not present:
+        return 1
+    if not build_font_cache():
+        print("Could not build the fontconfig cache (is fontconfig installed?)")
+        return 1
+    print("Fontconfig cache built")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -56,6 +56,13 @@ def clean_pdf_cache():
         
         # Clear cache
         cache.clear()
+        
+        # Clear the persistent PDF artifact store
+        from data.artifact_store import get_artifact_store
+        store = get_artifact_store()
+        stats = store.stats()
+        print(f"   📊 Stored PDFs before: {stats['entries']} ({stats['bytes'] / 1024 / 1024:.2f} MB)")
+        store.clear()
         print(f"   ✅ PDF cache cleared")
         
         return True
@@ -8,27 +8,7 @@ import re
 from pathlib import Path
 from typing import Dict, List
 
-def minify_css(css_content: str) -> str:
-    """
-    Minify CSS content by removing unnecessary whitespace and comments
-    
-    Args:
-        css_content (str): CSS content to minify
-        
-    Returns:
-        str: Minified CSS content
-    """
-    # Remove comments
-    css_content = re.sub(r'/\*.*?\*/', '', css_content, flags=re.DOTALL)
-    
-    # Remove unnecessary whitespace
-    css_content = re.sub(r'\s+', ' ', css_content)
-    css_content = re.sub(r'\s*([{}:;,])\s*', r'\1', css_content)
-    
-    # Remove leading and trailing whitespace
-    css_content = css_content.strip()
-    
-    return css_content
+from core.html_optimizer import minify_css
 
 def minify_js(js_content: str) -> str:
     """
@@ -166,6 +146,9 @@ def generate_asset_manifest(static_dir: str = "static", manifest_file: str = "st
 def optimize_templates(template_dir: str = "templates") -> Dict[str, int]:
     """
     Optimize HTML templates by removing unnecessary whitespace
+
+    Note: this rewrites the template sources in place. For non-destructive
+    minification of rendered output use core.html_optimizer.optimize_html.
     
     Args:
         template_dir (str): Directory containing templates
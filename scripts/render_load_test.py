@@ -0,0 +1,115 @@
+"""
+Load test for the local PDF render service
+Starts a render service, fires bursts of jobs from several concurrent clients
+(simulating users hitting "Generate" at the same time) and reports throughput,
+latency percentiles and peak queue depth per burst.
+
+    python scripts/render_load_test.py --workers 4 --clients 8 --jobs 10 --bursts 3
+"""
+import argparse
+import itertools
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.render_service import QUEUED, RenderClient, RenderService
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
+
+SAMPLE_DATA = {
+    "items": [{"serial_no": str(i), "description": f"Item {i}", "unit": "Cum", "quantity": 10,
+               "rate": 100, "amount": 1000, "amount_previous": 0, "remark": ""} for i in range(1, 41)],
+    "totals": {"grand_total": 40000, "premium": {"percent": 0.05, "amount": 2000}, "payable": 42000},
+    "header": [],
+}
+
+
+_job_counter = itertools.count()
+
+
+def _unique_data():
+    """Sample data that differs per job, so the artifact cache cannot serve it"""
+    items = [dict(item) for item in SAMPLE_DATA["items"]]
+    items[0]["description"] = f"Item 1 (job {next(_job_counter)})"
+    return {**SAMPLE_DATA, "items": items}
+
+
+def _client(service_dir, jobs, latencies, errors, start_barrier):
+    """One simulated user submitting jobs back to back and waiting for all of them"""
+    client = RenderClient(service_dir)
+    try:
+        start_barrier.wait()
+        submitted = [(client.submit_sheet("First Page", _unique_data(), "portrait", str(TEMPLATE_DIR)),
+                      time.perf_counter()) for _ in range(jobs)]
+        for job_id, started in submitted:
+            try:
+                client.wait(job_id, timeout=300)
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(str(e))
+    finally:
+        client.close()
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_burst(service_dir, clients, jobs):
+    """Run one burst and return its measurements"""
+    latencies, errors = [], []
+    barrier = threading.Barrier(clients + 1)
+    threads = [threading.Thread(target=_client, args=(service_dir, jobs, latencies, errors, barrier))
+               for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+
+    monitor = RenderClient(service_dir)
+    barrier.wait()
+    started = time.perf_counter()
+    peak_queue = 0
+    while any(thread.is_alive() for thread in threads):
+        peak_queue = max(peak_queue, monitor.queue.counts().get(QUEUED, 0))
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    monitor.close()
+
+    return {
+        "jobs": clients * jobs,
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": _percentile(latencies, 0.95) if latencies else 0.0,
+        "peak_queue": peak_queue,
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render service load test")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients per burst")
+    parser.add_argument("--jobs", type=int, default=10, help="Jobs per client per burst")
+    parser.add_argument("--bursts", type=int, default=3, help="Number of bursts")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as service_dir:
+        with RenderService(service_dir, args.workers) as service:
+            print(f"Workers: {service.workers}, clients: {args.clients}, jobs/client: {args.jobs}")
+            print(f"{'burst':>5} {'jobs':>6} {'seconds':>8} {'jobs/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+                  f"{'peak q':>7} {'errors':>6}")
+            for burst in range(1, args.bursts + 1):
+                result = run_burst(service_dir, args.clients, args.jobs)
+                print(f"{burst:>5} {result['jobs']:>6} {result['seconds']:>8.2f} {result['throughput']:>8.1f} "
+                      f"{result['p50'] * 1000:>8.0f} {result['p95'] * 1000:>8.0f} "
+                      f"{result['peak_queue']:>7} {result['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
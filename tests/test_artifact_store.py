@@ -0,0 +1,45 @@
+"""
+Test suite for the artifact store
+"""
+import sys
+import os
+import unittest
+import tempfile
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestArtifactStore(unittest.TestCase):
+    
+    def test_artifact_store_evicts_least_recently_used(self):
+        """Test that the artifact store is content addressed, persistent and size bounded"""
+        import time
+        from data.artifact_store import ArtifactStore, artifact_key
+
+        with tempfile.TemporaryDirectory() as store_dir:
+            store = ArtifactStore(store_dir, max_bytes=250)
+            keys = [artifact_key(template="t", engine="chrome", data=i) for i in range(3)]
+            self.assertNotEqual(keys[0], artifact_key(template="t", engine="weasyprint", data=0))
+
+            store.put_bytes(keys[0], b"a" * 100)
+            time.sleep(0.01)
+            store.put_bytes(keys[1], b"b" * 100)
+            time.sleep(0.01)
+            self.assertEqual(store.get_bytes(keys[0]), b"a" * 100)  # now most recently used
+            time.sleep(0.01)
+            store.put_bytes(keys[2], b"c" * 100)
+
+            self.assertIsNone(store.get(keys[1]))
+            self.assertIsNotNone(store.get(keys[0]))
+
+            # A new instance (e.g. after a restart) sees the same artifacts
+            reopened = ArtifactStore(store_dir, max_bytes=250)
+            self.assertEqual(reopened.get_bytes(keys[2]), b"c" * 100)
+
+            stats = store.stats()
+            self.assertEqual((stats["entries"], stats["bytes"], stats["evictions"]), (2, 200, 1))
+            self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
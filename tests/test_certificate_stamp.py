@@ -0,0 +1,100 @@
+"""
+Test suite for certificate template stamping
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestCertificateStamp(unittest.TestCase):
+    
+    def test_certificate_values_are_stamped_onto_template_pdf(self):
+        """Test that field slots are located in the marker print and stamped with bill values"""
+        import io
+        from pypdf import PdfReader
+        from reportlab.pdfgen import canvas
+        from exports.certificate_stamp import STAMP_SHEETS, StampTemplate
+
+        fields = {name: STAMP_SHEETS["Certificate II"][name] for name in ("measurement_officer", "officer_name")}
+
+        def certificate(officer, name, shifted=False):
+            buffer = io.BytesIO()
+            page = canvas.Canvas(buffer, pagesize=(595, 842))
+            page.setFont("Times-Roman", 12)
+            page.drawString(72, 700, "Measurements were taken by")
+            page.drawString(230, 700, officer)
+            page.drawString(72, 680, "and recorded in the measurement book." if not shifted else "and recorded.")
+            page.drawString(300, 600, name)
+            page.save()
+            return buffer.getvalue()
+
+        locate = certificate("[[measurement_officer]]", "[[officer_name]]")
+        template = StampTemplate.build(locate, certificate("", ""), fields)
+        self.assertIsNotNone(template)
+        self.assertAlmostEqual(template.placements["measurement_officer"].x, 230, places=1)
+        self.assertAlmostEqual(template.placements["officer_name"].size, 12, places=1)
+        self.assertIsNone(StampTemplate.build(locate, certificate("", "", shifted=True), fields))
+
+        text = PdfReader(io.BytesIO(template.stamp({"measurement_officer": "JE Sharma"}))).pages[0].extract_text()
+        self.assertIn("JE Sharma", text)
+        self.assertIn("Name of Officer", text)
+        self.assertIn("measurement book", text)
+
+        # Values the overlay font has no glyphs for fall back to the HTML render
+        self.assertIsNone(template.stamp({"officer_name": "\u0930\u093e\u092e \u0936\u0930\u094d\u092e\u093e"}))
+
+    def test_stamp_templates_retry_after_failed_prints(self):
+        """Test that template prints run outside the global lock and failures are not cached"""
+        import threading
+        from unittest import mock
+        from exports import certificate_stamp, renderers
+
+        class Generator:
+            def __init__(self, orientation):
+                self.orientation = orientation
+
+            def select_engines(self, route, log=True):
+                return ["chrome"]
+
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def print_pair(sheet_name, orientation, template_dir, engine, template_version):
+            calls.append(orientation)
+            if orientation == "landscape":
+                started.set()
+                release.wait(5)
+            if len(calls) == 1:
+                raise RuntimeError("browser crashed")
+            return [b"locate", b"base"]
+
+        template = object()
+        with mock.patch.object(renderers, "pdf_generator_for", lambda sheet, orientation: Generator(orientation)), \
+                mock.patch.object(renderers, "template_version", lambda template_dir, sheet: "v1"), \
+                mock.patch.object(certificate_stamp, "_print_pair", print_pair), \
+                mock.patch.object(certificate_stamp.StampTemplate, "build", lambda *args: template), \
+                mock.patch.dict(certificate_stamp._templates, clear=True):
+            self.assertIsNone(certificate_stamp.get_stamp_template("Certificate II", "portrait", "templates"))
+            self.assertIs(certificate_stamp.get_stamp_template("Certificate II", "portrait", "templates"), template)
+            self.assertEqual(calls, ["portrait", "portrait"])
+
+            # A slow print of one template does not block another
+            slow = threading.Thread(target=certificate_stamp.get_stamp_template,
+                                    args=("Certificate II", "landscape", "templates"))
+            slow.start()
+            self.assertTrue(started.wait(5))
+            results = []
+            fast = threading.Thread(target=lambda: results.append(
+                certificate_stamp.get_stamp_template("Certificate II", "portrait", "templates")))
+            fast.start()
+            fast.join(2)
+            self.assertEqual(results, [template])
+            release.set()
+            slow.join(5)
+            self.assertEqual(calls.count("landscape"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
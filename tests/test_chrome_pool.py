@@ -0,0 +1,96 @@
+"""
+Test suite for the headless Chrome worker pool
+"""
+import sys
+import os
+import unittest
+import tempfile
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestChromePool(unittest.TestCase):
+    
+    def test_chrome_pool_recycles_and_replaces_workers(self):
+        """Test that pooled workers are recycled after N jobs and replaced when unhealthy"""
+        from core.chrome_pool import ChromePool
+
+        class FakeWorker:
+            started = 0
+
+            def __init__(self):
+                FakeWorker.started += 1
+                self.jobs = 0
+                self.healthy = True
+                self.closed = False
+
+            def is_healthy(self):
+                return self.healthy
+
+            def print_to_pdf(self, html_content, output_path, timeout=30.0):
+                with open(output_path, "wb") as f:
+                    f.write(b"%PDF-1.4")
+                self.jobs += 1
+
+            def close(self):
+                self.closed = True
+
+        pool = ChromePool(size=1, max_jobs_per_worker=2, worker_factory=FakeWorker)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "out.pdf")
+            pool.print_to_pdf("<p>1</p>", output)
+            pool.print_to_pdf("<p>2</p>", output)
+            self.assertEqual(FakeWorker.started, 1)
+
+            # Third job runs on a fresh worker after recycling
+            pool.print_to_pdf("<p>3</p>", output)
+            self.assertEqual(FakeWorker.started, 2)
+
+            worker = pool._idle.get_nowait()
+            worker.healthy = False
+            pool._idle.put(worker)
+            pool.print_to_pdf("<p>4</p>", output)
+            self.assertTrue(worker.closed)
+            self.assertEqual(FakeWorker.started, 3)
+        pool.close()
+
+    def test_chrome_pool_batch_streams_results_from_one_browser(self):
+        """Test that a batch prints in one browser and resumes on a fresh one if it dies"""
+        from core.chrome_pool import ChromeError, ChromePool
+
+        class FakeWorker:
+            started = 0
+
+            def __init__(self):
+                FakeWorker.started += 1
+                self.crash_after = 3 if FakeWorker.started == 1 else None
+                self.jobs = 0
+
+            def is_healthy(self):
+                return True
+
+            def print_files(self, jobs, tabs=4, timeout=30.0):
+                for index, (_, output_path) in enumerate(jobs):
+                    if self.jobs == self.crash_after:
+                        raise ChromeError("browser died")
+                    with open(output_path, "wb") as f:
+                        f.write(b"%PDF-1.4")
+                    self.jobs += 1
+                    yield index, None
+
+            def close(self):
+                pass
+
+        pool = ChromePool(size=1, worker_factory=FakeWorker)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            jobs = [(f"doc{i}.html", os.path.join(temp_dir, f"doc{i}.pdf")) for i in range(8)]
+            results = list(pool.print_batch(jobs))
+
+        self.assertEqual(FakeWorker.started, 2)
+        self.assertEqual(sorted(html for html, _, _ in results), sorted(html for html, _ in jobs))
+        self.assertTrue(all(error is None for _, _, error in results))
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
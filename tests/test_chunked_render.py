@@ -0,0 +1,48 @@
+"""
+Test suite for chunked rendering of long tables
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestChunkedRender(unittest.TestCase):
+    
+    def test_long_tables_split_into_chunks_with_running_subtotals(self):
+        """Test that chunked documents carry subtotals forward and end with the full totals"""
+        from exports.chunked_render import needs_chunking, split_into_chunks
+        from exports.renderers import render_template
+
+        template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+        items = [{"serial_no": str(i), "description": f"Item {i}", "amt_wo": 100, "amt_bill": 110,
+                  "excess_amt": 10, "saving_amt": 0} for i in range(25)]
+        items.insert(10, {"description": "Extra Items (With Premium)", "is_divider": True})
+        data = {"items": items, "summary": {"work_order_total": 2500, "executed_total": 2750,
+                                            "premium": {"percent": 0.05}, "percentage_deviation": 10.0}}
+
+        self.assertTrue(needs_chunking("Deviation Statement", data, rows=10))
+        self.assertFalse(needs_chunking("Extra Items", data, rows=10))
+        chunks = split_into_chunks("Deviation Statement", data, rows=10)
+        self.assertEqual([len(chunk["items"]) for chunk in chunks], [10, 10, 6])
+        self.assertEqual(chunks[1]["chunk"]["brought_forward"], chunks[0]["chunk"]["carried_forward"])
+        self.assertEqual(chunks[-1]["chunk"]["carried_forward"]["amt_bill"], 2750)
+
+        first = render_template("Deviation Statement", chunks[0], template_dir)
+        last = render_template("Deviation Statement", chunks[-1], template_dir)
+        self.assertIn("Carried Forward", first)
+        self.assertNotIn("Grand Total Rs.", first)
+        self.assertIn("Brought Forward", last)
+        self.assertIn("2750", last)
+
+        # Fractional amounts are carried exactly and only rounded when printed
+        fractional = {"items": [{"amt_wo": 0.4, "amt_bill": 0.4} for _ in range(30)], "summary": {}}
+        chunks = split_into_chunks("Deviation Statement", fractional, rows=1)
+        self.assertAlmostEqual(chunks[-2]["chunk"]["carried_forward"]["amt_bill"], 11.6)
+        self.assertAlmostEqual(chunks[-1]["chunk"]["carried_forward"]["amt_bill"], 12.0)
+        self.assertIn("<td>12</td>", render_template("Deviation Statement", chunks[-2], template_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
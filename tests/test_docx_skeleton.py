@@ -0,0 +1,75 @@
+"""
+Test suite for skeleton-based Word documents
+"""
+import sys
+import os
+import unittest
+import tempfile
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestDocxSkeleton(unittest.TestCase):
+    
+    def test_word_documents_fill_prebuilt_skeletons(self):
+        """Test that skeleton .docx files are filled in place, keeping untouched parts byte-for-byte"""
+        import zipfile
+        from docx import Document
+        from exports.docx_skeleton import fill_skeleton, skeleton_path
+        from exports.word_generator import generate_first_page_docx
+
+        data = {"header": [["Name of Work:", "Road"]],
+                "items": [{"unit": "Cum", "serial_no": "1", "description": "Earth <work> & fill", "amount": 500},
+                          {"description": "Extra Items", "is_divider": True}],
+                "totals": {"grand_total": 500, "premium": {"percent": 0.1, "amount": 50}, "payable": 550}}
+        skeleton = skeleton_path("First Page")
+        self.assertIsNotNone(skeleton)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = generate_first_page_docx(data, os.path.join(tmp, "first_page.docx"))
+            with zipfile.ZipFile(skeleton) as original, zipfile.ZipFile(path) as filled:
+                self.assertEqual(original.namelist(), filled.namelist())
+                for name in original.namelist():
+                    if name != "word/document.xml":
+                        self.assertEqual(original.read(name), filled.read(name), name)
+
+            document = Document(path)
+            self.assertIn("Name of Work: Road", [p.text for p in document.paragraphs])
+            rows = [[cell.text for cell in row.cells] for row in document.tables[0].rows]
+            self.assertEqual(rows[1][4], "Earth <work> & fill")
+            self.assertEqual(rows[2][0], "Extra Items")
+            self.assertEqual(rows[4][0], "Tender Premium @ 10.00%")
+            self.assertEqual(rows[-1][6], "550.00")
+            self.assertNotIn("{{", document.element.xml)
+
+            # Placeholders that Word split across runs are still filled
+            edited = Document()
+            paragraph = edited.add_paragraph("Total: ")
+            paragraph.add_run("{{grand")
+            paragraph.add_run("_total}} Rs.").bold = True
+            edited.save(os.path.join(tmp, "edited.docx"))
+            fill_skeleton(os.path.join(tmp, "edited.docx"), os.path.join(tmp, "out.docx"), {"grand_total": 500})
+            self.assertEqual(Document(os.path.join(tmp, "out.docx")).paragraphs[0].text, "Total: 500 Rs.")
+
+    def test_word_skeletons_match_builders_on_empty_bills(self):
+        """Test that skeleton and in-code Word documents agree for a bill without items"""
+        from unittest import mock
+        from docx import Document
+        from exports import word_generator
+
+        data = {"header": [["Name of Work:", "Road"]], "items": [],
+                "totals": {"grand_total": 0, "premium": {"percent": 0.1, "amount": 0}, "payable": 0},
+                "summary": {"premium": {"percent": 0.1}}}
+        with tempfile.TemporaryDirectory() as tmp:
+            for generate in (word_generator.generate_first_page_docx,
+                             word_generator.generate_deviation_statement_docx,
+                             word_generator.generate_extra_items_docx):
+                skeleton = Document(generate(data, os.path.join(tmp, "skeleton.docx")))
+                with mock.patch.object(word_generator, "render_skeleton", return_value=None):
+                    built = Document(generate(data, os.path.join(tmp, "built.docx")))
+                self.assertEqual(len(skeleton.tables), len(built.tables), generate.__name__)
+                self.assertEqual([p.text.strip() for p in skeleton.paragraphs if p.text.strip()],
+                                 [p.text.strip() for p in built.paragraphs if p.text.strip()], generate.__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Test suite for bulk DOCX table building
+"""
+import sys
+import os
+import unittest
+import tempfile
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestDocxTables(unittest.TestCase):
+    
+    def test_docx_tables_are_built_in_bulk(self):
+        """Test the bulk table builder used for the Word documents"""
+        from unittest import mock
+        from docx import Document
+        from docx.oxml.ns import qn
+        from exports.word_generator import generate_deviation_statement_docx
+
+        items = [{"serial_no": str(i), "description": f"Item <{i}> & co\nsecond line", "amt_wo": 100}
+                 for i in range(300)]
+        items.insert(2, {"description": "Extra Items (With Premium)", "is_divider": True})
+        data = {"items": items, "summary": {"work_order_total": 30000, "premium": {"percent": 0.05},
+                                            "percentage_deviation": 2.5, "net_difference": 750}}
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch("exports.word_generator.render_skeleton", return_value=None):
+            path = generate_deviation_statement_docx(data, os.path.join(tmp, "deviation.docx"))
+            table = Document(path).tables[0]
+
+        # Header, items, five summary rows
+        self.assertEqual(len(table.rows), 1 + len(items) + 5)
+        self.assertEqual(len(table.columns), 13)
+        self.assertEqual(table.rows[1].cells[1].text, "Item <0> & co\nsecond line")
+        self.assertEqual(table.rows[3].cells[12].text, "Extra Items (With Premium)")
+        self.assertEqual(table.rows[-5].cells[0].text, "Grand Total Rs.")
+        self.assertEqual(table.rows[-5].cells[5].text, "30000")
+        self.assertEqual(table.rows[-1].cells[7].text, "2.50%")
+        # Borders once at table level, header repeated on each page
+        self.assertIsNotNone(table._tbl.tblPr.find(qn("w:tblBorders")))
+        self.assertEqual(len(table._tbl.findall(".//" + qn("w:tcBorders"))), 0)
+        self.assertIsNotNone(table.rows[0]._tr.find(qn("w:trPr") + "/" + qn("w:tblHeader")))
+
+
+if __name__ == "__main__":
+    unittest.main()
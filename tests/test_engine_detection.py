@@ -0,0 +1,34 @@
+"""
+Test suite for PDF engine detection
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestEngineDetection(unittest.TestCase):
+    
+    def test_engine_detection_is_cached_per_process(self):
+        """Test that engine discovery runs once until explicitly refreshed"""
+        from unittest import mock
+        from core import engine_detection
+        from core.pdf_generator_optimized import PDFGenerator
+
+        probe = {"engines": ["weasyprint", "reportlab"], "chrome_path": None, "wkhtmltopdf_path": None}
+        with mock.patch.object(engine_detection, "_capabilities", None), \
+                mock.patch.object(engine_detection, "_probe", return_value=probe) as probed:
+            PDFGenerator()
+            PDFGenerator(orientation="landscape")
+            self.assertEqual(probed.call_count, 1)
+
+            engine_detection.mark_engine_unavailable("weasyprint")
+            self.assertEqual(PDFGenerator().available_engines, ["reportlab"])
+
+            self.assertEqual(engine_detection.refresh_engines(), ["weasyprint", "reportlab"])
+            self.assertEqual(probed.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
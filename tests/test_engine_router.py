@@ -0,0 +1,62 @@
+"""
+Test suite for adaptive PDF engine routing
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestEngineRouter(unittest.TestCase):
+    
+    def test_engine_router_prefers_fast_healthy_engines(self):
+        """Test latency-based routing, fidelity tiers and the circuit breaker"""
+        from core.engine_router import EngineRouter
+        from core.pdf_generator_optimized import PDFGenerator
+
+        router = EngineRouter(min_fidelity="exact", failure_threshold=2, cooldown=60)
+        engines = ["chrome", "weasyprint", "reportlab"]
+        route = "first_page/landscape"
+
+        # Unmeasured engines are tried first, then the fastest qualifying one wins
+        self.assertEqual(router.order(engines, route), ["chrome", "weasyprint", "reportlab"])
+        router.record("chrome", route, 4.0, True)
+        router.record("weasyprint", route, 0.5, True)
+        self.assertEqual(router.order(engines, route)[0], "weasyprint")
+
+        # Repeated failures open the circuit and move the engine to the back
+        router.record("weasyprint", route, 30.0, False)
+        router.record("weasyprint", route, 30.0, False)
+        self.assertEqual(router.order(engines, route), ["chrome", "reportlab", "weasyprint"])
+        self.assertTrue(router.stats()["weasyprint"]["circuit_open"])
+
+        # After the cooldown the circuit is half-open: exactly one caller gets a trial
+        from unittest import mock
+        clock = [1000.0]
+        with mock.patch("core.engine_router.time.monotonic", lambda: clock[0]):
+            router.record("weasyprint", route, 30.0, False)
+            clock[0] += 61
+            self.assertEqual(router.order(engines, route)[0], "weasyprint")
+            self.assertEqual(router.order(engines, route), ["chrome", "reportlab", "weasyprint"])
+            # A failed trial re-opens the circuit for a full cooldown
+            router.record("weasyprint", route, 30.0, False)
+            clock[0] += 30
+            self.assertEqual(router.order(engines, route)[-1], "weasyprint")
+            # A successful trial closes it
+            clock[0] += 31
+            self.assertEqual(router.order(engines, route)[0], "weasyprint")
+            router.record("weasyprint", route, 0.5, True)
+            self.assertFalse(router.stats()["weasyprint"]["circuit_open"])
+            self.assertEqual(router.order(engines, route)[0], "weasyprint")
+            self.assertEqual(router.order(engines, route)[0], "weasyprint")
+
+        # The generator falls back along the routed order and reports what it used
+        generator = PDFGenerator(router=EngineRouter(failure_threshold=1), engines=["weasyprint", "reportlab"])
+        generator._convert = lambda engine, html, path: engine == "reportlab"
+        self.assertEqual(generator.generate_with_fallback("<p>x</p>", "unused.pdf", route=route), "reportlab")
+        self.assertEqual(generator.router.order(generator.available_engines, route)[0], "reportlab")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Test suite for the external engine subprocess layer
+"""
+import sys
+import os
+import unittest
+import tempfile
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestEngineSubprocess(unittest.TestCase):
+    
+    @unittest.skipIf(sys.platform == "win32", "process groups are POSIX-only")
+    def test_engine_subprocess_kills_process_group_and_cancels(self):
+        """Test that engine timeouts kill child processes and that jobs can be cancelled by group"""
+        import time
+        import concurrent.futures
+        from core.engine_subprocess import EngineProcessRunner, EngineTimeoutError
+
+        def running(pid):
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    return f.read().split(")")[-1].split()[0] != "Z"
+            except FileNotFoundError:
+                return False
+
+        runner = EngineProcessRunner()
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                pid_file = os.path.join(tmp, "child.pid")
+                with self.assertRaises(EngineTimeoutError):
+                    runner.run("test", ["sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"], timeout=0.5)
+                with open(pid_file) as f:
+                    child = int(f.read())
+                time.sleep(0.2)
+                self.assertFalse(running(child))
+
+            self.assertEqual(runner.run("test", ["sh", "-c", "cat"], timeout=5, stdin_data=b"ok").stdout, b"ok")
+
+            started = time.monotonic()
+            futures = [runner.submit("test", ["sleep", "30"], timeout=60, group="session") for _ in range(2)]
+            time.sleep(0.2)
+            self.assertEqual(runner.cancel("session"), 2)
+            for future in futures:
+                with self.assertRaises(concurrent.futures.CancelledError):
+                    future.result()
+            self.assertLess(time.monotonic() - started, 10)
+        finally:
+            runner.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
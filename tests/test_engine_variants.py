@@ -0,0 +1,42 @@
+"""
+Test suite for per-engine CSS variants
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestEngineVariants(unittest.TestCase):
+    
+    def test_engine_variants_simplify_css_once_per_template(self):
+        """Test that fallback engines get cached, simplified stylesheets"""
+        from core.engine_variants import EngineVariantCache
+
+        html = ("<html><head><style>@font-face{font-family:'Calibri';src:local('Calibri')}</style>"
+                "<style>html { zoom: 1.0 !important; } body { font-size: 8pt; -webkit-text-size-adjust: none; }"
+                "@media print { table { width: 190mm !important; max-width: 190mm !important; } }"
+                "td:nth-child(1) { width: 25mm !important; } th, td:nth-child(2) { padding: 3px 2px; }</style>"
+                "</head><body><table><tr><td>x</td></tr></table></body></html>")
+        cache = EngineVariantCache()
+
+        variant = cache.html_for("xhtml2pdf", html)
+        self.assertIn("body{font-size:8pt}", variant)
+        self.assertIn("@media print{table{width:190mm}}", variant)
+        self.assertIn("th{padding:3px 2px}", variant)
+        for unsupported in ("zoom", "!important", "-webkit-", "nth-child", "max-width", "@font-face"):
+            self.assertNotIn(unsupported, variant)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+        # Later documents from the same template reuse the simplified CSS
+        self.assertEqual(cache.html_for("xhtml2pdf", html.replace(">x<", ">y<")), variant.replace(">x<", ">y<"))
+        self.assertEqual(cache.hits, 2)
+
+        # ReportLab only reads text; engines without a profile get the document unchanged
+        self.assertNotIn("<style", cache.html_for("reportlab", html))
+        self.assertEqual(cache.html_for("chrome", html), html)
+
+
+if __name__ == "__main__":
+    unittest.main()
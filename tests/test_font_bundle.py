@@ -0,0 +1,51 @@
+"""
+Test suite for the bundled fonts
+"""
+import sys
+import os
+import unittest
+import tempfile
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestFontBundle(unittest.TestCase):
+    
+    def test_font_bundle_injects_font_faces_into_shared_stylesheet(self):
+        """Test that bundled fonts are declared with @font-face and hoisted with the template CSS"""
+        from unittest import mock
+        from core import font_bundle
+        from core.html_optimizer import SharedStylesheetCache, optimize_html
+
+        html = "<html><head><style>body { font-family: Calibri, sans-serif; }</style></head><body>x</body></html>"
+        with tempfile.TemporaryDirectory() as font_dir:
+            with mock.patch.object(font_bundle, "FONT_DIR", font_dir):
+                font_bundle.reset()
+                self.assertEqual(font_bundle.inject_font_faces(html), html)
+
+                # Configuring is explicit and only collects system fonts when asked to
+                with mock.patch.object(font_bundle, "collect_system_fonts", return_value=0) as collect, \
+                        mock.patch.object(font_bundle, "_configured", None), mock.patch.dict(os.environ):
+                    os.environ.pop("FONTCONFIG_FILE", None)
+                    self.assertFalse(font_bundle.configure_fontconfig())
+                    collect.assert_not_called()
+                    self.assertNotIn("FONTCONFIG_FILE", os.environ)
+
+                open(os.path.join(font_dir, "Carlito-Regular.ttf"), "wb").close()
+                font_bundle.reset()
+                self.assertEqual(font_bundle.bundle_signature(), ["Carlito-Regular.ttf"])
+                injected = font_bundle.inject_font_faces(html)
+                self.assertIn("font-family:'Calibri';font-weight:normal;font-style:normal", injected)
+                self.assertLess(injected.index("@font-face"), injected.index("body {"))
+
+                with tempfile.TemporaryDirectory() as css_dir:
+                    cache = SharedStylesheetCache(css_dir)
+                    optimized = optimize_html(injected, cache)
+                    self.assertNotIn("@font-face", optimized)
+                    css = "".join(open(os.path.join(css_dir, name)).read() for name in os.listdir(css_dir))
+                    self.assertIn("@font-face", css)
+            font_bundle.reset()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Test suite for render-time HTML minification and shared stylesheets
+"""
+import sys
+import os
+import unittest
+import tempfile
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestHtmlOptimizer(unittest.TestCase):
+    
+    def test_html_minification_preserves_whitespace_sensitive_cells(self):
+        """Test that render-time minification keeps pre-wrap content intact"""
+        from core.html_optimizer import minify_html
+
+        html = """<html>
+        <head><style>
+            .note-cell { white-space: pre-wrap; }
+            /* comment */
+        </style></head>
+        <body>
+            <!-- remove me -->
+            <table>
+                <tr>
+                    <td>Made by <span>Junior   Engineer</span> on 01/03/2025</td>
+                    <td class="note-cell">line 1
+    line 2</td>
+                </tr>
+            </table>
+        </body>
+        </html>"""
+
+        minified = minify_html(html)
+
+        self.assertLess(len(minified), len(html))
+        self.assertNotIn("remove me", minified)
+        self.assertNotIn("/*", minified)
+        self.assertIn("<tr><td>Made by <span>Junior Engineer</span> on 01/03/2025</td>", minified)
+        self.assertIn('<td class="note-cell">line 1\n    line 2</td>', minified)
+
+        # Nested same-name elements inside a protected element stay protected
+        nested = html.replace('<td class="note-cell">line 1\n    line 2</td>',
+                              '<td><div class="note-cell"><div>a   b</div>\n  tail   c</div></td>')
+        self.assertIn('<div class="note-cell"><div>a   b</div>\n  tail   c</div>', minify_html(nested))
+        pre = "<body>\n  <pre>x   <pre>y</pre>   z</pre>\n  <textarea>t   </textarea></body>"
+        self.assertEqual(minify_html(pre), "<body><pre>x   <pre>y</pre>   z</pre>\n<textarea>t   </textarea></body>")
+
+    def test_hoisted_stylesheet_is_shared_between_renders(self):
+        """Test that identical style blocks are hoisted into one cached stylesheet"""
+        from core.html_optimizer import (SharedStylesheetCache, inline_stylesheets,
+                                         optimize_html, split_shared_stylesheets)
+
+        html = "<html><head><style>body { font-size: 8pt; }</style></head><body>{}</body></html>"
+
+        with tempfile.TemporaryDirectory() as css_dir:
+            cache = SharedStylesheetCache(css_dir)
+            first = optimize_html(html.replace("{}", "Bill 1"), cache)
+            second = optimize_html(html.replace("{}", "Bill 2"), cache)
+
+            self.assertNotIn("<style>", first)
+            self.assertEqual(len(os.listdir(css_dir)), 1)
+
+            body, digests = split_shared_stylesheets(first)
+            _, second_digests = split_shared_stylesheets(second)
+            self.assertEqual(digests, second_digests)
+            self.assertNotIn("<link", body)
+
+            inlined = inline_stylesheets(first, cache)
+            self.assertIn("<style>body{font-size:8pt;}</style>", inlined)
+
+        # HTML written for users stands alone (no link into the temp stylesheet cache)
+        from exports.renderers import generate_html
+        template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+        with tempfile.TemporaryDirectory() as output_dir:
+            path = generate_html("Certificate II", {"measurement_officer": "Junior Engineer"},
+                                 template_dir, output_dir, optimize=True)
+            with open(path, encoding="utf-8") as f:
+                saved = f.read()
+            self.assertEqual(split_shared_stylesheets(saved)[1], [])
+            self.assertIn("<style>", saved)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Test suite for lazily generated bill documents
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestLazyDocuments(unittest.TestCase):
+    
+    def test_lazy_documents_build_once_on_demand(self):
+        """Test that lazy documents are built on first request, memoized and retried after failures"""
+        import threading
+        from exports.lazy_documents import FAILED, PENDING, READY, LazyDocumentSet
+
+        calls = {"pdf": 0, "flaky": 0}
+        release = threading.Event()
+
+        def build_pdf():
+            release.wait(5)
+            calls["pdf"] += 1
+            return b"%PDF"
+
+        def build_flaky():
+            calls["flaky"] += 1
+            if calls["flaky"] == 1:
+                raise RuntimeError("engine crashed")
+            return b"ok"
+
+        documents = LazyDocumentSet()
+        documents.add("first_page.pdf", "first_page.pdf", "application/pdf", build_pdf)
+        documents.add("merged.pdf", "complete_bill.pdf", "application/pdf",
+                      lambda: documents.get("first_page.pdf") * 2)
+        documents.add("flaky", "flaky.bin", "application/octet-stream", build_flaky)
+        self.assertEqual(documents.status("first_page.pdf"), PENDING)
+
+        documents.prefetch(["first_page.pdf"])
+        release.set()
+        self.assertEqual(documents.getter("merged.pdf")(), b"%PDF%PDF")
+        self.assertEqual(documents.get("first_page.pdf"), b"%PDF")
+        self.assertEqual(calls["pdf"], 1)
+        self.assertEqual(documents.status("merged.pdf"), READY)
+
+        with self.assertRaises(RuntimeError):
+            documents.get("flaky")
+        self.assertEqual(documents.status("flaky"), FAILED)
+        self.assertEqual(documents.get("flaky"), b"ok")
+        documents.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
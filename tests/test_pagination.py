@@ -0,0 +1,52 @@
+"""
+Test suite for page break prediction
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestPagination(unittest.TestCase):
+    
+    def test_pagination_predicts_page_breaks_with_carried_forward_totals(self):
+        """Test that page breaks and per-page subtotals are computed without a PDF engine"""
+        from exports.pagination import count_lines, paginate, predict_page_count
+        from exports.renderers import render_template
+
+        template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+        self.assertEqual(count_lines("", 50, 8), 1)
+        self.assertGreater(count_lines("word " * 40, 50, 8), count_lines("word " * 10, 50, 8))
+
+        items = [{"serial_no": str(i), "description": "Earth work in excavation " * (1 + i % 4), "unit": "Cum",
+                  "amount": 100, "amount_previous": 40} for i in range(150)]
+        data = {"items": items, "header": [["Name of Work", "Road"]],
+                "totals": {"premium": {"percent": 0.05, "amount": 750}, "payable": 15750}}
+
+        pagination = paginate("First Page", data)
+        breaks = sorted(pagination["breaks"])
+        self.assertGreater(pagination["pages"], 2)
+        self.assertEqual(len(breaks), len(pagination["page_totals"]) - 1)
+        self.assertEqual(predict_page_count("First Page", data), pagination["pages"])
+        # Carried forward is the running total up to the break; page totals add up to the bill
+        first_break = breaks[0]
+        self.assertEqual(pagination["breaks"][first_break]["carried_forward"]["amount"], 100 * (first_break + 1))
+        self.assertEqual(sum(page["total"]["amount"] for page in pagination["page_totals"]), 15000)
+        # Fractional amounts are carried exactly; the template rounds them when printing
+        fractional = dict(data, items=[dict(item, amount=0.4) for item in items])
+        exact = paginate("First Page", fractional)
+        first_break = sorted(exact["breaks"])[0]
+        self.assertAlmostEqual(exact["breaks"][first_break]["carried_forward"]["amount"], 0.4 * (first_break + 1))
+        # Longer descriptions mean fewer rows per page
+        short = paginate("First Page", dict(data, items=[dict(item, description="x") for item in items]))
+        self.assertLess(short["pages"], pagination["pages"])
+
+        html = render_template("First Page", data, template_dir)
+        self.assertEqual(html.count("Carried Forward"), len(breaks))
+        self.assertEqual(html.count("Brought Forward"), len(breaks))
+        self.assertIn(str(100 * (first_break + 1)), html)
+
+
+if __name__ == "__main__":
+    unittest.main()
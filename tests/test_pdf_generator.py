@@ -0,0 +1,77 @@
+"""
+Test suite for the unified PDF generator
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestPdfGenerator(unittest.TestCase):
+    
+    def test_async_engine_subprocess_is_killed_on_timeout(self):
+        """Test that an external engine exceeding its timeout is killed"""
+        import asyncio
+        from core.pdf_generator_optimized import PDFGenerator
+
+        generator = PDFGenerator()
+        cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(generator._arun_engine(cmd, timeout=0.5))
+
+    def test_pdf_generators_are_shared_per_page_setup(self):
+        """Test the keyed generator pool and per-thread last_engine on shared generators"""
+        import threading
+        from core.pdf_generator_optimized import clear_generator_pool, get_pdf_generator
+
+        clear_generator_pool()
+        portrait = get_pdf_generator()
+        self.assertIs(get_pdf_generator("portrait", {"top": 10}), portrait)
+        self.assertIsNot(get_pdf_generator("landscape"), portrait)
+        note_sheet = get_pdf_generator("portrait", {"top": 6, "right": 6, "bottom": 15, "left": 6})
+        self.assertIs(get_pdf_generator("portrait", {"top": 6, "right": 6, "bottom": 15, "left": 6}), note_sheet)
+        self.assertEqual((note_sheet.margin_top, note_sheet.margin_bottom), (6, 15))
+        self.assertIs(portrait.get_base_css(), portrait.get_base_css())
+
+        # Engine overrides are fixed at construction and part of the pool key
+        reportlab_only = get_pdf_generator("portrait", engines=["reportlab"])
+        self.assertIsNot(reportlab_only, portrait)
+        self.assertIs(get_pdf_generator("portrait", engines=("reportlab",)), reportlab_only)
+        self.assertEqual(reportlab_only.available_engines, ["reportlab"])
+        with self.assertRaises(AttributeError):
+            reportlab_only.available_engines = ["chrome"]
+
+        # Concurrent renders on one generator each see the engine they used
+        portrait._convert_bytes = lambda engine, html: b"%PDF-" + engine.encode()
+        seen = {}
+
+        def render(engine):
+            portrait.generate_pdf_bytes("<p>x</p>", engine=engine)
+            seen[engine] = portrait.last_engine
+
+        engines = list(portrait.available_engines)
+        threads = [threading.Thread(target=render, args=(engine,)) for engine in engines]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(seen, {engine: engine for engine in engines})
+        self.assertIsNone(portrait.last_engine)
+
+        # The one-shot Chrome fallback skips the pool without touching the shared generator
+        landscape = get_pdf_generator("landscape")
+        calls = []
+
+        def one_shot(html, path, use_pool=None):
+            calls.append((use_pool, landscape.use_chrome_pool))
+            return False
+        landscape.html_to_pdf_chrome = one_shot
+        self.assertIsNone(landscape._chrome_pdf_bytes("<p>x</p>"))
+        self.assertEqual(calls, [(False, True)])
+        self.assertTrue(landscape.use_chrome_pool)
+        clear_generator_pool()
+
+
+if __name__ == "__main__":
+    unittest.main()
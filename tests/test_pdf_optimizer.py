@@ -0,0 +1,45 @@
+"""
+Test suite for merged PDF optimization
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestPdfOptimizer(unittest.TestCase):
+    
+    def test_merged_pdf_is_deduplicated(self):
+        """Test that merging reports and removes duplicated resources"""
+        import io
+        from pypdf import PdfReader
+        from exports.renderers import generate_pdf_bytes, merge_pdfs
+
+        template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+        pdf = generate_pdf_bytes("Certificate II", {"measurement_officer": "Junior Engineer"},
+                                 "portrait", template_dir)
+
+        stats = {}
+        optimized = merge_pdfs([pdf] * 4, stats=stats)
+        plain = merge_pdfs([pdf] * 4, optimize=False)
+        self.assertEqual(len(PdfReader(io.BytesIO(optimized)).pages), len(PdfReader(io.BytesIO(plain)).pages))
+        self.assertLess(len(optimized), len(plain))
+        self.assertEqual(stats["optimized_bytes"], len(optimized))
+        self.assertGreater(stats["saved_bytes"], 0)
+        self.assertIn("Junior Engineer", PdfReader(io.BytesIO(optimized), strict=True).pages[-1].extract_text())
+
+        # Stream targets get the same (streamed) output
+        output = io.BytesIO()
+        self.assertIsNone(merge_pdfs([pdf] * 4, output))
+        self.assertEqual(output.getvalue(), optimized)
+
+        from exports.pdf_optimizer import optimize_pdf
+        output = io.BytesIO()
+        content, _ = optimize_pdf(pdf, output)
+        self.assertIsNone(content)
+        self.assertTrue(output.getvalue().startswith(b"%PDF"))
+
+
+if __name__ == "__main__":
+    unittest.main()
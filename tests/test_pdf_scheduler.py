@@ -0,0 +1,46 @@
+"""
+Test suite for the bill-level PDF scheduler
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestPdfScheduler(unittest.TestCase):
+    
+    def test_pdf_scheduler_runs_documents_concurrently_in_order(self):
+        """Test that bill documents run concurrently and come back in canonical order"""
+        import threading
+        import time
+        from exports.pdf_scheduler import run_jobs
+
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def job(name, delay):
+            def run():
+                with lock:
+                    running.append(name)
+                    peak.append(len(running))
+                time.sleep(delay)
+                with lock:
+                    running.remove(name)
+                return name
+            return run
+
+        jobs = [job("first_page", 0.2), job("last_page", 0.05), job("deviation", 0.1)]
+        self.assertEqual(run_jobs(jobs, max_workers=3), ["first_page", "last_page", "deviation"])
+        self.assertEqual(max(peak), 3)
+
+        def failing():
+            raise RuntimeError("engine failed")
+
+        with self.assertRaises(RuntimeError):
+            run_jobs([job("first_page", 0), failing], max_workers=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
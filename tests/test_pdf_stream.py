@@ -0,0 +1,37 @@
+"""
+Test suite for streaming PDF merges
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestPdfStream(unittest.TestCase):
+    
+    def test_streaming_merge_selects_pages(self):
+        """Test that the streaming merger writes a valid PDF with selected pages"""
+        import io
+        from pypdf import PdfReader, PdfWriter
+        from exports.pdf_stream import stream_merge_pdfs
+
+        def blank_pdf(pages, width):
+            writer = PdfWriter()
+            for _ in range(pages):
+                writer.add_blank_page(width=width, height=100)
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            return buffer.getvalue()
+
+        first, second = blank_pdf(2, 100), blank_pdf(5, 200)
+        output = io.BytesIO()
+        written = stream_merge_pdfs([first, (second, "1:3"), (second, [-1])], output)
+
+        reader = PdfReader(io.BytesIO(output.getvalue()), strict=True)
+        self.assertEqual(written, 5)
+        self.assertEqual([int(page.mediabox.width) for page in reader.pages], [100, 100, 200, 200, 200])
+
+
+if __name__ == "__main__":
+    unittest.main()
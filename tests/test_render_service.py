@@ -0,0 +1,39 @@
+"""
+Test suite for the local PDF render service
+"""
+import sys
+import os
+import unittest
+import tempfile
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestRenderService(unittest.TestCase):
+    
+    def test_render_service_queue_and_workers(self):
+        """Test that queued jobs are claimed once, requeued from dead workers and rendered by the service"""
+        from core.render_service import DONE, QUEUED, RUNNING, JobQueue, RenderClient, RenderService
+
+        with tempfile.TemporaryDirectory() as service_dir:
+            queue = JobQueue(service_dir)
+            first = queue.enqueue("html", {"html": "<p>one</p>"})
+            queue.enqueue("html", {"html": "<p>two</p>"})
+            self.assertEqual(queue.claim("a")["id"], first)
+            self.assertNotEqual(queue.claim("b")["id"], first)
+            self.assertIsNone(queue.claim("c"))
+            self.assertEqual(queue.requeue_worker("a"), 1)
+            self.assertEqual(queue.get(first)["status"], QUEUED)
+            self.assertEqual(queue.counts(), {QUEUED: 1, RUNNING: 1})
+            queue.close()
+
+            with RenderService(service_dir, workers=1):
+                client = RenderClient(service_dir)
+                job_id = client.submit_html("<html><body><p>Render service</p></body></html>")
+                self.assertTrue(client.wait(job_id, timeout=60).startswith(b"%PDF"))
+                self.assertEqual(client.status(first)["status"], DONE)
+                client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Test suite for the export renderers
+"""
+import sys
+import os
+import unittest
+import tempfile
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestRenderers(unittest.TestCase):
+    
+    def test_async_html_rendering_overlaps_documents(self):
+        """Test that agenerate_html renders several documents on one event loop"""
+        import asyncio
+        from exports.renderers import agenerate_html
+
+        template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+        data = {"measurement_officer": "Junior Engineer", "measurement_date": "01/03/2025"}
+
+        async def render_all(temp_dir):
+            return await asyncio.gather(
+                agenerate_html("Certificate II", data, template_dir, temp_dir),
+                agenerate_html("Certificate II", data, template_dir, temp_dir, optimize=True),
+            )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = asyncio.run(render_all(temp_dir))
+            self.assertTrue(all(os.path.exists(path) for path in paths))
+
+    def test_in_memory_pdf_pipeline(self):
+        """Test generating, merging and zipping PDFs as bytes"""
+        import io
+        import zipfile
+        from pypdf import PdfReader
+        from exports.renderers import create_zip_archive, generate_pdf_bytes, merge_pdfs
+
+        template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+        data = {"measurement_officer": "Junior Engineer", "measurement_date": "01/03/2025"}
+
+        pdf = generate_pdf_bytes("Certificate II", data, "portrait", template_dir)
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        pages = len(PdfReader(io.BytesIO(pdf)).pages)
+
+        merged = merge_pdfs([pdf, pdf])
+        self.assertEqual(len(PdfReader(io.BytesIO(merged)).pages), 2 * pages)
+
+        archive = create_zip_archive([("certificate_ii.pdf", pdf), ("complete_bill.pdf", merged)])
+        with zipfile.ZipFile(io.BytesIO(archive)) as zipf:
+            self.assertEqual(zipf.namelist(), ["certificate_ii.pdf", "complete_bill.pdf"])
+            self.assertEqual(zipf.read("certificate_ii.pdf"), pdf)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Test suite for the native ReportLab renderer
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestReportlabRenderer(unittest.TestCase):
+    
+    def test_native_reportlab_renderer_splits_tables_with_repeated_headers(self):
+        """Test that the native renderer builds multi-page tables straight from bill data"""
+        import io
+        from pypdf import PdfReader
+        from exports.reportlab_renderer import render_pdf
+
+        items = [{"serial_no": str(i), "description": f"Item of work {i} " * 4, "unit": "cum",
+                  "qty_wo": 10, "rate": 125.5, "amt_wo": 1255, "qty_bill": 12, "amt_bill": 1506,
+                  "excess_qty": 2, "excess_amt": 251, "saving_qty": 0, "saving_amt": 0, "remark": ""}
+                 for i in range(1, 121)]
+        items.append({"description": "Extra Items (With Premium)", "is_divider": True})
+        summary = {"work_order_total": 150600, "premium": {"percent": 0.05}, "percentage_deviation": 20.0}
+
+        pdf = render_pdf("Deviation Statement", {"items": items, "summary": summary})
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        pages = PdfReader(io.BytesIO(pdf)).pages
+        self.assertGreater(len(pages), 1)
+        for page in pages:
+            self.assertIn("REMARKS/ REASON.", page.extract_text())
+
+        # First Page follows the template's portrait @page; premium percentages are coerced
+        totals = {"grand_total": 1000, "premium": {"percent": "0.05", "amount": 50}}
+        first_page = PdfReader(io.BytesIO(render_pdf("First Page", {"items": [], "totals": totals}))).pages[0]
+        self.assertLess(float(first_page.mediabox.width), float(first_page.mediabox.height))
+        self.assertIn("5.00%", first_page.extract_text())
+        unparsed = render_pdf("First Page", {"items": [], "totals": {"premium": {"percent": "n/a"}}})
+        self.assertIn("Tender Premium @ n/a", PdfReader(io.BytesIO(unparsed)).pages[0].extract_text())
+
+    def test_native_reportlab_tables_fit_the_page_frame(self):
+        """Test that colgroup widths wider than the frame are scaled down to it"""
+        from unittest import mock
+        from exports import reportlab_renderer
+
+        built = []
+
+        class RecordingTable(reportlab_renderer.Table):
+            def __init__(self, rows, colWidths=None, **kwargs):
+                built.append(sum(colWidths))
+                super().__init__(rows, colWidths=colWidths, **kwargs)
+
+        frames = {"portrait": 210, "landscape": 297}
+        with mock.patch.object(reportlab_renderer, "Table", RecordingTable):
+            for sheet_name, (_, orientation) in reportlab_renderer.NATIVE_SHEETS.items():
+                reportlab_renderer.render_pdf(sheet_name, {"items": [{"description": "Item"}]})
+                frame = (frames[orientation] - 2 * reportlab_renderer.PAGE_MARGIN_MM) * reportlab_renderer.mm
+                self.assertLessEqual(built[-1], frame + 0.01, sheet_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Test suite for the section dependency graph
+"""
+import sys
+import os
+import unittest
+import tempfile
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestSectionGraph(unittest.TestCase):
+    
+    def test_section_graph_regenerates_only_changed_sections(self):
+        """Test that a re-run re-renders only sections whose inputs changed"""
+        from exports.section_graph import SectionMemo, build_bill_context, render_sections
+
+        template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+        certificate = {"measurement_officer": "Junior Engineer", "measurement_date": "01/03/2025"}
+        extra_items = {"items": [{"serial_no": 1, "description": "Extra work", "amount": 100}]}
+
+        with tempfile.TemporaryDirectory() as memo_dir:
+            memo = SectionMemo(memo_dir)
+            options = {"sections": ["extra_items", "certificate_ii"], "formats": ("html",), "memo": memo}
+
+            bill = build_bill_context({}, {}, {}, extra_items, {}, certificate)
+            first = render_sections(bill, template_dir, **options)
+            self.assertFalse(any(result["reused"] for result in first.values()))
+
+            # A correction to the extra items (and to unrelated WO data) leaves Certificate II alone
+            corrected = {"items": [{"serial_no": 1, "description": "Extra work", "amount": 120}]}
+            bill = build_bill_context({"header": [["changed"]]}, {}, {}, corrected, {}, certificate)
+            second = render_sections(bill, template_dir, **options)
+            self.assertFalse(second["extra_items"]["reused"])
+            self.assertTrue(second["certificate_ii"]["reused"])
+            self.assertEqual(second["certificate_ii"]["html"], first["certificate_ii"]["html"])
+
+    def test_section_memo_is_bounded_and_keyed_by_engine(self):
+        """Test that fallback section PDFs are not served once the preferred engine is back"""
+        from unittest import mock
+        from exports import section_graph
+        from exports.section_graph import SectionMemo, build_bill_context, render_sections
+
+        class FallbackGenerator:
+            """Chrome is preferred but fails; xhtml2pdf produces the PDF"""
+            last_engine = None
+
+            def generate_pdf(self, html_content, output_path, route=None):
+                with open(output_path, "wb") as f:
+                    f.write(b"%PDF-1.4 fallback")
+                self.last_engine = "xhtml2pdf"
+                return True
+
+        template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+        bill = build_bill_context({}, {}, {}, {"items": [{"serial_no": 1, "description": "Extra work"}]}, {})
+        generator = FallbackGenerator()
+
+        with tempfile.TemporaryDirectory() as memo_dir, \
+                mock.patch.object(section_graph, "use_native", return_value=False), \
+                mock.patch.object(section_graph, "pdf_generator_for", return_value=generator), \
+                mock.patch.object(section_graph, "preferred_engine", return_value="chrome") as preferred:
+            options = {"sections": ["extra_items"], "memo": SectionMemo(memo_dir)}
+            self.assertFalse(render_sections(bill, template_dir, **options)["extra_items"]["reused"])
+            # Chrome is still preferred: the xhtml2pdf output is not reused as final
+            self.assertFalse(render_sections(bill, template_dir, **options)["extra_items"]["reused"])
+            # While the router prefers the fallback engine, its output is reused
+            preferred.return_value = "xhtml2pdf"
+            self.assertTrue(render_sections(bill, template_dir, **options)["extra_items"]["reused"])
+
+        with tempfile.TemporaryDirectory() as memo_dir:
+            memo = SectionMemo(memo_dir, max_bytes=2500)
+            for index in range(5):
+                memo.put_bytes("extra_items", f"{index:064x}", "pdf", b"x" * 1000)
+            self.assertLessEqual(memo._store("pdf").stats()["bytes"], 2500)
+            self.assertIsNotNone(memo.get("extra_items", f"{4:064x}", "pdf"))
+
+
+if __name__ == "__main__":
+    unittest.main()
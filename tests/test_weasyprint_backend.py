@@ -0,0 +1,71 @@
+"""
+Test suite for the WeasyPrint backend
+"""
+import sys
+import os
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+class TestWeasyprintBackend(unittest.TestCase):
+    
+    def test_weasyprint_backend_shares_fonts_and_page_stylesheets(self):
+        """Test the long-lived WeasyPrint backend against a stub weasyprint module"""
+        import types
+        from unittest import mock
+        from core.weasyprint_backend import WeasyPrintBackend
+
+        created = {"font_configs": 0, "stylesheets": [], "copies": []}
+
+        class FontConfiguration:
+            def __init__(self):
+                created["font_configs"] += 1
+
+        class CSS:
+            def __init__(self, string, font_config=None):
+                created["stylesheets"].append(string)
+
+        class Document:
+            def __init__(self, pages):
+                self.pages = pages
+
+            def copy(self, pages):
+                created["copies"].append(list(pages))
+                return Document(list(pages))
+
+            def write_pdf(self, target=None):
+                return "|".join(self.pages).encode()
+
+        class HTML:
+            def __init__(self, string, base_url=None):
+                self.string = string
+
+            def render(self, stylesheets=None, font_config=None):
+                return Document([f"{self.string}-1", f"{self.string}-2"])
+
+        weasyprint = types.ModuleType("weasyprint")
+        weasyprint.CSS, weasyprint.HTML = CSS, HTML
+        fonts = types.ModuleType("weasyprint.text.fonts")
+        fonts.FontConfiguration = FontConfiguration
+        modules = {"weasyprint": weasyprint, "weasyprint.text": types.ModuleType("weasyprint.text"),
+                   "weasyprint.text.fonts": fonts}
+
+        with mock.patch.dict(sys.modules, modules):
+            backend = WeasyPrintBackend()
+            merged = backend.write_merged_pdf([
+                ("a", "landscape", (10, 10, 10, 10)),
+                ("b", "portrait", (10, 10, 10, 10)),
+                ("c", "landscape", (10, 10, 10, 10)),
+            ])
+            backend.render("d", "portrait", (10, 10, 10, 10))
+
+        self.assertEqual(created["font_configs"], 1)
+        page_rules = [css for css in created["stylesheets"] if css.startswith("@page")]
+        self.assertEqual(len(page_rules), 2)
+        self.assertEqual(len(created["copies"]), 1)
+        self.assertEqual(merged, b"a-1|a-2|b-1|b-2|c-1|c-2")
+
+
+if __name__ == "__main__":
+    unittest.main()